@@ -0,0 +1,99 @@
+"""
+Controle de admissão por orçamento de frames em processamento.
+
+Cada worker do gunicorn aceita até MAX_INFLIGHT_FRAMES frames em
+processamento ao mesmo tempo; acima disso as requisições são recusadas na
+hora (429 + Retry-After), em vez de esperar na fila até o timeout, para que
+o cliente possa descartar ou tentar de novo mais tarde. Jobs assíncronos
+esperam a vez (acquire) em vez de serem recusados, e os frames deles
+contam no mesmo orçamento.
+"""
+
+import math
+import threading
+from typing import Optional
+
+
+class FrameBudget:
+    """Orçamento thread-safe de frames em processamento."""
+
+    def __init__(
+        self,
+        capacity: int,
+        parallelism: int = 1,
+        initial_seconds_per_frame: float = 0.1,
+        smoothing: float = 0.2
+    ):
+        """
+        Args:
+            capacity: Máximo de frames em processamento (0 = sem limite)
+            parallelism: Frames processados em paralelo (processos do pool),
+                usado na estimativa de Retry-After
+            initial_seconds_per_frame: Estimativa inicial de tempo por frame
+            smoothing: Peso de cada nova medida na média móvel exponencial
+        """
+        self.capacity = max(0, int(capacity))
+        self.parallelism = max(1, int(parallelism))
+        self.seconds_per_frame = initial_seconds_per_frame
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self._lock = threading.Condition()
+
+    def try_acquire(self, frames: int) -> bool:
+        """
+        Reserva frames no orçamento.
+
+        Uma requisição maior que o orçamento inteiro é aceita quando não há
+        nada em processamento, para não ser recusada para sempre.
+
+        Returns:
+            True se a requisição foi admitida
+        """
+        with self._lock:
+            if not self._admits(frames):
+                return False
+            self.in_flight += frames
+            return True
+
+    def acquire(self, frames: int, timeout: Optional[float] = None) -> bool:
+        """
+        Como try_acquire, mas espera frames serem liberados (lotes de jobs).
+
+        Args:
+            frames: Frames a reservar
+            timeout: Espera máxima em segundos (None = sem limite)
+
+        Returns:
+            True se os frames foram reservados
+        """
+        with self._lock:
+            if not self._lock.wait_for(lambda: self._admits(frames), timeout):
+                return False
+            self.in_flight += frames
+            return True
+
+    def _admits(self, frames: int) -> bool:
+        """Se frames cabem no orçamento agora (chamado com o lock)."""
+        return not (self.capacity and self.in_flight > 0 and self.in_flight + frames > self.capacity)
+
+    def release(self, frames: int, elapsed_seconds: Optional[float] = None) -> None:
+        """
+        Devolve frames ao orçamento.
+
+        Args:
+            frames: Frames reservados por try_acquire
+            elapsed_seconds: Duração do processamento, para atualizar a
+                estimativa de tempo por frame
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - frames)
+            self._lock.notify_all()
+            if elapsed_seconds is not None and frames > 0:
+                sample = elapsed_seconds * self.parallelism / frames
+                self.seconds_per_frame += self.smoothing * (sample - self.seconds_per_frame)
+
+    def retry_after(self) -> int:
+        """Segundos estimados até os frames em processamento terminarem."""
+        with self._lock:
+            pending = self.in_flight * self.seconds_per_frame / self.parallelism
+        return max(1, math.ceil(pending))
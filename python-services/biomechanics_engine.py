@@ -4,17 +4,25 @@ Calcula ângulos articulares e detecta fases do movimento para diferentes exerc
 """
 
 import numpy as np
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Union
 import logging
 import math
 
+from exercise_registry import Exercise, ExerciseRegistry
+from phase_tracker import PhaseTracker
+from pose_frame import NUM_LANDMARKS, PoseFrame
+
 logger = logging.getLogger(__name__)
 
+# Landmarks aceitos pelos cálculos: PoseFrame, lista de dicts no formato
+# landmarks_3d ou o array indexado de index_landmarks
+Landmarks = Union[PoseFrame, List[Dict[str, Any]], np.ndarray]
+
 
 class BiomechanicsEngine:
     """
     Engine para cálculos biomecânicos de análise de movimento.
-    Suporta múltiplos exercícios com cálculos específicos de ângulos.
+    Os exercícios e seus ângulos vêm do registro declarativo (ExerciseRegistry).
     """
 
     # Mapeamento de IDs de landmarks do MediaPipe
@@ -38,137 +46,149 @@ class BiomechanicsEngine:
         'right_foot_index': 32,
     }
 
-    def __init__(self):
-        """Inicializa o engine biomecânico."""
-        logger.info("BiomechanicsEngine initialized")
+    def __init__(self, registry: Optional[ExerciseRegistry] = None):
+        """
+        Inicializa o engine biomecânico.
+
+        Args:
+            registry: Exercícios suportados (padrão: exercises.json)
+        """
+        self.registry = registry or ExerciseRegistry.load()
+        logger.info(f"BiomechanicsEngine initialized with {len(self.registry)} exercises")
 
     def calculate_angles(
         self,
-        landmarks: List[Dict[str, Any]],
+        landmarks: Landmarks,
         exercise_type: str
     ) -> Dict[str, float]:
         """
-        Calcula todos os ângulos relevantes para o exercício.
+        Calcula os ângulos declarados para o exercício.
 
         Args:
-            landmarks: Lista de landmarks 3D do MediaPipe
-            exercise_type: Tipo de exercício (squat, deadlift, etc)
+            landmarks: PoseFrame ou lista de landmarks 3D do MediaPipe
+            exercise_type: Tipo de exercício (nome ou alias do registro)
 
         Returns:
             Dict com ângulos calculados
+
+        Raises:
+            ValueError: Se o exercício não estiver registrado
         """
+        exercise = self.registry.get(exercise_type)
+
         try:
-            if exercise_type in ['squat', 'back-squat', 'front-squat', 'goblet-squat']:
-                return self._calculate_squat_angles(landmarks)
-            elif exercise_type in ['deadlift', 'romanian-deadlift']:
-                return self._calculate_deadlift_angles(landmarks)
-            elif exercise_type in ['bench-press']:
-                return self._calculate_bench_press_angles(landmarks)
-            elif exercise_type in ['overhead-press', 'military-press']:
-                return self._calculate_overhead_press_angles(landmarks)
-            else:
-                logger.warning(f"Unknown exercise type: {exercise_type}, using squat angles")
-                return self._calculate_squat_angles(landmarks)
+            # Indexado uma vez; mesmo kernel da sequência, com um frame
+            table = self._angle_table(self.index_landmarks(landmarks)[np.newaxis], exercise)
+            return dict(zip(exercise.columns, table[0].tolist()))
 
         except Exception as e:
             logger.error(f"Error calculating angles: {str(e)}")
-            return self._get_default_angles()
+            return self._get_default_angles(exercise)
 
-    def _calculate_squat_angles(self, landmarks: List[Dict]) -> Dict[str, float]:
-        """
-        Calcula ângulos específicos para agachamento.
-
-        Returns:
-            Dict com: knee_left, knee_right, hip, trunk, ankle_left, ankle_right,
-                     knee_valgus_left, knee_valgus_right, pelvic_tilt
+    def calculate_sequence_angles(
+        self,
+        landmarks: Any,
+        exercise_type: str
+    ) -> Tuple[np.ndarray, List[str]]:
         """
-        angles = {}
-
-        # Ângulos de joelho (esquerdo e direito)
-        angles['knee_left'] = self.calculate_knee_angle(landmarks, side='left')
-        angles['knee_right'] = self.calculate_knee_angle(landmarks, side='right')
-
-        # Ângulo de quadril
-        angles['hip'] = self.calculate_hip_angle(landmarks)
-
-        # Ângulo do tronco (inclinação para frente)
-        angles['trunk'] = self.calculate_trunk_angle(landmarks)
-
-        # Ângulos de tornozelo
-        angles['ankle_left'] = self.calculate_ankle_angle(landmarks, side='left')
-        angles['ankle_right'] = self.calculate_ankle_angle(landmarks, side='right')
-
-        # Valgo de joelho (indicador de knee valgus)
-        angles['knee_valgus_left'] = self.calculate_valgus_angle(landmarks, side='left')
-        angles['knee_valgus_right'] = self.calculate_valgus_angle(landmarks, side='right')
-
-        # Inclinação pélvica (butt wink detection)
-        angles['pelvic_tilt'] = self.calculate_pelvic_tilt(landmarks)
-
-        return angles
+        Calcula os ângulos de todos os frames de uma sequência de uma vez.
 
-    def _calculate_deadlift_angles(self, landmarks: List[Dict]) -> Dict[str, float]:
-        """Calcula ângulos para levantamento terra."""
-        angles = {}
+        Mesmos valores de calculate_angles frame a frame, mas com operações
+        vetorizadas sobre a sequência inteira (reanálise de séries longas,
+        reprocessamento em lote).
 
-        angles['knee_left'] = self.calculate_knee_angle(landmarks, side='left')
-        angles['knee_right'] = self.calculate_knee_angle(landmarks, side='right')
-        angles['hip'] = self.calculate_hip_angle(landmarks)
-        angles['trunk'] = self.calculate_trunk_angle(landmarks)
-        angles['back_angle'] = self.calculate_back_angle(landmarks)
-
-        return angles
-
-    def _calculate_bench_press_angles(self, landmarks: List[Dict]) -> Dict[str, float]:
-        """Calcula ângulos para supino."""
-        angles = {}
+        Args:
+            landmarks: Array (frames, 33, 3) de x, y, z em pixels (ver
+                index_landmarks), ou sequência de PoseFrames / listas de landmarks
+            exercise_type: Tipo de exercício (nome ou alias do registro)
 
-        angles['elbow_left'] = self.calculate_elbow_angle(landmarks, side='left')
-        angles['elbow_right'] = self.calculate_elbow_angle(landmarks, side='right')
-        angles['shoulder_left'] = self.calculate_shoulder_angle(landmarks, side='left')
-        angles['shoulder_right'] = self.calculate_shoulder_angle(landmarks, side='right')
+        Returns:
+            Tupla (tabela (frames, n_ângulos) em graus, nomes das colunas)
 
-        return angles
+        Raises:
+            ValueError: Se o exercício não estiver registrado
+        """
+        exercise = self.registry.get(exercise_type)
+        return self._angle_table(self.stack_landmarks(landmarks), exercise), list(exercise.columns)
 
-    def _calculate_overhead_press_angles(self, landmarks: List[Dict]) -> Dict[str, float]:
-        """Calcula ângulos para desenvolvimento."""
-        angles = {}
+    def _angle_table(self, points: np.ndarray, exercise: Exercise) -> np.ndarray:
+        """
+        Kernel vetorizado: ângulos declarados do exercício para (frames, 33, 3).
 
-        angles['elbow_left'] = self.calculate_elbow_angle(landmarks, side='left')
-        angles['elbow_right'] = self.calculate_elbow_angle(landmarks, side='right')
-        angles['shoulder_left'] = self.calculate_shoulder_angle(landmarks, side='left')
-        angles['shoulder_right'] = self.calculate_shoulder_angle(landmarks, side='right')
-        angles['trunk'] = self.calculate_trunk_angle(landmarks)
+        Cada tipo de ângulo é uma operação sobre todos os frames e colunas
+        do tipo, usando os índices compilados no registro.
+        """
+        table = np.zeros((len(points), len(exercise.columns)))
+
+        if len(exercise.joint_ids):
+            ids = exercise.joint_ids
+            a, b, c = (points[:, ids[:, i]] for i in range(3))
+            triplet_angles = self._vector_angles(a - b, c - b)
+            # Média dos triplets de cada coluna (ex.: quadril esquerdo e direito)
+            joint = np.add.reduceat(triplet_angles, exercise.joint_starts, axis=1) / exercise.joint_counts
+            # Dorsiflexão: 0° em pé, ~25° agachado
+            joint[:, exercise.dorsiflexion] = np.maximum(0, 90 - joint[:, exercise.dorsiflexion])
+            table[:, exercise.joint_columns] = joint
+
+        if len(exercise.reference_columns):
+            start_ids, end_ids = exercise.reference_from, exercise.reference_to
+            start = (points[:, start_ids[:, 0]] + points[:, start_ids[:, 1]]) / 2
+            end = (points[:, end_ids[:, 0]] + points[:, end_ids[:, 1]]) / 2
+            # Em 2D (ignora profundidade), contra a vertical/horizontal da imagem
+            table[:, exercise.reference_columns] = self._vector_angles(
+                (end - start)[..., :2], exercise.reference_vectors
+            )
+
+        if len(exercise.valgus_columns):
+            ids = exercise.valgus_ids
+            hip, knee, ankle = (points[:, ids[:, i]] for i in range(3))
+            # Desvio lateral do joelho normalizado pelo tamanho da perna
+            knee_deviation = np.abs(knee[..., 0] - (hip[..., 0] + ankle[..., 0]) / 2)
+            leg_length = np.hypot(hip[..., 0] - ankle[..., 0], hip[..., 1] - ankle[..., 1])
+            null = leg_length == 0
+            leg_length[null] = 1.0
+            valgus = np.degrees(np.arctan(knee_deviation / leg_length))
+            valgus[null] = 0.0
+            table[:, exercise.valgus_columns] = valgus
+
+        # Articulações ausentes (NaN) valem 0.0
+        table[np.isnan(table)] = 0.0
+        return table.round(1)
+
+
+    def stack_landmarks(self, landmarks: Any) -> np.ndarray:
+        """
+        Sequência de landmarks como array (frames, 33, 3) de x, y, z em pixels.
 
-        return angles
+        Arrays são usados direto (colunas além de x, y, z, como visibility,
+        são descartadas).
+        """
+        if isinstance(landmarks, np.ndarray):
+            return np.asarray(landmarks[..., :3], dtype=np.float64)
+        if not len(landmarks):
+            return np.zeros((0, NUM_LANDMARKS, 3))
+        return np.stack([self.index_landmarks(frame)[:, :3] for frame in landmarks]).astype(np.float64)
 
-    def calculate_knee_angle(self, landmarks: List[Dict], side: str) -> float:
+    def calculate_knee_angle(self, landmarks: Landmarks, side: str) -> float:
         """
         Calcula ângulo do joelho (hip -> knee -> ankle).
 
         Args:
-            landmarks: Lista de landmarks
+            landmarks: Landmarks do frame (ver index_landmarks)
             side: 'left' ou 'right'
 
         Returns:
             Ângulo em graus (0-180)
         """
-        hip = self._get_landmark(landmarks, f'{side}_hip')
-        knee = self._get_landmark(landmarks, f'{side}_knee')
-        ankle = self._get_landmark(landmarks, f'{side}_ankle')
-
-        if not all([hip, knee, ankle]):
+        points = self._get_points(landmarks, f'{side}_hip', f'{side}_knee', f'{side}_ankle')
+        if points is None:
             return 0.0
 
-        angle = self._calculate_angle_3d(
-            [hip['x'], hip['y'], hip['z']],
-            [knee['x'], knee['y'], knee['z']],
-            [ankle['x'], ankle['y'], ankle['z']]
-        )
+        angle = self._calculate_angle_3d(*points)
 
         return round(angle, 1)
 
-    def calculate_hip_angle(self, landmarks: List[Dict]) -> float:
+    def calculate_hip_angle(self, landmarks: Landmarks) -> float:
         """
         Calcula ângulo do quadril (shoulder -> hip -> knee).
         Usa média dos dois lados.
@@ -176,33 +196,20 @@ class BiomechanicsEngine:
         Returns:
             Ângulo em graus (0-180)
         """
-        left_shoulder = self._get_landmark(landmarks, 'left_shoulder')
-        left_hip = self._get_landmark(landmarks, 'left_hip')
-        left_knee = self._get_landmark(landmarks, 'left_knee')
-
-        right_shoulder = self._get_landmark(landmarks, 'right_shoulder')
-        right_hip = self._get_landmark(landmarks, 'right_hip')
-        right_knee = self._get_landmark(landmarks, 'right_knee')
+        landmarks = self.index_landmarks(landmarks)
+        left = self._get_points(landmarks, 'left_shoulder', 'left_hip', 'left_knee')
+        right = self._get_points(landmarks, 'right_shoulder', 'right_hip', 'right_knee')
 
-        if not all([left_shoulder, left_hip, left_knee, right_shoulder, right_hip, right_knee]):
+        if left is None or right is None:
             return 0.0
 
-        angle_left = self._calculate_angle_3d(
-            [left_shoulder['x'], left_shoulder['y'], left_shoulder['z']],
-            [left_hip['x'], left_hip['y'], left_hip['z']],
-            [left_knee['x'], left_knee['y'], left_knee['z']]
-        )
-
-        angle_right = self._calculate_angle_3d(
-            [right_shoulder['x'], right_shoulder['y'], right_shoulder['z']],
-            [right_hip['x'], right_hip['y'], right_hip['z']],
-            [right_knee['x'], right_knee['y'], right_knee['z']]
-        )
+        angle_left = self._calculate_angle_3d(*left)
+        angle_right = self._calculate_angle_3d(*right)
 
         # Média dos dois lados
         return round((angle_left + angle_right) / 2, 1)
 
-    def calculate_trunk_angle(self, landmarks: List[Dict]) -> float:
+    def calculate_trunk_angle(self, landmarks: Landmarks) -> float:
         """
         Calcula ângulo do tronco em relação à vertical.
         0° = vertical, 90° = horizontal
@@ -211,32 +218,19 @@ class BiomechanicsEngine:
             Ângulo em graus (0-90)
         """
         # Usar média dos ombros e quadris para linha do tronco
-        left_shoulder = self._get_landmark(landmarks, 'left_shoulder')
-        right_shoulder = self._get_landmark(landmarks, 'right_shoulder')
-        left_hip = self._get_landmark(landmarks, 'left_hip')
-        right_hip = self._get_landmark(landmarks, 'right_hip')
-
-        if not all([left_shoulder, right_shoulder, left_hip, right_hip]):
+        points = self._get_points(landmarks, 'left_shoulder', 'right_shoulder', 'left_hip', 'right_hip')
+        if points is None:
             return 0.0
+        left_shoulder, right_shoulder, left_hip, right_hip = points
 
-        # Ponto médio dos ombros
-        shoulder_mid = {
-            'x': (left_shoulder['x'] + right_shoulder['x']) / 2,
-            'y': (left_shoulder['y'] + right_shoulder['y']) / 2,
-            'z': (left_shoulder['z'] + right_shoulder['z']) / 2
-        }
-
-        # Ponto médio dos quadris
-        hip_mid = {
-            'x': (left_hip['x'] + right_hip['x']) / 2,
-            'y': (left_hip['y'] + right_hip['y']) / 2,
-            'z': (left_hip['z'] + right_hip['z']) / 2
-        }
+        # Pontos médios dos ombros e dos quadris
+        shoulder_mid = (left_shoulder + right_shoulder) / 2
+        hip_mid = (left_hip + right_hip) / 2
 
         # Vetor do tronco
         trunk_vector = np.array([
-            shoulder_mid['x'] - hip_mid['x'],
-            shoulder_mid['y'] - hip_mid['y'],
+            shoulder_mid[0] - hip_mid[0],
+            shoulder_mid[1] - hip_mid[1],
             0  # Ignorar profundidade para ângulo 2D
         ])
 
@@ -248,64 +242,52 @@ class BiomechanicsEngine:
 
         return round(angle, 1)
 
-    def calculate_ankle_angle(self, landmarks: List[Dict], side: str) -> float:
+    def calculate_ankle_angle(self, landmarks: Landmarks, side: str) -> float:
         """
         Calcula ângulo do tornozelo (knee -> ankle -> foot_index).
 
         Args:
-            landmarks: Lista de landmarks
+            landmarks: Landmarks do frame (ver index_landmarks)
             side: 'left' ou 'right'
 
         Returns:
             Ângulo em graus (0-180)
         """
-        knee = self._get_landmark(landmarks, f'{side}_knee')
-        ankle = self._get_landmark(landmarks, f'{side}_ankle')
-        foot = self._get_landmark(landmarks, f'{side}_foot_index')
-
-        if not all([knee, ankle, foot]):
+        points = self._get_points(landmarks, f'{side}_knee', f'{side}_ankle', f'{side}_foot_index')
+        if points is None:
             return 0.0  # Sem dados suficientes
 
         # Ângulo absoluto knee → ankle → foot_index (~90° em pé, ~65° agachado)
-        raw_angle = self._calculate_angle_3d(
-            [knee['x'], knee['y'], knee['z']],
-            [ankle['x'], ankle['y'], ankle['z']],
-            [foot['x'], foot['y'], foot['z']]
-        )
+        raw_angle = self._calculate_angle_3d(*points)
 
         # Converter para dorsiflexão: 0° em pé, ~25° agachado
         dorsiflexion = max(0, 90 - raw_angle)
         return round(dorsiflexion, 1)
 
-    def calculate_valgus_angle(self, landmarks: List[Dict], side: str) -> float:
+    def calculate_valgus_angle(self, landmarks: Landmarks, side: str) -> float:
         """
         Calcula ângulo de valgo do joelho (indicador de knee valgus).
         Mede desvio medial do joelho em relação ao quadril e tornozelo.
 
         Args:
-            landmarks: Lista de landmarks
+            landmarks: Landmarks do frame (ver index_landmarks)
             side: 'left' ou 'right'
 
         Returns:
             Ângulo de valgo em graus (0 = alinhado, positivo = valgo)
         """
-        hip = self._get_landmark(landmarks, f'{side}_hip')
-        knee = self._get_landmark(landmarks, f'{side}_knee')
-        ankle = self._get_landmark(landmarks, f'{side}_ankle')
-
-        if not all([hip, knee, ankle]):
+        points = self._get_points(landmarks, f'{side}_hip', f'{side}_knee', f'{side}_ankle')
+        if points is None:
             return 0.0
+        hip, knee, ankle = points
 
         # Calcular desvio lateral (eixo X)
         # Se joelho estiver mais medial que a linha hip-ankle, há valgo
-        hip_ankle_x = (hip['x'] + ankle['x']) / 2
-        knee_deviation = abs(knee['x'] - hip_ankle_x)
+        hip_ankle_x = (hip[0] + ankle[0]) / 2
+        knee_deviation = abs(knee[0] - hip_ankle_x)
 
         # Normalizar pelo tamanho da perna (distância hip-ankle)
-        leg_length = np.sqrt(
-            (hip['x'] - ankle['x'])**2 +
-            (hip['y'] - ankle['y'])**2
-        )
+        leg_length = math.hypot(hip[0] - ankle[0], hip[1] - ankle[1])
 
         if leg_length == 0:
             return 0.0
@@ -316,7 +298,7 @@ class BiomechanicsEngine:
 
         return round(valgus_angle, 1)
 
-    def calculate_pelvic_tilt(self, landmarks: List[Dict]) -> float:
+    def calculate_pelvic_tilt(self, landmarks: Landmarks) -> float:
         """
         Calcula inclinação pélvica (indicador de butt wink).
         Mede ângulo entre linha dos quadris e horizontal.
@@ -324,16 +306,15 @@ class BiomechanicsEngine:
         Returns:
             Ângulo de inclinação em graus (0 = neutro, positivo = posterior tilt)
         """
-        left_hip = self._get_landmark(landmarks, 'left_hip')
-        right_hip = self._get_landmark(landmarks, 'right_hip')
-
-        if not all([left_hip, right_hip]):
+        points = self._get_points(landmarks, 'left_hip', 'right_hip')
+        if points is None:
             return 0.0
+        left_hip, right_hip = points
 
         # Vetor da linha dos quadris
         hip_vector = np.array([
-            right_hip['x'] - left_hip['x'],
-            right_hip['y'] - left_hip['y'],
+            right_hip[0] - left_hip[0],
+            right_hip[1] - left_hip[1],
             0
         ])
 
@@ -345,41 +326,27 @@ class BiomechanicsEngine:
 
         return round(angle, 1)
 
-    def calculate_elbow_angle(self, landmarks: List[Dict], side: str) -> float:
+    def calculate_elbow_angle(self, landmarks: Landmarks, side: str) -> float:
         """Calcula ângulo do cotovelo (shoulder -> elbow -> wrist)."""
-        shoulder = self._get_landmark(landmarks, f'{side}_shoulder')
-        elbow = self._get_landmark(landmarks, f'{side}_elbow')
-        wrist = self._get_landmark(landmarks, f'{side}_wrist')
-
-        if not all([shoulder, elbow, wrist]):
+        points = self._get_points(landmarks, f'{side}_shoulder', f'{side}_elbow', f'{side}_wrist')
+        if points is None:
             return 0.0
 
-        angle = self._calculate_angle_3d(
-            [shoulder['x'], shoulder['y'], shoulder['z']],
-            [elbow['x'], elbow['y'], elbow['z']],
-            [wrist['x'], wrist['y'], wrist['z']]
-        )
+        angle = self._calculate_angle_3d(*points)
 
         return round(angle, 1)
 
-    def calculate_shoulder_angle(self, landmarks: List[Dict], side: str) -> float:
+    def calculate_shoulder_angle(self, landmarks: Landmarks, side: str) -> float:
         """Calcula ângulo do ombro (hip -> shoulder -> elbow)."""
-        hip = self._get_landmark(landmarks, f'{side}_hip')
-        shoulder = self._get_landmark(landmarks, f'{side}_shoulder')
-        elbow = self._get_landmark(landmarks, f'{side}_elbow')
-
-        if not all([hip, shoulder, elbow]):
+        points = self._get_points(landmarks, f'{side}_hip', f'{side}_shoulder', f'{side}_elbow')
+        if points is None:
             return 0.0
 
-        angle = self._calculate_angle_3d(
-            [hip['x'], hip['y'], hip['z']],
-            [shoulder['x'], shoulder['y'], shoulder['z']],
-            [elbow['x'], elbow['y'], elbow['z']]
-        )
+        angle = self._calculate_angle_3d(*points)
 
         return round(angle, 1)
 
-    def calculate_back_angle(self, landmarks: List[Dict]) -> float:
+    def calculate_back_angle(self, landmarks: Landmarks) -> float:
         """
         Calcula ângulo da coluna (para deadlift).
         Mede ângulo entre linha shoulder-hip e vertical.
@@ -394,102 +361,127 @@ class BiomechanicsEngine:
         total_frames: int
     ) -> str:
         """
-        Detecta fase do movimento baseado nos ângulos.
+        Detecta a fase de um frame isolado pela regra declarada no registro.
+
+        O sinal (média dos ângulos declarados) acima de top é 'top' e abaixo
+        de bottom é 'bottom'; entre os dois, ou sem sinal, a fase vem da
+        posição relativa do frame no vídeo (by_position). Para sequências,
+        phase_tracker / detect_sequence_phases usam a velocidade do sinal e
+        não dependem do total de frames.
 
         Args:
             angles: Dict com ângulos calculados
-            exercise_type: Tipo de exercício
+            exercise_type: Tipo de exercício (nome ou alias do registro)
             frame_number: Número do frame atual
             total_frames: Total de frames
 
         Returns:
             Fase do movimento: 'eccentric', 'bottom', 'concentric', 'top'
+
+        Raises:
+            ValueError: Se o exercício não estiver registrado
         """
+        exercise = self.registry.get(exercise_type)
+
         try:
-            if exercise_type in ['squat', 'back-squat', 'front-squat', 'goblet-squat']:
-                return self._detect_squat_phase(angles, frame_number, total_frames)
-            elif exercise_type in ['deadlift', 'romanian-deadlift']:
-                return self._detect_deadlift_phase(angles, frame_number, total_frames)
-            else:
-                return self._detect_generic_phase(frame_number, total_frames)
+            if exercise.phase_signal:
+                signal = sum(angles.get(column, 0) for column in exercise.phase_signal) / len(exercise.phase_signal)
+                if exercise.phase_top is not None and signal > exercise.phase_top:
+                    return 'top'
+                if exercise.phase_bottom is not None and signal < exercise.phase_bottom:
+                    return 'bottom'
+
+            relative_position = frame_number / total_frames
+            for phase, bound in exercise.phase_by_position:
+                if bound is None or relative_position < bound:
+                    return phase
 
         except Exception as e:
             logger.error(f"Error detecting phase: {str(e)}")
-            return 'unknown'
+        return 'unknown'
 
-    def _detect_squat_phase(
-        self,
-        angles: Dict[str, float],
-        frame_number: int,
-        total_frames: int
-    ) -> str:
+
+    def phase_tracker(self, exercise_type: str) -> PhaseTracker:
         """
-        Detecta fase do agachamento baseado no ângulo do joelho.
+        Detector de fase incremental (O(1) por frame) para uma série.
 
-        Fases:
-        - top: Posição inicial/final (joelho > 150°)
-        - eccentric: Descida (joelho diminuindo)
-        - bottom: Ponto mais baixo (joelho < 100°)
-        - concentric: Subida (joelho aumentando)
+        Raises:
+            ValueError: Se o exercício não estiver registrado
         """
-        knee_angle = (angles.get('knee_left', 0) + angles.get('knee_right', 0)) / 2
+        return PhaseTracker(self.registry.get(exercise_type))
 
-        # Heurística simples baseada em thresholds
-        if knee_angle > 150:
-            return 'top'
-        elif knee_angle < 100:
-            return 'bottom'
-        else:
-            # Usar posição relativa no vídeo como aproximação
-            relative_position = frame_number / total_frames
-            if relative_position < 0.4:
-                return 'eccentric'
-            elif relative_position < 0.6:
-                return 'bottom'
-            else:
-                return 'concentric'
-
-    def _detect_deadlift_phase(
+    def detect_sequence_phases(
         self,
-        angles: Dict[str, float],
-        frame_number: int,
-        total_frames: int
-    ) -> str:
-        """Detecta fase do deadlift."""
-        hip_angle = angles.get('hip', 0)
-
-        if hip_angle > 150:
-            return 'top'
-        elif hip_angle < 90:
-            return 'bottom'
-        else:
-            relative_position = frame_number / total_frames
-            if relative_position < 0.5:
-                return 'concentric'  # Subida
-            else:
-                return 'eccentric'   # Descida
-
-    def _detect_generic_phase(self, frame_number: int, total_frames: int) -> str:
-        """Detecção genérica baseada apenas na posição relativa."""
-        relative_position = frame_number / total_frames
-
-        if relative_position < 0.25:
-            return 'eccentric'
-        elif relative_position < 0.5:
-            return 'bottom'
-        elif relative_position < 0.75:
-            return 'concentric'
-        else:
-            return 'top'
+        table: np.ndarray,
+        exercise_type: str,
+        timestamps_ms: Optional[Any] = None
+    ) -> List[str]:
+        """
+        Fases de uma sequência inteira, com o mesmo PhaseTracker do streaming.
+
+        Args:
+            table: Tabela de calculate_sequence_angles (frames, n_ângulos)
+            exercise_type: Tipo de exercício (nome ou alias do registro)
+            timestamps_ms: Instante de cada frame; sem eles, frames a 30 fps
+
+        Returns:
+            Fase de cada frame
+        """
+        tracker = self.phase_tracker(exercise_type)
+        exercise = tracker.exercise
+        if not exercise.phase_signal:
+            return ['unknown'] * len(table)
+
+        # Sinal de todos os frames em uma operação; a máquina de estados só
+        # recebe escalares
+        columns = [exercise.columns.index(column) for column in exercise.phase_signal]
+        signals = table[:, columns]
+        detected = (signals != 0).all(axis=1)
+        signals = signals.mean(axis=1)
+        if timestamps_ms is None:
+            timestamps_ms = [None] * len(table)
+
+        return [
+            tracker.update_signal(signal, timestamp_ms) if ok else tracker.phase
+            for signal, ok, timestamp_ms in zip(signals.tolist(), detected.tolist(), timestamps_ms)
+        ]
 
     # ========== Funções Auxiliares ==========
 
-    def _get_landmark(self, landmarks: List[Dict], name: str) -> Optional[Dict]:
-        """Busca landmark por nome."""
+    def index_landmarks(self, landmarks: Landmarks) -> np.ndarray:
+        """
+        Landmarks como array (33, 3) de x, y, z em pixels, indexado pelo id
+        do MediaPipe (LANDMARK_IDS); landmarks ausentes ficam NaN.
+
+        Arrays já indexados são devolvidos sem cópia.
+        """
+        if isinstance(landmarks, np.ndarray):
+            return landmarks
+        if isinstance(landmarks, PoseFrame):
+            return landmarks.image[:, :3].astype(np.float64)
+
+        points = np.full((NUM_LANDMARKS, 3), np.nan)
         for landmark in landmarks:
-            if landmark.get('name') == name:
-                return landmark
-        return None
+            idx = landmark.get('id', self.LANDMARK_IDS.get(landmark.get('name')))
+            if idx is not None:
+                points[idx] = (landmark['x'], landmark['y'], landmark.get('z', 0.0))
+        return points
+
+    def _get_points(self, landmarks: Landmarks, *names: str) -> Optional[List[np.ndarray]]:
+        """
+        Coordenadas (x, y, z) das articulações pedidas.
+
+        Returns:
+            Um array por nome, ou None se alguma estiver ausente
+        """
+        points = self.index_landmarks(landmarks)
+        result = []
+        for name in names:
+            point = points[self.LANDMARK_IDS[name]]
+            if math.isnan(point[0]):
+                return None
+            result.append(point)
+        return result
 
     def _calculate_angle_3d(
         self,
@@ -508,9 +500,9 @@ class BiomechanicsEngine:
         Returns:
             Ângulo em graus (0-180)
         """
-        a = np.array(point_a)
-        b = np.array(point_b)
-        c = np.array(point_c)
+        a = np.asarray(point_a, dtype=np.float64)
+        b = np.asarray(point_b, dtype=np.float64)
+        c = np.asarray(point_c, dtype=np.float64)
 
         # Vetores BA e BC
         ba = a - b
@@ -554,16 +546,26 @@ class BiomechanicsEngine:
 
         return float(angle_deg)
 
-    def _get_default_angles(self) -> Dict[str, float]:
-        """Retorna ângulos padrão em caso de erro."""
-        return {
-            'knee_left': 0.0,
-            'knee_right': 0.0,
-            'hip': 0.0,
-            'trunk': 0.0,
-            'ankle_left': 0.0,
-            'ankle_right': 0.0,
-            'knee_valgus_left': 0.0,
-            'knee_valgus_right': 0.0,
-            'pelvic_tilt': 0.0
-        }
+    def _vector_angles(self, v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+        """
+        Versão vetorizada de _angle_between_vectors sobre o último eixo.
+
+        Returns:
+            Ângulos em graus (0-180); 0.0 para vetores nulos, NaN se faltar ponto
+        """
+        # Somas explícitas: com poucos vetores por chamada (um frame), o custo
+        # é o overhead das chamadas numpy, não a aritmética
+        norms = np.sqrt((v1 * v1).sum(axis=-1) * (v2 * v2).sum(axis=-1))
+        null = norms == 0
+        norms[null] = 1.0
+
+        cosine = (v1 * v2).sum(axis=-1) / norms
+        np.clip(cosine, -1.0, 1.0, out=cosine)
+        angles = np.degrees(np.arccos(cosine))
+        angles[null] = 0.0
+
+        return angles
+
+    def _get_default_angles(self, exercise: Exercise) -> Dict[str, float]:
+        """Retorna ângulos padrão (zerados) em caso de erro."""
+        return dict.fromkeys(exercise.columns, 0.0)
@@ -0,0 +1,84 @@
+"""
+Escolha do model_complexity por requisição, conforme a carga.
+
+Com vários modelos carregados (MODEL_COMPLEXITIES), cada requisição usa o
+mais pesado cuja latência prevista cabe no SLO (LATENCY_SLO_MS): fora do
+pico o heavy, no pico o lite, em vez de estourar o timeout. A previsão usa
+os frames já em processamento no worker (fila) e uma média móvel do tempo
+de inferência por frame de cada modelo.
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+# Estimativa inicial de segundos por frame (CPU) de cada modelo, corrigida
+# pela média móvel conforme as requisições terminam
+DEFAULT_SECONDS_PER_FRAME = {0: 0.03, 1: 0.05, 2: 0.15}
+
+
+class ComplexityPolicy:
+    """Escolhe o model_complexity de cada requisição (thread-safe)."""
+
+    def __init__(
+        self,
+        tiers: Iterable[int],
+        slo_seconds: float,
+        parallelism: int = 1,
+        smoothing: float = 0.2,
+        initial_seconds_per_frame: Optional[Dict[int, float]] = None
+    ):
+        """
+        Args:
+            tiers: Complexidades carregadas (0=lite, 1=full, 2=heavy)
+            slo_seconds: Latência alvo de uma requisição
+            parallelism: Frames processados em paralelo (processos do pool)
+            smoothing: Peso de cada nova medida na média móvel exponencial
+            initial_seconds_per_frame: Estimativa inicial por complexidade
+        """
+        self.tiers = sorted(set(tiers))
+        self.slo_seconds = slo_seconds
+        self.parallelism = max(1, int(parallelism))
+        self.smoothing = smoothing
+        initial = {**DEFAULT_SECONDS_PER_FRAME, **(initial_seconds_per_frame or {})}
+        self.seconds_per_frame = {tier: initial[tier] for tier in self.tiers}
+        self._lock = threading.Lock()
+
+    @property
+    def adaptive(self) -> bool:
+        return len(self.tiers) > 1
+
+    def predict(self, tier: int, frames: int, queued_frames: int) -> float:
+        """Latência prevista (s) de frames novos atrás de queued_frames."""
+        with self._lock:
+            seconds_per_frame = self.seconds_per_frame[tier]
+        return (queued_frames + frames) * seconds_per_frame / self.parallelism
+
+    def choose(self, frames: int, queued_frames: int) -> int:
+        """
+        Modelo mais pesado cuja latência prevista cabe no SLO; se nenhum
+        couber, o mais leve.
+
+        Args:
+            frames: Frames da requisição
+            queued_frames: Frames já em processamento no worker
+        """
+        for tier in reversed(self.tiers):
+            if self.predict(tier, frames, queued_frames) <= self.slo_seconds:
+                return tier
+        return self.tiers[0]
+
+    def observe(self, tier: int, frames: int, busy_seconds: float) -> None:
+        """
+        Atualiza a estimativa de tempo por frame de um modelo.
+
+        Args:
+            tier: Complexidade usada
+            frames: Frames inferidos
+            busy_seconds: Tempo de inferência somado entre os frames
+                (decode + inference + extraction)
+        """
+        if frames <= 0 or tier not in self.seconds_per_frame:
+            return
+        sample = busy_seconds / frames
+        with self._lock:
+            self.seconds_per_frame[tier] += self.smoothing * (sample - self.seconds_per_frame[tier])
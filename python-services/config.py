@@ -3,7 +3,7 @@ Configurações do serviço MediaPipe.
 """
 
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 
 class Config:
@@ -18,11 +18,46 @@ class Config:
     MODEL_COMPLEXITY = int(os.getenv('MODEL_COMPLEXITY', 1))  # 0=lite, 1=full, 2=heavy
     MIN_DETECTION_CONFIDENCE = float(os.getenv('MIN_DETECTION_CONFIDENCE', 0.7))
     MIN_TRACKING_CONFIDENCE = float(os.getenv('MIN_TRACKING_CONFIDENCE', 0.7))
+    # Modelos extras carregados (ex.: "0,1,2"); com mais de um, a complexidade
+    # de cada requisição é escolhida pela carga (ver model_complexities)
+    MODEL_COMPLEXITIES = [int(c) for c in os.getenv('MODEL_COMPLEXITIES', '').split(',') if c.strip()]
+    LATENCY_SLO_MS = int(os.getenv('LATENCY_SLO_MS', 2000))  # Alvo de latência por requisição
+    # Cascata: frames difíceis no modelo base são reprocessados neste (vazio = desativada)
+    CASCADE_COMPLEXITY = int(os.getenv('CASCADE_COMPLEXITY')) if os.getenv('CASCADE_COMPLEXITY') else None
+    CASCADE_CONFIDENCE = float(os.getenv('CASCADE_CONFIDENCE', 0.7))
 
     # Performance
-    MAX_WORKERS = int(os.getenv('MAX_WORKERS', 4))
+    MAX_WORKERS = int(os.getenv('MAX_WORKERS', 4))  # processos de inferência por container
+    GUNICORN_WORKERS = int(os.getenv('GUNICORN_WORKERS', 1))  # exportado pelo gunicorn.conf.py
     TIMEOUT_SECONDS = int(os.getenv('TIMEOUT_SECONDS', 30))
     MAX_FRAMES_PER_REQUEST = int(os.getenv('MAX_FRAMES_PER_REQUEST', 20))
+    MAX_INFLIGHT_FRAMES = int(os.getenv('MAX_INFLIGHT_FRAMES', 40))  # por worker; 0 = sem limite
+    WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'  # /ready só após o warm-up
+    # Warm-up também de tracking, modelos extras e cascata (padrão: só o detector estático do modelo padrão)
+    WARMUP_ALL_MODELS = os.getenv('WARMUP_ALL_MODELS', 'false').lower() == 'true'
+    ROI_CROP_ENABLED = os.getenv('ROI_CROP_ENABLED', 'true').lower() == 'true'  # recorte na pose anterior (sequence)
+    MAX_INPUT_SIDE = int(os.getenv('MAX_INPUT_SIDE', 960))  # lado maior inferido, em pixels; 0 = resolução original
+
+    # Exercícios: JSON com declarações extras (ou substitutas) às de exercises.json
+    EXERCISES_FILE = os.getenv('EXERCISES_FILE', '')
+
+    # Jobs assíncronos (/jobs)
+    # memory ou redis; sem valor, redis quando REDIS_HOST estiver definido
+    JOB_BACKEND = os.getenv('JOB_BACKEND') or ('redis' if os.getenv('REDIS_HOST') else 'memory')
+    JOB_WORKER_THREADS = int(os.getenv('JOB_WORKER_THREADS', 1))  # por worker do gunicorn
+    JOB_BATCH_SIZE = int(os.getenv('JOB_BATCH_SIZE', 16))  # frames por lote
+    JOB_TTL = int(os.getenv('JOB_TTL', 86400))  # resultados ficam 24 horas
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 120))  # sem heartbeat por esse tempo, o job é retomado
+    MAX_FRAMES_PER_JOB = int(os.getenv('MAX_FRAMES_PER_JOB', 1800))  # 60s a 30 fps
+
+    # Detectores por worker (um por thread que infere: gunicorn + JobWorker)
+    DETECTOR_POOL_SIZE = int(os.getenv(
+        'DETECTOR_POOL_SIZE',
+        int(os.getenv('GUNICORN_THREADS', 2)) + JOB_WORKER_THREADS
+    ))
+
+    # Vídeo (/analyze-video)
+    VIDEO_SAMPLE_FPS = float(os.getenv('VIDEO_SAMPLE_FPS', 5))  # Amostragem padrão
 
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -36,10 +71,14 @@ class Config:
     REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
     REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
     REDIS_DB = int(os.getenv('REDIS_DB', 0))
+    REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', '')
+    REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 0.1))  # segundos
     CACHE_TTL = int(os.getenv('CACHE_TTL', 3600))  # 1 hora
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))  # LRU em memória
 
     # Limites de segurança
     MAX_IMAGE_SIZE_MB = int(os.getenv('MAX_IMAGE_SIZE_MB', 10))
+    MAX_REQUEST_SIZE_MB = int(os.getenv('MAX_REQUEST_SIZE_MB', 100))  # corpo inteiro (frames ou vídeo)
     ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'bmp'}
 
     # Diretórios temporários
@@ -58,6 +97,20 @@ class Config:
             if not key.startswith('_') and key.isupper()
         }
 
+    @classmethod
+    def model_complexities(cls) -> List[int]:
+        """Complexidades carregadas: MODEL_COMPLEXITIES + MODEL_COMPLEXITY."""
+        return sorted(set(cls.MODEL_COMPLEXITIES) | {cls.MODEL_COMPLEXITY})
+
+    @classmethod
+    def inference_processes(cls) -> int:
+        """
+        Processos de inferência de cada worker do gunicorn: MAX_WORKERS
+        dividido entre os workers, para o container não passar de
+        MAX_WORKERS processos. Com 1, a inferência roda inline no worker.
+        """
+        return max(1, cls.MAX_WORKERS // max(1, cls.GUNICORN_WORKERS))
+
     @classmethod
     def validate(cls) -> bool:
         """Valida configurações"""
@@ -65,6 +118,16 @@ class Config:
         if cls.MODEL_COMPLEXITY not in [0, 1, 2]:
             raise ValueError(f"Invalid MODEL_COMPLEXITY: {cls.MODEL_COMPLEXITY}")
 
+        for complexity in cls.MODEL_COMPLEXITIES:
+            if complexity not in [0, 1, 2]:
+                raise ValueError(f"Invalid MODEL_COMPLEXITIES entry: {complexity}")
+
+        if cls.CASCADE_COMPLEXITY is not None and cls.CASCADE_COMPLEXITY not in [0, 1, 2]:
+            raise ValueError(f"Invalid CASCADE_COMPLEXITY: {cls.CASCADE_COMPLEXITY}")
+
+        if not 0 <= cls.CASCADE_CONFIDENCE <= 1:
+            raise ValueError(f"Invalid CASCADE_CONFIDENCE: {cls.CASCADE_CONFIDENCE}")
+
         # Verificar confidence thresholds
         if not 0 <= cls.MIN_DETECTION_CONFIDENCE <= 1:
             raise ValueError(f"Invalid MIN_DETECTION_CONFIDENCE: {cls.MIN_DETECTION_CONFIDENCE}")
@@ -72,6 +135,13 @@ class Config:
         if not 0 <= cls.MIN_TRACKING_CONFIDENCE <= 1:
             raise ValueError(f"Invalid MIN_TRACKING_CONFIDENCE: {cls.MIN_TRACKING_CONFIDENCE}")
 
+        if cls.EXERCISES_FILE and not os.path.isfile(cls.EXERCISES_FILE):
+            raise ValueError(f"EXERCISES_FILE not found: {cls.EXERCISES_FILE}")
+
+        # Verificar backend de jobs
+        if cls.JOB_BACKEND not in ['memory', 'redis']:
+            raise ValueError(f"Invalid JOB_BACKEND: {cls.JOB_BACKEND}")
+
         return True
 
 
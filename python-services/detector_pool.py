@@ -0,0 +1,116 @@
+"""
+Pool de PoseDetectors com checkout/checkin.
+
+Um grafo do MediaPipe Pose não pode ser chamado por duas threads ao mesmo
+tempo. Cada worker do gunicorn roda várias threads (requisições e
+JobWorker), então cada uma pega um detector exclusivo do pool durante a
+inferência e o devolve ao terminar; quando todos estão em uso, a thread
+espera (tempo reportado em on_wait, para métricas).
+"""
+
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+import numpy as np
+
+from pose_detector import PoseDetector
+
+logger = logging.getLogger(__name__)
+
+
+class DetectorPool:
+    """Pool thread-safe de detectores, criados sob demanda até size."""
+
+    def __init__(
+        self,
+        factory: Callable[[], PoseDetector],
+        size: int,
+        detectors: Optional[List[PoseDetector]] = None
+    ):
+        """
+        Args:
+            factory: Cria um detector novo
+            size: Máximo de detectores (threads que inferem em paralelo)
+            detectors: Detectores já criados, usados antes de chamar factory
+        """
+        self.factory = factory
+        self.size = max(1, int(size))
+        self._idle: List[PoseDetector] = list(detectors or [])[:self.size]
+        self._created = len(self._idle)
+        self._available = threading.Condition()
+        self._warmed = False
+        self.on_wait: Optional[Callable[[float], None]] = None
+
+    @property
+    def in_use(self) -> int:
+        with self._available:
+            return self._created - len(self._idle)
+
+    def acquire(self) -> PoseDetector:
+        """Retira um detector do pool, esperando se todos estiverem em uso."""
+        started = time.perf_counter()
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                self._available.wait()
+
+            if self._idle:
+                detector = self._idle.pop()
+            else:
+                # Reserva a vaga antes de criar o detector fora do lock
+                self._created += 1
+                detector = None
+
+        if detector is None:
+            try:
+                detector = self.factory()
+            except Exception:
+                with self._available:
+                    self._created -= 1
+                    self._available.notify()
+                raise
+
+        if self.on_wait is not None:
+            self.on_wait(time.perf_counter() - started)
+        return detector
+
+    def release(self, detector: PoseDetector) -> None:
+        """Devolve um detector obtido com acquire."""
+        with self._available:
+            self._idle.append(detector)
+            self._available.notify()
+
+    @contextmanager
+    def checkout(self) -> Iterator[PoseDetector]:
+        """Detector exclusivo durante o bloco with."""
+        detector = self.acquire()
+        try:
+            yield detector
+        finally:
+            self.release(detector)
+
+    def warm_up(self, image: np.ndarray, count: Optional[int] = None, cascade: bool = True) -> None:
+        """
+        Cria os detectores do pool e roda a primeira inferência em cada um
+        (só na primeira chamada: o pool pode ser compartilhado).
+
+        Args:
+            image: Imagem do warm-up
+            count: Detectores aquecidos agora (padrão: size); os demais são
+                criados sob demanda
+            cascade: Aquecer também o grafo da cascata (PoseDetector.warm_up)
+        """
+        if self._warmed:
+            return
+        count = self.size if count is None else max(1, min(count, self.size))
+        detectors = [self.acquire() for _ in range(count)]
+        try:
+            for detector in detectors:
+                detector.warm_up(image, cascade=cascade)
+        finally:
+            for detector in detectors:
+                self.release(detector)
+        self._warmed = True
+        logger.info(f"DetectorPool warmed up with {count}/{self.size} detectors")
@@ -0,0 +1,245 @@
+"""
+Registro declarativo de exercícios.
+
+Cada exercício (exercises.json, mais o arquivo opcional EXERCISES_FILE)
+declara os ângulos que calcula e como detectar a fase:
+
+    "squat": {
+        "aliases": ["back-squat", "agachamento"],
+        "angles": {
+            "knee_left": {"joint": ["left_hip", "left_knee", "left_ankle"]},
+            "trunk": {"vertical": [["left_hip", "right_hip"], ["left_shoulder", "right_shoulder"]]}
+        },
+        "phase": {"signal": ["knee_left"], "top": 150, "bottom": 100, "falling": "eccentric",
+                  "by_position": [["eccentric", 0.4], ["bottom", 0.6], ["concentric", null]]}
+    }
+
+Tipos de ângulo:
+- joint: A -> B -> C com vértice em B; uma lista de triplets usa a média
+- dorsiflexion: 90° menos o ângulo joint (0° em pé)
+- vertical / horizontal: segmento [de, para] contra a vertical (para cima)
+  ou a horizontal da imagem, em 2D; uma lista de nomes usa o ponto médio
+- valgus: desvio lateral do joelho (B) em relação à linha quadril-tornozelo
+
+A fase de uma sequência vem do PhaseTracker (velocidade do sinal suavizado,
+com histerese; "falling" diz se o sinal cai na excêntrica ou na
+concêntrica); by_position só é usado por detect_phase, sem histórico.
+
+Na carga cada exercício é compilado em arrays de índices de landmarks,
+usados pelo kernel vetorizado do BiomechanicsEngine: só os ângulos
+declarados são calculados. Exercícios novos entram sem mudar código.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pose_frame import LANDMARK_IDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXERCISES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exercises.json')
+
+ANGLE_KINDS = ('joint', 'dorsiflexion', 'vertical', 'horizontal', 'valgus')
+
+# Parâmetros padrão do PhaseTracker (sobrescritos por exercício em "phase")
+PHASE_DEFAULTS = {
+    'smoothing_ms': 100,     # Constante de tempo do filtro alfa-beta do sinal
+    'velocity_enter': 30.0,  # °/s para considerar o movimento iniciado
+    'velocity_exit': 15.0,   # °/s abaixo do qual o movimento parou
+}
+
+# Direção de referência (x, y) na imagem; y aponta para baixo
+REFERENCE_VECTORS = {
+    'vertical': (0.0, -1.0),
+    'horizontal': (1.0, 0.0),
+}
+
+
+def normalize_exercise_name(name: Any) -> str:
+    """Nome comparável: minúsculas, com espaços e '_' como '-'."""
+    return str(name).strip().lower().replace('_', '-').replace(' ', '-')
+
+
+class Exercise:
+    """Exercício compilado: colunas de ângulos, índices do kernel e regra de fase."""
+
+    def __init__(self, name: str, definition: Dict[str, Any]):
+        """
+        Args:
+            name: Nome canônico
+            definition: Declaração do exercício (ver docstring do módulo)
+
+        Raises:
+            ValueError: Se a declaração for inválida
+        """
+        self.name = name
+        self.aliases = tuple(definition.get('aliases', ()))
+
+        angles = definition.get('angles')
+        if not angles:
+            raise ValueError(f"Exercise {name}: no angles declared")
+        self.columns: Tuple[str, ...] = tuple(angles)
+
+        # joint/dorsiflexion: triplets contíguos por coluna (média via reduceat)
+        triplets: List[List[int]] = []
+        joint_starts, joint_columns, dorsiflexion = [], [], []
+        # vertical/horizontal: pares de pontos (iguais quando não é ponto médio)
+        reference_from, reference_to, reference_vectors, reference_columns = [], [], [], []
+        valgus, valgus_columns = [], []
+
+        for column, (kind, points) in enumerate(self._angle_kinds(angles)):
+            if kind in ('joint', 'dorsiflexion'):
+                if isinstance(points[0], str):
+                    points = [points]
+                joint_starts.append(len(triplets))
+                joint_columns.append(column)
+                dorsiflexion.append(kind == 'dorsiflexion')
+                triplets.extend(self._landmark_ids(triplet, 3) for triplet in points)
+            elif kind in REFERENCE_VECTORS:
+                start, end = self._landmark_ids(points, 2, midpoints=True)
+                reference_from.append(start)
+                reference_to.append(end)
+                reference_vectors.append(REFERENCE_VECTORS[kind])
+                reference_columns.append(column)
+            else:
+                valgus.append(self._landmark_ids(points, 3))
+                valgus_columns.append(column)
+
+        self.joint_ids = np.array(triplets, dtype=np.intp).reshape(-1, 3)
+        self.joint_starts = np.array(joint_starts, dtype=np.intp)
+        self.joint_counts = np.diff(np.append(self.joint_starts, len(triplets)))
+        self.joint_columns = np.array(joint_columns, dtype=np.intp)
+        self.dorsiflexion = np.array(dorsiflexion, dtype=bool)
+        self.reference_from = np.array(reference_from, dtype=np.intp).reshape(-1, 2)
+        self.reference_to = np.array(reference_to, dtype=np.intp).reshape(-1, 2)
+        self.reference_vectors = np.array(reference_vectors, dtype=np.float64).reshape(-1, 2)
+        self.reference_columns = np.array(reference_columns, dtype=np.intp)
+        self.valgus_ids = np.array(valgus, dtype=np.intp).reshape(-1, 3)
+        self.valgus_columns = np.array(valgus_columns, dtype=np.intp)
+
+        self._compile_phase(definition.get('phase') or {})
+
+    def _angle_kinds(self, angles: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        """Tipo e pontos de cada ângulo declarado, na ordem das colunas."""
+        result = []
+        for column, spec in angles.items():
+            kinds = [kind for kind in ANGLE_KINDS if kind in spec]
+            if len(kinds) != 1:
+                raise ValueError(
+                    f"Exercise {self.name}: angle {column} must declare one of {', '.join(ANGLE_KINDS)}"
+                )
+            result.append((kinds[0], spec[kinds[0]]))
+        return result
+
+    def _landmark_ids(self, names: Sequence[Any], count: int, midpoints: bool = False) -> List[Any]:
+        """Ids dos landmarks; com midpoints, cada item vira um par de ids."""
+        if len(names) != count:
+            raise ValueError(f"Exercise {self.name}: expected {count} landmarks, got {list(names)}")
+
+        ids = []
+        for item in names:
+            group = [item] if isinstance(item, str) else list(item)
+            unknown = [landmark for landmark in group if landmark not in LANDMARK_IDS]
+            if unknown or (not midpoints and len(group) != 1) or len(group) > 2:
+                raise ValueError(f"Exercise {self.name}: invalid landmark {item}")
+            group_ids = [LANDMARK_IDS[landmark] for landmark in group]
+            ids.append((group_ids * 2)[:2] if midpoints else group_ids[0])
+        return ids
+
+    def _compile_phase(self, phase: Dict[str, Any]) -> None:
+        """Sinal (média de ângulos), limiares e fases por posição no vídeo."""
+        self.phase_signal: Tuple[str, ...] = tuple(phase.get('signal', ()))
+        unknown = [column for column in self.phase_signal if column not in self.columns]
+        if unknown:
+            raise ValueError(f"Exercise {self.name}: phase signal uses undeclared angles {unknown}")
+
+        self.phase_top: Optional[float] = phase.get('top')
+        self.phase_bottom: Optional[float] = phase.get('bottom')
+        self.phase_by_position: List[Tuple[str, Optional[float]]] = [
+            (phase_name, bound) for phase_name, bound in phase.get('by_position', [['unknown', None]])
+        ]
+        if self.phase_by_position[-1][1] is not None:
+            raise ValueError(f"Exercise {self.name}: last by_position entry must have a null bound")
+
+        # Fase em que o sinal cai (ex.: joelho fechando no squat = eccentric)
+        self.phase_falling: str = phase.get('falling', 'eccentric')
+        if self.phase_falling not in ('eccentric', 'concentric'):
+            raise ValueError(f"Exercise {self.name}: falling must be eccentric or concentric")
+
+        self.phase_smoothing_ms = float(phase.get('smoothing_ms', PHASE_DEFAULTS['smoothing_ms']))
+        self.phase_velocity_enter = float(phase.get('velocity_enter', PHASE_DEFAULTS['velocity_enter']))
+        self.phase_velocity_exit = float(phase.get('velocity_exit', PHASE_DEFAULTS['velocity_exit']))
+        if not 0 <= self.phase_velocity_exit <= self.phase_velocity_enter:
+            raise ValueError(f"Exercise {self.name}: velocity_exit must be between 0 and velocity_enter")
+
+    def __repr__(self) -> str:
+        return f"Exercise({self.name!r}, columns={list(self.columns)})"
+
+
+class ExerciseRegistry:
+    """Exercícios compilados, por nome canônico ou alias."""
+
+    def __init__(self, definitions: Dict[str, Dict[str, Any]]):
+        """
+        Args:
+            definitions: Declarações por nome canônico
+
+        Raises:
+            ValueError: Se alguma declaração for inválida ou um alias repetir
+        """
+        self._exercises: Dict[str, Exercise] = {}
+        self._lookup: Dict[str, Exercise] = {}
+
+        for name, definition in definitions.items():
+            exercise = Exercise(normalize_exercise_name(name), definition)
+            self._exercises[exercise.name] = exercise
+            for key in (exercise.name, *exercise.aliases):
+                key = normalize_exercise_name(key)
+                if key in self._lookup:
+                    raise ValueError(f"Exercise name {key} declared twice")
+                self._lookup[key] = exercise
+
+    @classmethod
+    def load(cls, extra_file: Optional[str] = None) -> 'ExerciseRegistry':
+        """
+        Carrega exercises.json e, se informado, um arquivo extra cujas
+        declarações acrescentam ou substituem exercícios pelo nome.
+        """
+        definitions = cls._read(DEFAULT_EXERCISES_FILE)
+        if extra_file:
+            extra = cls._read(extra_file)
+            definitions.update(extra)
+            logger.info(f"Loaded {len(extra)} exercise definitions from {extra_file}")
+        return cls(definitions)
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, Dict[str, Any]]:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    @property
+    def names(self) -> List[str]:
+        """Nomes canônicos, na ordem de declaração."""
+        return list(self._exercises)
+
+    def get(self, exercise_type: str) -> Exercise:
+        """
+        Exercício pelo nome ou alias.
+
+        Raises:
+            ValueError: Se o exercício não estiver registrado
+        """
+        exercise = self._lookup.get(normalize_exercise_name(exercise_type))
+        if exercise is None:
+            raise ValueError(f"Unknown exercise_type: {exercise_type}. Allowed: {', '.join(self.names)}")
+        return exercise
+
+    def __contains__(self, exercise_type: Any) -> bool:
+        return normalize_exercise_name(exercise_type) in self._lookup
+
+    def __len__(self) -> int:
+        return len(self._exercises)
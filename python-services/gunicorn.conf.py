@@ -0,0 +1,76 @@
+"""
+Configuração do gunicorn para o serviço MediaPipe.
+
+Uso:
+    gunicorn --config gunicorn.conf.py mediapipe_service:app
+
+Métricas: com vários workers, cada um tem seus próprios contadores. Com
+PROMETHEUS_MULTIPROC_DIR definido, o prometheus_client grava as métricas
+de cada processo em arquivos nesse diretório e /metrics agrega todos,
+independente de qual worker atende o scrape.
+
+Preload: com preload_app o módulo do serviço é importado uma vez no master
+(mediapipe, OpenCV; pesos lite/heavy baixados uma vez) e os workers herdam
+os imports copy-on-write no fork, em vez de cada um importar tudo de novo.
+O grafo do MediaPipe de cada worker, com seus pesos, só é criado depois do
+fork (warm-up em post_worker_init) e não é compartilhado.
+
+Processos de inferência: MAX_WORKERS vale para o container inteiro e é
+dividido entre os GUNICORN_WORKERS (ver Config.inference_processes); com
+4 e 4, cada worker infere inline, sem pool de processos.
+"""
+
+import os
+import shutil
+
+# Servidor
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+# Exportado para o serviço dividir MAX_WORKERS entre os workers
+workers = int(os.environ.setdefault('GUNICORN_WORKERS', '4'))
+threads = int(os.getenv('GUNICORN_THREADS', 2))
+worker_class = 'sync'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))  # acima de TIMEOUT_SECONDS
+keepalive = 5
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Logging
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+accesslog = '-'
+errorlog = '-'
+
+# Diretório compartilhado das métricas (herdado pelos workers)
+prometheus_multiproc_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    '/tmp/prometheus_multiproc'
+)
+# Precisa existir antes do preload (as métricas são criadas no import)
+os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def on_starting(server):
+    """
+    Limpa métricas de execuções anteriores antes de iniciar os workers.
+
+    Roda depois do preload; os arquivos do próprio master são descartados
+    junto (ele não atende requisições).
+    """
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Remove os gauges do worker encerrado (livesum só soma workers vivos)."""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    """
+    Inicializa o worker: gauges por processo e warm-up dos modelos em
+    background (/ready responde 503 até lá).
+    """
+    from mediapipe_service import init_worker
+    init_worker()
@@ -0,0 +1,445 @@
+"""
+Pool de processos para inferência MediaPipe em paralelo.
+Cada processo do pool carrega seu próprio PoseDetector uma única vez e
+processa frames de forma independente; os resultados voltam na ordem original.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from pose_detector import PoseDetector, ImageSource
+from detector_pool import DetectorPool
+
+logger = logging.getLogger(__name__)
+
+# Detectores do processo worker (criados uma vez por processo), por
+# (static_image_mode, model_complexity)
+_worker_kwargs: Dict[str, Any] = {}
+_worker_detectors: Dict[Tuple[bool, int], PoseDetector] = {}
+
+# Tempo que cada ping do warm-up ocupa o processo, para que os já prontos
+# não respondam todos os pings de uma rodada
+PING_HOLD_SECONDS = 0.05
+
+
+def _init_worker(
+    detector_kwargs: Dict[str, Any],
+    warm_up_image: Optional[np.ndarray] = None,
+    model_complexities: Tuple[int, ...] = ()
+) -> None:
+    """
+    Inicializa o PoseDetector estático do processo worker.
+
+    Com warm_up_image, roda uma inferência no detector estático do modelo
+    padrão antes de aceitar tarefas, para o primeiro frame real não pagar a
+    inicialização do grafo. Com model_complexities, aquece também tracking
+    e cascata de cada uma (WARMUP_ALL_MODELS); os demais grafos são criados
+    no primeiro uso.
+    """
+    global _worker_kwargs
+    _worker_kwargs = dict(detector_kwargs)
+    detector = _get_worker_detector(static_image_mode=True)
+
+    if warm_up_image is None:
+        return
+    if not model_complexities:
+        detector.warm_up(warm_up_image, cascade=False)
+    for complexity in model_complexities:
+        _get_worker_detector(True, complexity).warm_up(warm_up_image)
+        _get_worker_detector(False, complexity).warm_up(warm_up_image)
+
+
+def _ping(hold_seconds: float = 0.0) -> int:
+    """
+    Tarefa vazia: só roda depois do initializer do processo.
+
+    Returns:
+        PID do processo que respondeu
+    """
+    if hold_seconds > 0:
+        time.sleep(hold_seconds)
+    return os.getpid()
+
+
+def _get_worker_detector(static_image_mode: bool, model_complexity: Optional[int] = None) -> PoseDetector:
+    """Retorna o detector do worker para o modo e complexidade pedidos (lazy)."""
+    kwargs = dict(_worker_kwargs, static_image_mode=static_image_mode)
+    if model_complexity is not None:
+        kwargs['model_complexity'] = model_complexity
+
+    key = (static_image_mode, kwargs.get('model_complexity'))
+    if key not in _worker_detectors:
+        _worker_detectors[key] = PoseDetector(**kwargs)
+    return _worker_detectors[key]
+
+
+def _process_in_worker(
+    image: ImageSource,
+    include: Optional[Iterable[str]],
+    model_complexity: Optional[int] = None
+) -> Dict[str, Any]:
+    """Processa uma imagem no detector estático do processo worker."""
+    return _get_worker_detector(True, model_complexity).process_image(image, include)
+
+
+def _process_sequence_in_worker(
+    images: List[ImageSource],
+    include: Optional[Iterable[str]],
+    deadline: Optional[float],
+    model_complexity: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Processa uma sequência de frames no detector com tracking do worker."""
+    return _get_worker_detector(False, model_complexity).process_sequence(images, include, deadline)
+
+
+def _expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.time() >= deadline
+
+
+class InferencePool:
+    """
+    Pool de PoseDetectors em processos separados.
+
+    Com size <= 1 o processamento é feito inline, no processo atual,
+    sem criar processos filhos, com detectores emprestados de pools
+    (estático e tracking) para que threads concorrentes não compartilhem
+    um grafo.
+
+    Cada chamada pode escolher um dos model_complexities carregados; sem
+    escolha, vale o model_complexity de detector_kwargs.
+
+    active_tasks conta os frames/sequências submetidos e ainda não
+    concluídos; on_active_change (opcional) é chamado com o novo valor a
+    cada mudança (métrica de utilização do pool).
+    """
+
+    def __init__(
+        self,
+        size: int,
+        detector_kwargs: Dict[str, Any],
+        inline_detectors: Optional[Dict[int, DetectorPool]] = None,
+        warm_up_image: Optional[np.ndarray] = None,
+        model_complexities: Optional[Iterable[int]] = None,
+        warm_up_all: bool = False
+    ):
+        """
+        Inicializa o pool (os processos só são criados no primeiro uso).
+
+        Args:
+            size: Número de processos (Config.inference_processes)
+            detector_kwargs: Argumentos do PoseDetector de cada processo
+            inline_detectors: Detectores estáticos por model_complexity,
+                usados quando size <= 1; os pools de tracking inline têm o
+                mesmo tamanho
+            warm_up_image: Imagem processada por cada processo ao iniciar
+            model_complexities: Complexidades aceitas (padrão: as chaves de
+                inline_detectors, ou só a de detector_kwargs)
+            warm_up_all: Aquecer também os detectores de tracking, os
+                modelos extras e a cascata (padrão: só o detector estático
+                do modelo padrão; os demais no primeiro uso)
+        """
+        self.size = max(1, int(size))
+        self.detector_kwargs = dict(detector_kwargs)
+        self.warm_up_image = warm_up_image
+        self.warm_up_all = warm_up_all
+        self.model_complexity = self.detector_kwargs.get('model_complexity', 1)
+        self.model_complexities = tuple(sorted(
+            model_complexities or (inline_detectors or {}) or (self.model_complexity,)
+        ))
+
+        inline_detectors = dict(inline_detectors or {})
+        pool_size = max((pool.size for pool in inline_detectors.values()), default=1)
+        self.inline_detectors: Dict[int, DetectorPool] = {}
+        self.inline_tracking_detectors: Dict[int, DetectorPool] = {}
+        for complexity in self.model_complexities:
+            self.inline_detectors[complexity] = inline_detectors.get(complexity) or DetectorPool(
+                lambda complexity=complexity: PoseDetector(**self._detector_kwargs(complexity)),
+                size=pool_size
+            )
+            self.inline_tracking_detectors[complexity] = DetectorPool(
+                lambda complexity=complexity: PoseDetector(
+                    **self._detector_kwargs(complexity),
+                    static_image_mode=False
+                ),
+                size=pool_size
+            )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.active_tasks = 0
+        self.on_active_change: Optional[Callable[[int], None]] = None
+        self._active_lock = threading.Lock()
+
+    def _detector_kwargs(self, model_complexity: int) -> Dict[str, Any]:
+        return dict(self.detector_kwargs, model_complexity=model_complexity)
+
+    def _resolve_complexity(self, model_complexity: Optional[int]) -> int:
+        """Complexidade da chamada (None = padrão); precisa estar carregada."""
+        if model_complexity is None:
+            return self.model_complexity
+        if model_complexity not in self.model_complexities:
+            raise ValueError(f"model_complexity {model_complexity} is not loaded in this pool")
+        return model_complexity
+
+    def _task_started(self) -> None:
+        with self._active_lock:
+            self.active_tasks += 1
+            active = self.active_tasks
+        if self.on_active_change is not None:
+            self.on_active_change(active)
+
+    def _task_finished(self, _future=None) -> None:
+        with self._active_lock:
+            self.active_tasks -= 1
+            active = self.active_tasks
+        if self.on_active_change is not None:
+            self.on_active_change(active)
+
+    def _submit(self, executor: ProcessPoolExecutor, fn, *args):
+        """Submete uma tarefa contabilizando-a em active_tasks."""
+        future = executor.submit(fn, *args)
+        self._task_started()
+        future.add_done_callback(self._task_finished)
+        return future
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Cria o executor sob demanda (após o fork do gunicorn)."""
+        if self._executor is None:
+            # spawn: o grafo do MediaPipe/TFLite não é seguro após fork
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.size,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(
+                    self.detector_kwargs,
+                    self.warm_up_image,
+                    self.model_complexities if self.warm_up_all else ()
+                )
+            )
+            logger.info(f"InferencePool started with {self.size} processes")
+        return self._executor
+
+    def map_images(
+        self,
+        images: List[ImageSource],
+        include: Optional[Iterable[str]] = None,
+        deadline: Optional[float] = None,
+        model_complexity: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Processa imagens em paralelo.
+
+        Args:
+            images: Caminhos das imagens ou frames BGR já decodificados
+            include: Estruturas opcionais de landmarks (ver PoseDetector.process_image)
+            deadline: Instante (time.time()) limite; ver imap_images
+            model_complexity: Modelo a usar (um de model_complexities)
+
+        Returns:
+            Lista de resultados do PoseDetector, na mesma ordem de images
+        """
+        return list(self.imap_images(images, include, deadline, model_complexity))
+
+    def imap_images(
+        self,
+        images: List[ImageSource],
+        include: Optional[Iterable[str]] = None,
+        deadline: Optional[float] = None,
+        model_complexity: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Processa imagens em paralelo, produzindo cada resultado assim que
+        ele (e todos os anteriores) estiver pronto.
+
+        No máximo 2 frames por processo ficam submetidos ao executor; os
+        demais só são despachados conforme os resultados saem. Ao atingir o
+        deadline nenhum frame novo é despachado, os pendentes são cancelados
+        e a iteração termina (com menos resultados que images).
+
+        Args:
+            images: Caminhos das imagens ou frames BGR já decodificados
+            include: Estruturas opcionais de landmarks (ver PoseDetector.process_image)
+            deadline: Instante (time.time()) limite, ou None
+            model_complexity: Modelo a usar (um de model_complexities)
+
+        Yields:
+            Resultados do PoseDetector, na mesma ordem de images
+        """
+        if not images:
+            return
+
+        include = tuple(include) if include is not None else None
+        model_complexity = self._resolve_complexity(model_complexity)
+
+        if self.size <= 1:
+            detectors = self.inline_detectors[model_complexity]
+            for image in images:
+                if _expired(deadline):
+                    logger.warning("Deadline reached, skipping remaining frames")
+                    return
+                self._task_started()
+                try:
+                    # Um frame por checkout: o detector não fica preso
+                    # enquanto o consumidor processa o resultado
+                    with detectors.checkout() as detector:
+                        result = detector.process_image(image, include)
+                finally:
+                    self._task_finished()
+                yield result
+            return
+
+        with self._guarded_executor() as executor:
+            yield from self._imap_windowed(executor, images, include, deadline, model_complexity)
+
+    def _imap_windowed(
+        self,
+        executor: ProcessPoolExecutor,
+        images: List[ImageSource],
+        include: Optional[tuple],
+        deadline: Optional[float],
+        model_complexity: int
+    ) -> Iterator[Dict[str, Any]]:
+        pending = deque()
+        remaining = iter(images)
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < self.size * 2 and not _expired(deadline):
+                    image = next(remaining, None)
+                    if image is None:
+                        exhausted = True
+                        break
+                    pending.append(self._submit(executor, _process_in_worker, image, include, model_complexity))
+
+                if not pending:
+                    if not exhausted:
+                        logger.warning("Deadline reached, skipping remaining frames")
+                    return
+
+                future = pending[0]
+                timeout = None if deadline is None else max(0.0, deadline - time.time())
+                try:
+                    result = future.result(timeout=timeout)
+                except FuturesTimeoutError:
+                    logger.warning("Deadline reached while waiting for inference")
+                    return
+
+                pending.popleft()
+                yield result
+        finally:
+            # Frames ainda não iniciados não ocupam os processos após o retorno
+            for future in pending:
+                future.cancel()
+
+    def map_sequence(
+        self,
+        images: List[ImageSource],
+        include: Optional[Iterable[str]] = None,
+        deadline: Optional[float] = None,
+        model_complexity: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Processa frames consecutivos em um único detector com tracking.
+
+        A sequência inteira vai para um só processo, pois o tracking depende
+        da ordem dos frames; requisições diferentes continuam em paralelo.
+
+        Args:
+            images: Caminhos das imagens ou frames BGR, em ordem temporal
+            include: Estruturas opcionais de landmarks (ver PoseDetector.process_image)
+            deadline: Instante (time.time()) após o qual o processo para de
+                processar frames novos
+            model_complexity: Modelo a usar (um de model_complexities)
+
+        Returns:
+            Lista de resultados do PoseDetector, na mesma ordem de images;
+            menor que images se o deadline foi atingido
+        """
+        if not images:
+            return []
+
+        include = tuple(include) if include is not None else None
+        model_complexity = self._resolve_complexity(model_complexity)
+
+        if self.size <= 1:
+            self._task_started()
+            try:
+                with self.inline_tracking_detectors[model_complexity].checkout() as detector:
+                    return detector.process_sequence(images, include, deadline)
+            finally:
+                self._task_finished()
+
+        with self._guarded_executor() as executor:
+            return self._submit(
+                executor, _process_sequence_in_worker, images, include, deadline, model_complexity
+            ).result()
+
+    def warm_up(self, timeout: float = 300.0) -> None:
+        """
+        Cria e aquece todos os detectores do pool.
+
+        Inline, processa warm_up_image nos detectores estáticos do modelo
+        padrão (com warm_up_all, em todos os detectores dos pools locais,
+        inclusive tracking e cascata); com processos, submete rodadas de pings até os size
+        processos responderem (PIDs distintos). Um ping só roda depois do
+        initializer, onde está o aquecimento, então ao retornar todos os
+        processos estão prontos.
+
+        Raises:
+            TimeoutError: Se nem todos os processos responderem em timeout
+                segundos
+        """
+        if self.size <= 1:
+            if self.warm_up_image is None:
+                return
+            if not self.warm_up_all:
+                self.inline_detectors[self.model_complexity].warm_up(self.warm_up_image, cascade=False)
+                return
+            for complexity in self.model_complexities:
+                self.inline_detectors[complexity].warm_up(self.warm_up_image)
+                self.inline_tracking_detectors[complexity].warm_up(self.warm_up_image)
+            return
+
+        deadline = time.time() + timeout
+        ready = set()
+        with self._guarded_executor() as executor:
+            while len(ready) < self.size:
+                if time.time() >= deadline:
+                    raise TimeoutError(f"Only {len(ready)}/{self.size} inference processes ready")
+                futures = [executor.submit(_ping, PING_HOLD_SECONDS) for _ in range(self.size)]
+                try:
+                    # Um processo preso no initializer não segura o warm-up além do timeout
+                    ready.update(future.result(timeout=max(0.0, deadline - time.time())) for future in futures)
+                except FuturesTimeoutError:
+                    for future in futures:
+                        future.cancel()
+                    raise TimeoutError(f"Only {len(ready)}/{self.size} inference processes ready")
+
+        logger.info(f"InferencePool warmed up with {self.size} processes")
+
+    @contextmanager
+    def _guarded_executor(self):
+        """Fornece o executor, descartando-o se um worker morrer."""
+        executor = self._get_executor()
+        try:
+            yield executor
+        except BrokenProcessPool:
+            # Um worker morreu: descartar o pool para recriá-lo na próxima chamada
+            logger.error("InferencePool broken, restarting on next request")
+            self._executor = None
+            raise
+
+    def shutdown(self) -> None:
+        """Encerra os processos do pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,414 @@
+"""
+Fila de jobs assíncronos de análise (/jobs).
+
+Clipes longos não cabem no limite de frames e no timeout de uma requisição
+síncrona: o cliente submete o job, acompanha o progresso e busca o
+resultado quando terminar. Threads de JobWorker em cada worker do gunicorn
+consomem a fila e processam os frames em lotes, gravando o progresso no
+store a cada lote.
+
+Backends:
+    - InMemoryJobStore: testes e execução com um único worker
+    - RedisJobStore: compartilhado entre os workers do gunicorn (produção)
+
+Nos dois, jobs e resultados expiram após o TTL. Um job em execução tem um
+lease renovado a cada lote; se o worker morrer, o lease expira e outro
+JobWorker devolve o job à fila (ou o marca como falho após max_attempts).
+O lease é criado no mesmo passo que retira o job da fila.
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+import logging
+from typing import Dict, Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Status de um job
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+class InMemoryJobStore:
+    """Store de jobs em memória do processo (thread-safe), com expiração por TTL."""
+
+    def __init__(self, ttl: int = 86400):
+        """
+        Args:
+            ttl: Tempo (segundos) que jobs e resultados ficam disponíveis
+                desde a última escrita
+        """
+        self.ttl = ttl
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._frames: Dict[str, List[Dict[str, Any]]] = {}
+        self._expires: Dict[str, float] = {}
+        self._leases: Dict[str, float] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self) -> None:
+        """Remove jobs expirados (chamado com o lock)."""
+        now = time.time()
+        for job_id in [job_id for job_id, expires in self._expires.items() if expires <= now]:
+            del self._jobs[job_id], self._expires[job_id]
+            self._frames.pop(job_id, None)
+            self._leases.pop(job_id, None)
+
+    def create(self, job_id: str, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._evict_expired()
+            self._jobs[job_id] = dict(job)
+            self._frames[job_id] = []
+            self._expires[job_id] = time.time() + self.ttl
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._expires.get(job_id, 0) <= time.time():
+                return None
+            return dict(self._jobs[job_id])
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+                self._expires[job_id] = time.time() + self.ttl
+
+    def append_frames(self, job_id: str, frames: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            if job_id in self._frames:
+                self._frames[job_id].extend(frames)
+
+    def get_frames(self, job_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._frames.get(job_id, []))
+
+    def clear_frames(self, job_id: str) -> None:
+        with self._lock:
+            if job_id in self._frames:
+                self._frames[job_id] = []
+
+    def enqueue(self, job_id: str) -> None:
+        self._queue.put(job_id)
+
+    def dequeue(self, timeout: float, lease_seconds: float) -> Optional[str]:
+        """Retira o próximo job da fila já com o lease de quem o retirou."""
+        try:
+            if timeout <= 0:
+                job_id = self._queue.get_nowait()
+            else:
+                job_id = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self.acquire_lease(job_id, lease_seconds)
+        return job_id
+
+    def acquire_lease(self, job_id: str, seconds: float) -> None:
+        with self._lock:
+            self._leases[job_id] = time.time() + seconds
+
+    def renew_lease(self, job_id: str, seconds: float) -> bool:
+        with self._lock:
+            if job_id not in self._leases:
+                return False
+            self._leases[job_id] = time.time() + seconds
+            return True
+
+    def release_lease(self, job_id: str) -> None:
+        with self._lock:
+            self._leases.pop(job_id, None)
+
+    def expired_leases(self) -> List[str]:
+        """Remove e retorna os leases vencidos (cada id sai para um único chamador)."""
+        with self._lock:
+            now = time.time()
+            expired = [job_id for job_id, expires in self._leases.items() if expires <= now]
+            for job_id in expired:
+                del self._leases[job_id]
+            return expired
+
+
+# Retira o próximo id da fila (KEYS[1]) e registra seu lease (KEYS[2], score
+# ARGV[1]) atomicamente
+POP_WITH_LEASE_SCRIPT = """
+local job_id = redis.call('RPOP', KEYS[1])
+if job_id then
+    redis.call('ZADD', KEYS[2], ARGV[1], job_id)
+end
+return job_id
+"""
+
+# Intervalo entre consultas à fila vazia no Redis
+DEQUEUE_POLL_SECONDS = 0.2
+
+
+class RedisJobStore:
+    """
+    Store de jobs no Redis.
+
+    Chaves (prefixo mediapipe:job:):
+        <id>          JSON com spec, status e progresso
+        <id>:frames   lista de frames processados (JSON, um por item)
+        queue         fila de ids pendentes
+        leases        sorted set de jobs em execução (score = vencimento
+                      do lease, em time.time() dos workers)
+    """
+
+    def __init__(self, client: Any, ttl: int, prefix: str = 'mediapipe:job:'):
+        """
+        Args:
+            client: Cliente redis.Redis
+            ttl: Tempo (segundos) que jobs e resultados ficam disponíveis
+            prefix: Prefixo das chaves
+        """
+        self._redis = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self._queue_key = prefix + 'queue'
+        self._leases_key = prefix + 'leases'
+        self._pop_with_lease = client.register_script(POP_WITH_LEASE_SCRIPT)
+
+    def _key(self, job_id: str) -> str:
+        return self.prefix + job_id
+
+    def create(self, job_id: str, job: Dict[str, Any]) -> None:
+        self._redis.setex(self._key(job_id), self.ttl, json.dumps(job))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        payload = self._redis.get(self._key(job_id))
+        return json.loads(payload) if payload is not None else None
+
+    def update(self, job_id: str, **fields) -> None:
+        # Cada job é escrito por um único JobWorker, então ler e regravar é seguro
+        job = self.get(job_id) or {}
+        job.update(fields)
+        self._redis.setex(self._key(job_id), self.ttl, json.dumps(job))
+
+    def append_frames(self, job_id: str, frames: List[Dict[str, Any]]) -> None:
+        if not frames:
+            return
+        key = self._key(job_id) + ':frames'
+        pipe = self._redis.pipeline()
+        pipe.rpush(key, *(json.dumps(frame) for frame in frames))
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def get_frames(self, job_id: str) -> List[Dict[str, Any]]:
+        items = self._redis.lrange(self._key(job_id) + ':frames', 0, -1)
+        return [json.loads(item) for item in items]
+
+    def clear_frames(self, job_id: str) -> None:
+        self._redis.delete(self._key(job_id) + ':frames')
+
+    def enqueue(self, job_id: str) -> None:
+        self._redis.lpush(self._queue_key, job_id)
+
+    def dequeue(self, timeout: float, lease_seconds: float) -> Optional[str]:
+        """
+        Retira o próximo job da fila já com o lease de quem o retirou.
+
+        RPOP e ZADD rodam num script Lua (atômico): um worker que morre logo
+        após retirar o job deixa um lease que vence, e o job é retomado.
+        Scripts não podem bloquear, então a fila vazia é consultada a cada
+        DEQUEUE_POLL_SECONDS até o timeout.
+        """
+        deadline = time.time() + timeout
+        while True:
+            item = self._pop_with_lease(
+                keys=[self._queue_key, self._leases_key],
+                args=[time.time() + lease_seconds]
+            )
+            if item is not None:
+                return _decode_id(item)
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            time.sleep(min(DEQUEUE_POLL_SECONDS, remaining))
+
+    def acquire_lease(self, job_id: str, seconds: float) -> None:
+        self._redis.zadd(self._leases_key, {job_id: time.time() + seconds})
+
+    def renew_lease(self, job_id: str, seconds: float) -> bool:
+        # xx: só renova um lease existente (False se outro worker o retomou)
+        return bool(self._redis.zadd(self._leases_key, {job_id: time.time() + seconds}, xx=True, ch=True))
+
+    def release_lease(self, job_id: str) -> None:
+        self._redis.zrem(self._leases_key, job_id)
+
+    def expired_leases(self) -> List[str]:
+        """Remove e retorna os leases vencidos (zrem garante um único dono)."""
+        expired = self._redis.zrangebyscore(self._leases_key, '-inf', time.time())
+        return [_decode_id(item) for item in expired if self._redis.zrem(self._leases_key, item)]
+
+
+def _decode_id(item: Any) -> str:
+    return item.decode('utf-8') if isinstance(item, bytes) else item
+
+
+def create_job_store(config):
+    """
+    Cria o store de jobs a partir da configuração (JOB_BACKEND).
+
+    Raises:
+        RuntimeError: Se JOB_BACKEND=redis e o Redis não estiver disponível
+    """
+    if config.JOB_BACKEND != 'redis':
+        if config.GUNICORN_WORKERS > 1:
+            logger.warning(
+                f"JOB_BACKEND=memory with {config.GUNICORN_WORKERS} gunicorn workers: "
+                "/jobs is disabled (each worker would see only its own jobs); use JOB_BACKEND=redis"
+            )
+        return InMemoryJobStore(ttl=config.JOB_TTL)
+
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError('JOB_BACKEND=redis requires the redis package')
+
+    client = redis.Redis(
+        host=config.REDIS_HOST,
+        port=config.REDIS_PORT,
+        db=config.REDIS_DB,
+        password=config.REDIS_PASSWORD or None
+    )
+    logger.info(f"Job store using Redis at {config.REDIS_HOST}:{config.REDIS_PORT}")
+    return RedisJobStore(client, ttl=config.JOB_TTL)
+
+
+class LeaseLost(Exception):
+    """O lease do job venceu e ele foi retomado por outro JobWorker."""
+
+
+class JobWorker:
+    """
+    Consome a fila de jobs em threads de background.
+
+    O handler recebe (job_id, job, report) e processa o job em lotes,
+    chamando report(frames, frames_done) após cada lote; ele retorna o
+    resumo final (estatísticas) gravado no job.
+
+    Cada job em execução tem um lease de lease_seconds, renovado a cada
+    report; a cada iteração o worker retoma jobs de leases vencidos (worker
+    morto), devolvendo-os à fila do zero ou marcando-os como falhos após
+    max_attempts tentativas.
+    """
+
+    def __init__(
+        self,
+        store,
+        handler: Callable[[str, Dict[str, Any], Callable], Dict[str, Any]],
+        threads: int = 1,
+        poll_timeout: float = 1.0,
+        lease_seconds: float = 120.0,
+        max_attempts: int = 2
+    ):
+        self.store = store
+        self.handler = handler
+        self.threads = threads
+        self.poll_timeout = poll_timeout
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._started = False
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        """Inicia as threads sob demanda (após o fork do gunicorn)."""
+        with self._lock:
+            if self._started or self.threads <= 0:
+                return
+            for i in range(self.threads):
+                thread = threading.Thread(target=self._run_forever, name=f'job-worker-{i}', daemon=True)
+                thread.start()
+            self._started = True
+            logger.info(f"JobWorker started with {self.threads} threads")
+
+    def _run_forever(self) -> None:
+        while True:
+            try:
+                self.run_once(self.poll_timeout)
+            except Exception as e:
+                # Falha do store (ex.: Redis fora do ar): aguardar e tentar de novo
+                logger.error(f"JobWorker error: {str(e)}")
+                time.sleep(self.poll_timeout)
+
+    def reclaim_expired(self) -> int:
+        """
+        Retoma jobs cujo lease venceu (worker morto durante a execução).
+
+        Returns:
+            Número de jobs retomados
+        """
+        reclaimed = 0
+        for job_id in self.store.expired_leases():
+            job = self.store.get(job_id)
+            # queued com lease: o worker morreu entre retirar o job e iniciá-lo
+            if job is None or job.get('status') not in (JOB_QUEUED, JOB_RUNNING):
+                continue
+
+            reclaimed += 1
+            if job.get('attempts', 0) >= self.max_attempts:
+                logger.error(f"Job {job_id} lost its worker {job['attempts']} times, giving up")
+                self.store.update(job_id, status=JOB_FAILED, error='Job worker lost', finished_at=time.time())
+                continue
+
+            # Recomeça do zero: os frames parciais seriam duplicados
+            logger.warning(f"Job {job_id} lease expired, requeueing")
+            self.store.clear_frames(job_id)
+            self.store.update(job_id, status=JOB_QUEUED, frames_done=0)
+            self.store.enqueue(job_id)
+        return reclaimed
+
+    def run_once(self, timeout: float = 0) -> bool:
+        """
+        Processa um job da fila, se houver.
+
+        Returns:
+            True se um job foi processado
+        """
+        self.reclaim_expired()
+
+        # O lease vem junto com o job: não há janela em que ele esteja fora
+        # da fila sem dono
+        job_id = self.store.dequeue(timeout, self.lease_seconds)
+        if job_id is None:
+            return False
+
+        job = self.store.get(job_id)
+        if job is None:
+            # Expirou antes de ser processado
+            self.store.release_lease(job_id)
+            return True
+
+        logger.info(f"Job {job_id} started")
+        self.store.update(job_id, status=JOB_RUNNING, started_at=time.time(), attempts=job.get('attempts', 0) + 1)
+
+        def report(frames: List[Dict[str, Any]], frames_done: int) -> None:
+            # Heartbeat: sem o lease, outro worker já recomeçou o job
+            if not self.store.renew_lease(job_id, self.lease_seconds):
+                raise LeaseLost(job_id)
+            self.store.append_frames(job_id, frames)
+            self.store.update(job_id, frames_done=frames_done)
+
+        try:
+            summary = self.handler(job_id, job, report)
+        except LeaseLost:
+            logger.warning(f"Job {job_id} lease lost, abandoning")
+            return True
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self.store.update(job_id, status=JOB_FAILED, error=str(e), finished_at=time.time())
+            self.store.release_lease(job_id)
+            return True
+
+        self.store.update(job_id, status=JOB_COMPLETED, summary=summary, finished_at=time.time())
+        self.store.release_lease(job_id)
+        logger.info(f"Job {job_id} completed")
+        return True
@@ -3,16 +3,36 @@ Serviço Flask para processamento de vídeos com MediaPipe Pose.
 Extrai landmarks, calcula ângulos e detecta fase do movimento.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+from io import BytesIO
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from itertools import islice
 import time
 import traceback
 import os
-
-from pose_detector import PoseDetector
+import json
+import tempfile
+import numpy as np
+
+from pose_detector import PoseDetector, ImageSource, OPTIONAL_LANDMARK_FIELDS, preload_model_assets
+from pose_frame import PoseFrame
+from inference_pool import InferencePool
+from detector_pool import DetectorPool
+from result_cache import create_result_cache, read_image_bytes
+from admission import FrameBudget
+from complexity_policy import ComplexityPolicy
+from warmup import Readiness, synthetic_pose_image
+from video_decoder import sample_video_frames, iter_video_frames, estimate_sample_count
+from job_queue import (
+    InMemoryJobStore, JobWorker, create_job_store, new_job_id, JOB_QUEUED, JOB_COMPLETED, JOB_FAILED
+)
+from wire_format import encode_landmarks, PRECISIONS
 from biomechanics_engine import BiomechanicsEngine
+from exercise_registry import ExerciseRegistry
+from phase_tracker import PhaseTracker
 from utils import validate_frame_data, calculate_confidence_score
 from config import get_config
 
@@ -27,30 +47,230 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+
+class LimitedBuffer(BytesIO):
+    """Buffer de upload que recusa (413) ao passar de max_size bytes."""
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def write(self, data) -> int:
+        if self.tell() + len(data) > self.max_size:
+            raise RequestEntityTooLarge(f'Image too large. Maximum {config.MAX_IMAGE_SIZE_MB}MB allowed.')
+        return super().write(data)
+
+
+class InMemoryUploadRequest(Request):
+    """
+    Request que mantém uploads de imagem em memória.
+
+    O padrão do Werkzeug grava uploads maiores que 500KB em arquivo
+    temporário; frames enviados em multipart como image/* são decodificados
+    direto do buffer, limitado a MAX_IMAGE_SIZE_MB durante a leitura. Os
+    demais arquivos (vídeos, application/octet-stream) e requisições sem
+    Content-Length usam o comportamento padrão. O corpo inteiro é limitado
+    por MAX_CONTENT_LENGTH (MAX_REQUEST_SIZE_MB) antes de qualquer leitura.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is None or not (content_type or '').startswith('image/'):
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return LimitedBuffer(config.MAX_IMAGE_SIZE_MB * 1024 * 1024)
+
+
 app = Flask(__name__)
+app.request_class = InMemoryUploadRequest
+# Werkzeug recusa (413) corpos maiores pelo Content-Length, antes de ler
+app.config['MAX_CONTENT_LENGTH'] = config.MAX_REQUEST_SIZE_MB * 1024 * 1024
 CORS(app)
 
 # Inicializar serviços
-logger.info(f"Initializing PoseDetector with model_complexity={config.MODEL_COMPLEXITY}")
-pose_detector = PoseDetector(
-    model_complexity=config.MODEL_COMPLEXITY,
-    min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
-    min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE
+model_complexities = config.model_complexities()
+logger.info(f"Initializing PoseDetector with model_complexity={config.MODEL_COMPLEXITY} (loaded: {model_complexities})")
+detector_kwargs = {
+    'model_complexity': config.MODEL_COMPLEXITY,
+    'min_detection_confidence': config.MIN_DETECTION_CONFIDENCE,
+    'min_tracking_confidence': config.MIN_TRACKING_CONFIDENCE,
+    'roi_crop': config.ROI_CROP_ENABLED,
+    'max_input_side': config.MAX_INPUT_SIDE
+}
+# Cascata lite -> heavy: só frames de baixa confiança rodam no modelo pesado
+if config.CASCADE_COMPLEXITY is not None:
+    detector_kwargs['cascade_complexity'] = config.CASCADE_COMPLEXITY
+    detector_kwargs['cascade_threshold'] = config.CASCADE_CONFIDENCE
+# Pesos do modelo baixados no import (no master do gunicorn com preload_app);
+# o grafo de cada detector só é criado no primeiro uso, já no worker
+for complexity in sorted(set(model_complexities) | {config.CASCADE_COMPLEXITY} - {None}):
+    preload_model_assets(complexity)
+
+# Um detector por thread que infere neste worker (o grafo não é thread-safe),
+# para cada modelo carregado
+detector_pools = {
+    complexity: DetectorPool(
+        lambda complexity=complexity: PoseDetector(**dict(detector_kwargs, model_complexity=complexity)),
+        size=config.DETECTOR_POOL_SIZE
+    )
+    for complexity in model_complexities
+}
+
+# Imagem sintética usada no warm-up (None desativa o aquecimento dos processos)
+warm_up_image = synthetic_pose_image() if config.WARMUP_ENABLED else None
+
+# Pool de processos para inferência paralela dos frames de uma requisição.
+# MAX_WORKERS é o total do container, dividido entre os workers do gunicorn
+inference_pool = InferencePool(
+    size=config.inference_processes(),
+    detector_kwargs=detector_kwargs,
+    inline_detectors=detector_pools,
+    warm_up_image=warm_up_image,
+    warm_up_all=config.WARMUP_ALL_MODELS
+)
+
+# Modelo de cada requisição: o mais pesado que cabe em LATENCY_SLO_MS com a
+# fila atual (com um único modelo carregado, sempre MODEL_COMPLEXITY)
+complexity_policy = ComplexityPolicy(
+    tiers=model_complexities,
+    slo_seconds=config.LATENCY_SLO_MS / 1000,
+    parallelism=inference_pool.size
+)
+
+# Estado do warm-up deste worker (/ready)
+readiness = Readiness()
+
+# Cache de landmarks por conteúdo da imagem (None se ENABLE_CACHE=false).
+# Só configurações que afetam o resultado do modo estático entram na chave.
+result_cache = create_result_cache(config, {
+    'model_complexity': config.MODEL_COMPLEXITY,
+    'min_detection_confidence': config.MIN_DETECTION_CONFIDENCE,
+    'cascade_complexity': config.CASCADE_COMPLEXITY,
+    'cascade_threshold': config.CASCADE_CONFIDENCE,
+    'max_input_side': config.MAX_INPUT_SIDE
+})
+
+# Orçamento de frames em processamento neste worker (429 quando esgotado)
+frame_budget = FrameBudget(
+    capacity=config.MAX_INFLIGHT_FRAMES,
+    parallelism=inference_pool.size
+)
+
+# Exercícios do registro declarativo (exercises.json + EXERCISES_FILE)
+biomechanics_engine = BiomechanicsEngine(ExerciseRegistry.load(config.EXERCISES_FILE))
+
+# Jobs assíncronos (/jobs): store compartilhado (Redis) ou em memória.
+# O JobWorker é criado aqui; com Redis suas threads sobem com o worker
+# (consomem a fila e retomam jobs de workers mortos), em memória no
+# primeiro job. Em memória com vários workers do gunicorn /jobs fica
+# desativado: status e resultado só existiriam no worker que recebeu o job.
+job_store = create_job_store(config)
+jobs_enabled = not (isinstance(job_store, InMemoryJobStore) and config.GUNICORN_WORKERS > 1)
+
+# Modos de análise de /analyze-frames
+# - independent: cada frame detectado do zero (paralelo entre processos)
+# - sequence: frames consecutivos com tracking do MediaPipe
+ANALYSIS_MODES = ('independent', 'sequence')
+
+# Formatos de resposta de /analyze-frames e /analyze-video
+# - json: um único documento JSON (padrão)
+# - ndjson: streaming, um JSON por linha
+# - binary: landmarks em array compacto (ver wire_format.py)
+RESPONSE_FORMATS = ('json', 'ndjson', 'binary')
+NDJSON_MIMETYPE = 'application/x-ndjson'
+BINARY_MIMETYPE = 'application/octet-stream'
+
+# Etapas medidas por frame/requisição (histograma mediapipe_stage_duration_seconds
+# e bloco "timings" opcional da resposta)
+STAGES = ('decode', 'inference', 'extraction', 'angles', 'phase', 'serialization')
+
+# Header com o tempo máximo (ms) que o cliente aceita esperar; limitado a
+# TIMEOUT_SECONDS. Ao atingir o deadline a resposta traz os frames prontos.
+DEADLINE_HEADER = 'X-Request-Timeout-Ms'
+
+# Campos opcionais de cada frame na resposta (frame_number e timestamp_ms
+# sempre vão). Landmarks não pedidos não são nem extraídos pelo detector.
+FRAME_FIELDS = (
+    'phase',
+    'confidence',
+    'angles',
+    'landmarks_3d',
+    'landmarks_normalized',
+    'world_landmarks'
 )
 
-biomechanics_engine = BiomechanicsEngine()
+# Campos padrão no formato binário: os landmarks já vão no array, então as
+# estruturas verbosas (landmarks_3d, world_landmarks) só entram no bloco
+# JSON quando pedidas em fields
+BINARY_FRAME_FIELDS = ('phase', 'confidence', 'angles')
 
 # Métricas (opcional)
+# Sob o gunicorn (PROMETHEUS_MULTIPROC_DIR definido em gunicorn.conf.py) cada
+# worker grava suas métricas em arquivos mmap e /metrics agrega todos os
+# processos; gauges somam apenas os workers vivos (livesum).
 if config.ENABLE_METRICS:
     try:
-        from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+        from prometheus_client import (
+            CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+        )
 
         REQUEST_COUNT = Counter('mediapipe_requests_total', 'Total requests', ['endpoint', 'status'])
         REQUEST_DURATION = Histogram('mediapipe_request_duration_seconds', 'Request duration')
         FRAMES_PROCESSED = Counter('mediapipe_frames_processed_total', 'Total frames processed')
+        CACHE_LOOKUPS = Counter('mediapipe_cache_lookups_total', 'Pose result cache lookups', ['result'])
+        STAGE_DURATION = Histogram(
+            'mediapipe_stage_duration_seconds',
+            'Processing time per stage',
+            ['stage', 'exercise_type', 'model_complexity'],
+            buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+        )
+        INFLIGHT_FRAMES = Gauge(
+            'mediapipe_inflight_frames', 'Frames admitted and not yet finished',
+            multiprocess_mode='livesum'
+        )
+        FRAME_BUDGET = Gauge(
+            'mediapipe_frame_budget', 'Maximum in-flight frames (0 = unlimited)',
+            multiprocess_mode='livesum'
+        )
+        REQUESTS_REJECTED = Counter('mediapipe_requests_rejected_total', 'Requests rejected by admission control', ['endpoint'])
+        POOL_PROCESSES = Gauge(
+            'mediapipe_pool_processes', 'Inference processes available',
+            multiprocess_mode='livesum'
+        )
+        POOL_ACTIVE_TASKS = Gauge(
+            'mediapipe_pool_active_tasks', 'Inference tasks submitted and not yet finished',
+            multiprocess_mode='livesum'
+        )
+        DETECTOR_WAIT = Histogram(
+            'mediapipe_detector_wait_seconds',
+            'Time waiting for a free detector in the worker pool',
+            ['mode'],
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+        )
+
+        COMPLEXITY_SELECTED = Counter(
+            'mediapipe_model_complexity_selected_total',
+            'Requests per model complexity chosen by the load policy',
+            ['model_complexity']
+        )
+        FRAMES_ESCALATED = Counter(
+            'mediapipe_frames_escalated_total',
+            'Frames re-run on the cascade model after a low-confidence result',
+            ['exercise_type']
+        )
+
+        inference_pool.on_active_change = POOL_ACTIVE_TASKS.set
+        for pool in detector_pools.values():
+            pool.on_wait = DETECTOR_WAIT.labels(mode='static').observe
+        for pool in inference_pool.inline_tracking_detectors.values():
+            pool.on_wait = DETECTOR_WAIT.labels(mode='tracking').observe
 
         @app.route('/metrics', methods=['GET'])
         def metrics():
+            if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+                # Agrega os arquivos de métricas de todos os workers
+                registry = CollectorRegistry()
+                multiprocess.MultiProcessCollector(registry)
+                return generate_latest(registry), 200, {'Content-Type': CONTENT_TYPE_LATEST}
             return generate_latest(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
 
         logger.info("Prometheus metrics enabled")
@@ -73,6 +293,707 @@ def health_check():
     }), 200
 
 
+def _warm_up() -> None:
+    """
+    Primeira inferência dos detectores deste worker.
+
+    Só os detectores estáticos do modelo padrão são aquecidos: tracking,
+    modelos extras e cascata (dezenas de MB por grafo, em cada worker) são
+    criados no primeiro uso, salvo com WARMUP_ALL_MODELS. Com pool de
+    processos, os detectores locais só atendem /analyze-single-frame:
+    aquece um e deixa os demais para quando a concorrência pedir.
+    """
+    count = None if inference_pool.size <= 1 else 1
+    if config.WARMUP_ALL_MODELS:
+        pools = detector_pools
+    else:
+        pools = {config.MODEL_COMPLEXITY: detector_pools[config.MODEL_COMPLEXITY]}
+    for pool in pools.values():
+        pool.warm_up(warm_up_image, count, cascade=config.WARMUP_ALL_MODELS)
+    inference_pool.warm_up()
+
+
+def start_warm_up() -> None:
+    """
+    Inicia o warm-up em background (chamado por init_worker).
+
+    Com WARMUP_ENABLED=false o worker é considerado pronto imediatamente.
+    """
+    if config.WARMUP_ENABLED:
+        readiness.start(_warm_up)
+    else:
+        readiness.run(lambda: None)
+
+
+def init_worker() -> None:
+    """
+    Inicialização de cada worker, depois do fork (post_worker_init).
+
+    Os gauges por processo são publicados aqui: com preload_app, valores
+    gravados no import pertencem ao master e não aparecem no /metrics.
+    """
+    if config.ENABLE_METRICS:
+        FRAME_BUDGET.set(frame_budget.capacity)
+        POOL_PROCESSES.set(inference_pool.size)
+    if not isinstance(job_store, InMemoryJobStore):
+        job_worker.ensure_started()
+    start_warm_up()
+
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness: 200 só depois do warm-up dos modelos deste worker"""
+    return jsonify(readiness.to_dict()), 200 if readiness.ready else 503
+
+
+def _new_stats(exercise_type: str, model_complexity: Optional[int] = None) -> Dict[str, Any]:
+    """Acumuladores de uma análise (estatísticas e tempo por etapa)."""
+    return {
+        'frames_processed': 0,
+        'frames_timed': 0,  # Frames com tempos medidos (inferidos, não vindos do cache)
+        'frames_escalated': 0,
+        'total_confidence': 0.0,
+        'exercise_type': exercise_type,
+        'model_complexity': config.MODEL_COMPLEXITY if model_complexity is None else model_complexity,
+        'timings': dict.fromkeys(STAGES, 0.0)
+    }
+
+
+def _exercise_label(exercise_type: str) -> str:
+    """
+    Label exercise_type das métricas: aliases agrupados no nome canônico e
+    desconhecidos em 'other', para limitar a cardinalidade.
+    """
+    registry = biomechanics_engine.registry
+    return registry.get(exercise_type).name if exercise_type in registry else 'other'
+
+
+def _observe_stage(
+    stage: str,
+    seconds: float,
+    exercise_type: str,
+    model_complexity: Optional[int] = None
+) -> None:
+    """Registra o tempo de uma etapa no histograma de métricas."""
+    if config.ENABLE_METRICS:
+        STAGE_DURATION.labels(
+            stage=stage,
+            exercise_type=_exercise_label(exercise_type),
+            model_complexity=str(config.MODEL_COMPLEXITY if model_complexity is None else model_complexity)
+        ).observe(seconds)
+
+
+def _record_stage(stats: Dict[str, Any], stage: str, seconds: float) -> None:
+    """Acumula o tempo de uma etapa na análise e registra nas métricas."""
+    stats['timings'][stage] += seconds
+    _observe_stage(stage, seconds, stats['exercise_type'], stats['model_complexity'])
+
+
+def _choose_complexity(frames: int) -> int:
+    """
+    model_complexity de uma requisição já admitida (ver ComplexityPolicy).
+
+    A fila são os frames em processamento no worker, sem os da própria
+    requisição.
+    """
+    queued = max(0, frame_budget.in_flight - frames)
+    complexity = complexity_policy.choose(frames, queued)
+
+    if config.ENABLE_METRICS:
+        COMPLEXITY_SELECTED.labels(model_complexity=str(complexity)).inc()
+    return complexity
+
+
+def _learn_inference_cost(stats: Dict[str, Any]) -> None:
+    """
+    Atualiza o custo por frame do modelo usado na análise.
+
+    Só frames com tempos medidos contam: hits do cache não têm tempos e
+    baixariam a estimativa.
+    """
+    if not stats['frames_timed']:
+        return
+    timings = stats['timings']
+    complexity_policy.observe(
+        stats['model_complexity'],
+        stats['frames_timed'],
+        timings['decode'] + timings['inference'] + timings['extraction']
+    )
+
+
+def _iter_analyzed_frames(
+    frames: List[Tuple[int, float, ImageSource]],
+    exercise_type: str,
+    mode: str,
+    stats: Dict[str, Any],
+    fields: Tuple[str, ...] = FRAME_FIELDS,
+    deadline: Optional[float] = None,
+    phase_tracker: Optional[PhaseTracker] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Analisa os frames em ordem, produzindo cada frame assim que fica pronto.
+
+    Frames sem pose detectada são descartados. As estatísticas são
+    acumuladas em stats, sem manter os frames processados em memória.
+    Ao atingir o deadline a inferência para e stats['truncated'] é marcado.
+
+    Args:
+        frames: Lista de (índice, timestamp_ms, imagem) dos frames válidos
+        exercise_type: Tipo de exercício
+        mode: Modo de análise (ver ANALYSIS_MODES)
+        stats: Dict de _new_stats, atualizado com frames_processed,
+            total_confidence e o tempo de cada etapa
+        fields: Campos a incluir em cada frame (ver FRAME_FIELDS)
+        deadline: Instante (time.time()) limite para despachar inferência
+        phase_tracker: Detector de fase da série; passado pelos jobs para
+            continuar entre lotes (padrão: um novo por chamada)
+
+    Yields:
+        Dict do frame processado
+    """
+    include = [field for field in OPTIONAL_LANDMARK_FIELDS if field in fields]
+    complexity = stats['model_complexity']
+    # Fase pela velocidade do ângulo, frame a frame, sem depender do total
+    phase_tracker = phase_tracker or biomechanics_engine.phase_tracker(exercise_type)
+
+    # 1. Detectar pose com MediaPipe
+    images = [image for _, _, image in frames]
+    if mode == 'sequence':
+        # Frames consecutivos com tracking (detector só roda ao perder a pose);
+        # a sequência é processada de uma vez em um único processo
+        pose_results = inference_pool.map_sequence(images, include, deadline, complexity)
+    elif result_cache is not None:
+        # Landmarks do cache; só os frames ausentes vão para o pool
+        pose_results = _iter_cached_pose_results(images, deadline, complexity)
+    else:
+        # Frames independentes em paralelo, resultados em ordem
+        pose_results = inference_pool.imap_images(images, include, deadline, complexity)
+
+    frames_inferred = 0
+    for (idx, timestamp_ms, _), pose_result in zip(frames, pose_results):
+        frames_inferred += 1
+        if pose_result.get('escalated'):
+            stats['frames_escalated'] += 1
+            if config.ENABLE_METRICS:
+                FRAMES_ESCALATED.labels(exercise_type=_exercise_label(stats['exercise_type'])).inc()
+
+        # Etapas medidas no detector (ausentes em resultados do cache)
+        pose_timings = pose_result.get('timings')
+        if pose_timings:
+            stats['frames_timed'] += 1
+            for stage, seconds in pose_timings.items():
+                _record_stage(stats, stage, seconds)
+
+        if not pose_result['success']:
+            logger.warning(f"Failed to detect pose in frame {idx + 1}: {pose_result.get('error')}")
+            continue
+
+        # 2. Calcular ângulos biomecânicos
+        stage_start = time.perf_counter()
+        landmarks = pose_result['landmarks']
+        angles = biomechanics_engine.calculate_angles(
+            landmarks,
+            exercise_type
+        )
+        angles_done = time.perf_counter()
+        _record_stage(stats, 'angles', angles_done - stage_start)
+
+        # 3. Detectar fase do movimento
+        phase = phase_tracker.update(angles, timestamp_ms)
+        _record_stage(stats, 'phase', time.perf_counter() - angles_done)
+
+        # 4. Calcular confidence score
+        confidence = calculate_confidence_score(landmarks)
+        stats['total_confidence'] += confidence
+        stats['frames_processed'] += 1
+
+        if config.ENABLE_METRICS:
+            FRAMES_PROCESSED.inc()
+
+        processed_frame = {
+            'frame_number': idx + 1,
+            'timestamp_ms': timestamp_ms,
+            'phase': phase,
+            'confidence': round(confidence, 3),
+            'angles': angles
+        }
+
+        # Landmarks ficam nos arrays do PoseFrame; os dicts/listas da resposta
+        # só são montados na serialização (ver _jsonable_frame)
+        if 'landmarks_3d' in fields:
+            processed_frame['landmarks_3d'] = landmarks
+        if 'landmarks_normalized' in fields:
+            processed_frame['landmarks_normalized'] = landmarks.normalized
+        if 'world_landmarks' in fields:
+            processed_frame['world_landmarks'] = landmarks if landmarks.world is not None else None
+
+        for field in ('phase', 'confidence', 'angles'):
+            if field not in fields:
+                del processed_frame[field]
+
+        yield processed_frame
+
+    if frames_inferred < len(frames):
+        # O pool parou de produzir resultados: deadline atingido
+        stats['truncated'] = True
+        logger.warning(f"Deadline reached: {frames_inferred}/{len(frames)} frames inferred")
+
+
+def _iter_cached_pose_results(
+    images: List[ImageSource],
+    deadline: Optional[float] = None,
+    model_complexity: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Resultados do PoseDetector para frames independentes, usando o cache.
+
+    Caminhos são lidos uma vez e os bytes vão para o pool, então o hash não
+    custa uma leitura extra. Os frames ausentes são processados com todos os
+    landmarks opcionais, para que a entrada do cache sirva a qualquer
+    projeção de campos. Ao atingir o deadline, a iteração termina no
+    primeiro frame ausente que não chegou a ser processado. O modelo usado
+    faz parte da chave.
+
+    Yields:
+        Resultados do PoseDetector, na mesma ordem de images
+    """
+    keys = []
+    cached = []
+    misses = []
+
+    for image in images:
+        try:
+            image_bytes = read_image_bytes(image)
+        except OSError:
+            # Arquivo inacessível: o detector reporta o erro do frame
+            keys.append(None)
+            cached.append(None)
+            misses.append(image)
+            continue
+
+        key = result_cache.make_key(image_bytes, model_complexity=model_complexity or config.MODEL_COMPLEXITY)
+        hit = result_cache.get(key)
+        keys.append(key)
+        cached.append(hit)
+
+        if hit is None:
+            misses.append(image_bytes if isinstance(image, str) else image)
+
+        if config.ENABLE_METRICS:
+            CACHE_LOOKUPS.labels(result='hit' if hit is not None else 'miss').inc()
+
+    miss_results = inference_pool.imap_images(misses, None, deadline, model_complexity)
+
+    for key, hit in zip(keys, cached):
+        if hit is not None:
+            yield hit
+            continue
+
+        pose_result = next(miss_results, None)
+        if pose_result is None:
+            return
+        if key is not None and pose_result['success']:
+            # Tempos medidos e a cascata não valem para os próximos acessos
+            result_cache.set(key, {k: v for k, v in pose_result.items() if k not in ('timings', 'escalated')})
+        yield pose_result
+
+
+def _build_summary(
+    stats: Dict[str, Any],
+    frames_total: int,
+    duration_ms: float,
+    start_time: float,
+    include_timings: bool = False
+) -> Dict[str, Any]:
+    """
+    Monta duração, tempo de processamento e estatísticas da análise.
+
+    Com include_timings, acrescenta o bloco timings com o tempo total (ms)
+    de cada etapa, somado entre os frames (etapas dos processos do pool
+    rodam em paralelo, então a soma pode passar de processing_time_ms).
+    """
+    frames_processed = stats['frames_processed']
+    avg_confidence = stats['total_confidence'] / frames_processed if frames_processed else 0.0
+
+    summary = {
+        'duration_ms': duration_ms,
+        'processing_time_ms': int((time.time() - start_time) * 1000),
+        'model_complexity': stats['model_complexity'],
+        'statistics': {
+            'frames_processed': frames_processed,
+            'frames_total': frames_total,
+            'success_rate': round(frames_processed / frames_total, 3) if frames_total else 0.0,
+            'average_confidence': round(avg_confidence, 3),
+            'frames_escalated': stats.get('frames_escalated', 0),
+            'truncated': stats.get('truncated', False)
+        }
+    }
+
+    if include_timings:
+        summary['timings'] = {
+            f'{stage}_ms': round(seconds * 1000, 2)
+            for stage, seconds in stats['timings'].items()
+        }
+
+    return summary
+
+
+def _acquire_frames(frames: int) -> bool:
+    """Reserva frames no orçamento do worker (ver FrameBudget.try_acquire)."""
+    admitted = frame_budget.try_acquire(frames)
+    if admitted and config.ENABLE_METRICS:
+        INFLIGHT_FRAMES.set(frame_budget.in_flight)
+    return admitted
+
+
+def _wait_for_frames(frames: int) -> None:
+    """Reserva frames no orçamento, esperando a vez (lotes de jobs)."""
+    frame_budget.acquire(frames)
+    if config.ENABLE_METRICS:
+        INFLIGHT_FRAMES.set(frame_budget.in_flight)
+
+
+def _release_frames(frames: int, elapsed_seconds: float) -> None:
+    """Devolve frames ao orçamento do worker."""
+    frame_budget.release(frames, elapsed_seconds)
+    if config.ENABLE_METRICS:
+        INFLIGHT_FRAMES.set(frame_budget.in_flight)
+
+
+def _busy_response(endpoint: str):
+    """Resposta 429 com Retry-After quando o orçamento de frames está esgotado."""
+    retry_after = frame_budget.retry_after()
+
+    logger.warning(f"Rejecting {endpoint}: {frame_budget.in_flight} frames in flight (budget {frame_budget.capacity})")
+
+    if config.ENABLE_METRICS:
+        REQUESTS_REJECTED.labels(endpoint=endpoint).inc()
+        REQUEST_COUNT.labels(endpoint=endpoint, status='rejected').inc()
+
+    response = jsonify({
+        'success': False,
+        'error': 'Server busy, retry later',
+        'retry_after': retry_after
+    })
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+
+def _request_deadline(start_time: float) -> float:
+    """
+    Deadline da requisição: TIMEOUT_SECONDS a partir do início, ou menos se
+    o cliente enviar o header X-Request-Timeout-Ms (o menor dos dois vale).
+    """
+    timeout_s = float(config.TIMEOUT_SECONDS)
+
+    header = request.headers.get(DEADLINE_HEADER)
+    if header:
+        try:
+            requested_s = float(header) / 1000
+        except ValueError:
+            logger.warning(f"Ignoring invalid {DEADLINE_HEADER}: {header}")
+        else:
+            if requested_s > 0:
+                timeout_s = min(timeout_s, requested_s)
+
+    return start_time + timeout_s
+
+
+def _analyze_frame_sources(
+    frames: List[Tuple[int, float, ImageSource]],
+    frames_total: int,
+    duration_ms: float,
+    exercise_type: str,
+    mode: str,
+    start_time: float,
+    endpoint: str,
+    response_format: str = 'json',
+    fields: Tuple[str, ...] = FRAME_FIELDS,
+    precision: str = 'float32',
+    timings: bool = False
+):
+    """
+    Admite a requisição no orçamento de frames e executa a análise.
+
+    Os frames ficam reservados até a resposta terminar; no streaming, até
+    a última linha ser enviada. A inferência respeita o deadline da
+    requisição (ver _request_deadline).
+
+    Returns:
+        Tupla (response, status_code); 429 se o orçamento estiver esgotado
+    """
+    deadline = _request_deadline(start_time)
+
+    frames_count = len(frames)
+    if not _acquire_frames(frames_count):
+        return _busy_response(endpoint)
+
+    admitted_at = time.time()
+    stats = _new_stats(exercise_type, _choose_complexity(frames_count))
+
+    def release():
+        _release_frames(frames_count, time.time() - admitted_at)
+        _learn_inference_cost(stats)
+
+    try:
+        response, status = _run_frame_analysis(
+            frames, frames_total, duration_ms, exercise_type, mode, start_time,
+            endpoint, response_format, fields, precision, stats, deadline, timings
+        )
+    except Exception:
+        release()
+        raise
+
+    if response_format == 'ndjson' and status == 200:
+        response.call_on_close(release)
+    else:
+        release()
+
+    return response, status
+
+
+def _run_frame_analysis(
+    frames: List[Tuple[int, float, ImageSource]],
+    frames_total: int,
+    duration_ms: float,
+    exercise_type: str,
+    mode: str,
+    start_time: float,
+    endpoint: str,
+    response_format: str,
+    fields: Tuple[str, ...],
+    precision: str,
+    stats: Dict[str, Any],
+    deadline: Optional[float] = None,
+    timings: bool = False
+):
+    """
+    Pipeline comum de análise: detecção de pose, ângulos, fase e estatísticas.
+
+    Args:
+        frames: Lista de (índice, timestamp_ms, imagem) dos frames válidos
+        frames_total: Total de frames recebidos (inclusive inválidos)
+        duration_ms: Duração coberta pelos frames
+        exercise_type: Tipo de exercício
+        mode: Modo de análise (ver ANALYSIS_MODES)
+        start_time: Início da requisição (time.time())
+        endpoint: Nome do endpoint para métricas
+        response_format: Formato da resposta (ver RESPONSE_FORMATS)
+        fields: Campos a incluir em cada frame (ver FRAME_FIELDS)
+        precision: Precisão dos landmarks no formato binário (float32 ou int16)
+        stats: Acumuladores da análise (_new_stats, com o model_complexity
+            escolhido)
+        deadline: Instante (time.time()) limite; ao atingi-lo a resposta traz
+            os frames prontos e statistics.truncated = true
+        timings: Incluir o bloco timings (tempo por etapa) na resposta
+
+    Returns:
+        Tupla (response, status_code)
+    """
+    if response_format == 'binary' and 'landmarks_normalized' not in fields:
+        # O array binário é sempre o landmarks_normalized
+        fields = fields + ('landmarks_normalized',)
+
+    analyzed = _iter_analyzed_frames(frames, exercise_type, mode, stats, fields, deadline)
+
+    if response_format == 'ndjson':
+        return _stream_analysis(analyzed, stats, frames_total, duration_ms, start_time, endpoint, timings), 200
+
+    processed_frames = list(analyzed)
+
+    serialization_start = time.perf_counter()
+    if response_format != 'binary':
+        processed_frames = [_jsonable_frame(frame) for frame in processed_frames]
+
+    if len(processed_frames) == 0:
+        if config.ENABLE_METRICS:
+            REQUEST_COUNT.labels(endpoint=endpoint, status='error').inc()
+        if stats.get('truncated'):
+            return jsonify({
+                'success': False,
+                'error': 'Deadline exceeded before any frame was processed'
+            }), 504
+        return jsonify({
+            'success': False,
+            'error': 'No frames could be processed'
+        }), 400
+
+    if response_format == 'binary':
+        # Landmarks saem dos frames e vão para um único array (frames x 33 x 4)
+        landmarks = np.stack([frame.pop('landmarks_normalized') for frame in processed_frames])
+        processed_frames = [_jsonable_frame(frame) for frame in processed_frames]
+
+    # Serialização do documento final é medida só nas métricas (o bloco
+    # timings faz parte dele)
+    stats['timings']['serialization'] += time.perf_counter() - serialization_start
+
+    result = {
+        'success': True,
+        'frames': processed_frames,
+        **_build_summary(stats, frames_total, duration_ms, start_time, timings)
+    }
+
+    logger.info(f"Processing completed: {len(processed_frames)}/{frames_total} frames in {result['processing_time_ms']}ms")
+
+    if config.ENABLE_METRICS:
+        REQUEST_COUNT.labels(endpoint=endpoint, status='success').inc()
+        REQUEST_DURATION.observe(time.time() - start_time)
+
+    if response_format == 'binary':
+        response = Response(encode_landmarks(result, landmarks, precision), mimetype=BINARY_MIMETYPE)
+    else:
+        response = jsonify(result)
+
+    _observe_stage('serialization', time.perf_counter() - serialization_start, exercise_type, stats['model_complexity'])
+
+    return response, 200
+
+
+def _jsonable_frame(frame: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte arrays numpy e PoseFrames do frame para listas serializáveis em JSON."""
+    landmarks_3d = frame.get('landmarks_3d')
+    if isinstance(landmarks_3d, PoseFrame):
+        frame['landmarks_3d'] = landmarks_3d.landmarks_3d()
+    world_landmarks = frame.get('world_landmarks')
+    if isinstance(world_landmarks, PoseFrame):
+        frame['world_landmarks'] = world_landmarks.world_landmarks()
+    landmarks_normalized = frame.get('landmarks_normalized')
+    if hasattr(landmarks_normalized, 'tolist'):
+        frame['landmarks_normalized'] = landmarks_normalized.tolist()
+    return frame
+
+
+def _stream_analysis(
+    analyzed: Iterator[Dict[str, Any]],
+    stats: Dict[str, Any],
+    frames_total: int,
+    duration_ms: float,
+    start_time: float,
+    endpoint: str,
+    timings: bool = False
+) -> Response:
+    """
+    Resposta NDJSON: uma linha {"type": "frame", ...} por frame assim que
+    fica pronto e uma linha final {"type": "summary", ...} com as estatísticas.
+    Erros durante o processamento viram uma linha {"type": "error", ...}.
+    """
+    def generate():
+        try:
+            for frame in analyzed:
+                serialization_start = time.perf_counter()
+                line = json.dumps({'type': 'frame', **_jsonable_frame(frame)}) + '\n'
+                _record_stage(stats, 'serialization', time.perf_counter() - serialization_start)
+                yield line
+
+            summary = _build_summary(stats, frames_total, duration_ms, start_time, timings)
+            success = stats['frames_processed'] > 0
+            line = {'type': 'summary', 'success': success, **summary}
+            if not success:
+                line['error'] = 'No frames could be processed'
+            yield json.dumps(line) + '\n'
+
+            logger.info(f"Streaming completed: {stats['frames_processed']}/{frames_total} frames in {summary['processing_time_ms']}ms")
+
+            if config.ENABLE_METRICS:
+                REQUEST_COUNT.labels(endpoint=endpoint, status='success' if success else 'error').inc()
+                REQUEST_DURATION.observe(time.time() - start_time)
+
+        except Exception as e:
+            logger.error(f"Error streaming frames: {str(e)}")
+            logger.error(traceback.format_exc())
+
+            if config.ENABLE_METRICS:
+                REQUEST_COUNT.labels(endpoint=endpoint, status='error').inc()
+
+            yield json.dumps({'type': 'error', 'success': False, 'error': str(e)}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def _parse_fields(value: Any, default: Tuple[str, ...] = FRAME_FIELDS) -> Tuple[str, ...]:
+    """
+    Converte o parâmetro fields (lista ou string separada por vírgula).
+
+    Args:
+        value: Parâmetro fields da requisição
+        default: Campos quando o parâmetro não foi enviado
+
+    Returns:
+        Campos pedidos, ou default
+
+    Raises:
+        ValueError: Se algum campo não existir
+    """
+    if value is None or value == '':
+        return default
+    if isinstance(value, str):
+        value = [field.strip() for field in value.split(',') if field.strip()]
+
+    unknown = [field for field in value if field not in FRAME_FIELDS]
+    if unknown:
+        raise ValueError(f'Invalid fields: {", ".join(map(str, unknown))}. Allowed: {", ".join(FRAME_FIELDS)}')
+
+    return tuple(value)
+
+
+def _parse_exercise_type(data: Any) -> str:
+    """
+    exercise_type da requisição (padrão: squat).
+
+    Raises:
+        ValueError: Se o exercício não estiver no registro
+    """
+    exercise_type = data.get('exercise_type', 'squat')
+    biomechanics_engine.registry.get(exercise_type)
+    return exercise_type
+
+
+def _parse_flag(value: Any) -> bool:
+    """Converte um booleano recebido em JSON ou em campo de formulário/query."""
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def _parse_response_format(data: Any) -> Tuple[str, str]:
+    """
+    Resolve o formato da resposta e a precisão dos landmarks binários.
+
+    O formato vem do campo format, de stream: true (ndjson) ou do header
+    Accept (application/x-ndjson ou application/octet-stream).
+
+    Returns:
+        Tupla (formato, precisão)
+
+    Raises:
+        ValueError: Se o formato ou a precisão forem inválidos
+    """
+    data = data or {}
+
+    stream = _parse_flag(data.get('stream', False))
+
+    response_format = data.get('format')
+    if response_format is None:
+        accept = request.accept_mimetypes.best
+        if stream or accept == NDJSON_MIMETYPE:
+            response_format = 'ndjson'
+        elif accept == BINARY_MIMETYPE:
+            response_format = 'binary'
+        else:
+            response_format = 'json'
+
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f'Invalid format: {response_format}. Allowed: {", ".join(RESPONSE_FORMATS)}')
+    if stream and response_format != 'ndjson':
+        raise ValueError(f'stream cannot be combined with format {response_format}')
+
+    precision = data.get('precision', 'float32')
+    if precision not in PRECISIONS:
+        raise ValueError(f'Invalid precision: {precision}. Allowed: {", ".join(PRECISIONS)}')
+
+    return response_format, precision
+
+
 @app.route('/analyze-frames', methods=['POST'])
 def analyze_frames():
     """
@@ -84,9 +1005,18 @@ def analyze_frames():
             {"path": "/tmp/frame_001.jpg", "timestamp_ms": 1000},
             {"path": "/tmp/frame_002.jpg", "timestamp_ms": 2000}
         ],
-        "exercise_type": "squat"
+        "exercise_type": "squat",
+        "mode": "independent",  // opcional: "sequence" usa tracking entre frames
+        "stream": false,        // opcional: NDJSON, um frame por linha
+        "fields": ["phase", "angles"],  // opcional: campos de cada frame
+        "format": "json"        // opcional: json, ndjson ou binary
     }
 
+    Input multipart/form-data (sem volume compartilhado):
+        frames: arquivos de imagem (campo repetido, em ordem)
+        timestamps_ms: lista JSON ou separada por vírgula, um por arquivo
+        exercise_type, mode: como no JSON
+
     Output JSON:
     {
         "success": true,
@@ -110,13 +1040,24 @@ def analyze_frames():
         "duration_ms": 3000,
         "processing_time_ms": 1234
     }
+
+    Com "stream": true (ou Accept: application/x-ndjson) a resposta é NDJSON:
+    uma linha {"type": "frame", ...} por frame, em ordem, assim que fica
+    pronta, e uma linha final {"type": "summary", ...} com as estatísticas.
+
+    Com "format": "binary" (ou Accept: application/octet-stream) os
+    landmarks_normalized de todos os frames vão em um array float32 (ou
+    int16 com "precision": "int16") e o resto da resposta em um bloco JSON;
+    ver wire_format.py. Sem "fields", o bloco JSON traz só phase,
+    confidence e angles (BINARY_FRAME_FIELDS).
     """
     start_time = time.time()
 
     try:
-        data = request.get_json()
+        uploads = request.files.getlist('frames')
+        data = request.form if uploads else request.get_json(silent=True)
 
-        if not data or 'frames' not in data:
+        if not uploads and (not data or 'frames' not in data):
             if config.ENABLE_METRICS:
                 REQUEST_COUNT.labels(endpoint='analyze_frames', status='error').inc()
             return jsonify({
@@ -124,8 +1065,42 @@ def analyze_frames():
                 'error': 'Missing frames data'
             }), 400
 
-        frames_input = data['frames']
-        exercise_type = data.get('exercise_type', 'squat')
+        mode = data.get('mode', 'independent')
+
+        if mode not in ANALYSIS_MODES:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid mode: {mode}. Allowed: {", ".join(ANALYSIS_MODES)}'
+            }), 400
+
+        try:
+            exercise_type = _parse_exercise_type(data)
+            response_format, precision = _parse_response_format(data)
+            fields = _parse_fields(
+                data.get('fields'),
+                BINARY_FRAME_FIELDS if response_format == 'binary' else FRAME_FIELDS
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        if uploads:
+            if len(uploads) > config.MAX_FRAMES_PER_REQUEST:
+                return jsonify({
+                    'success': False,
+                    'error': f'Too many frames. Maximum {config.MAX_FRAMES_PER_REQUEST} allowed.'
+                }), 400
+            try:
+                frames_input = _frames_from_uploads(uploads, data.get('timestamps_ms'))
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+        else:
+            frames_input = data['frames']
 
         # Validar limite de frames
         if len(frames_input) > config.MAX_FRAMES_PER_REQUEST:
@@ -134,108 +1109,223 @@ def analyze_frames():
                 'error': f'Too many frames. Maximum {config.MAX_FRAMES_PER_REQUEST} allowed.'
             }), 400
 
-        logger.info(f"Processing {len(frames_input)} frames for exercise: {exercise_type}")
+        logger.info(f"Processing {len(frames_input)} frames for exercise: {exercise_type} (mode={mode})")
 
-        processed_frames = []
-        total_confidence = 0
+        # Validar frames antes de despachar para o pool
+        valid_frames = _valid_frames(frames_input, uploaded=bool(uploads))
 
-        for idx, frame_data in enumerate(frames_input):
-            # Validar frame data
-            if not validate_frame_data(frame_data):
-                logger.warning(f"Invalid frame data at index {idx}")
-                continue
+        # Calcular duração total
+        duration_ms = frames_input[-1]['timestamp_ms'] - frames_input[0]['timestamp_ms']
 
-            frame_path = frame_data['path']
-            timestamp_ms = frame_data['timestamp_ms']
+        return _analyze_frame_sources(
+            valid_frames,
+            frames_total=len(frames_input),
+            duration_ms=duration_ms,
+            exercise_type=exercise_type,
+            mode=mode,
+            start_time=start_time,
+            endpoint='analyze_frames',
+            response_format=response_format,
+            fields=fields,
+            precision=precision,
+            timings=_parse_flag(data.get('timings'))
+        )
 
-            # Verificar se arquivo existe
-            if not os.path.exists(frame_path):
-                logger.warning(f"Frame file not found: {frame_path}")
-                continue
+    except RequestEntityTooLarge:
+        raise
 
-            # 1. Detectar pose com MediaPipe
-            pose_result = pose_detector.process_image(frame_path)
+    except Exception as e:
+        logger.error(f"Error processing frames: {str(e)}")
+        logger.error(traceback.format_exc())
 
-            if not pose_result['success']:
-                logger.warning(f"Failed to detect pose in frame {idx + 1}: {pose_result.get('error')}")
-                continue
+        if config.ENABLE_METRICS:
+            REQUEST_COUNT.labels(endpoint='analyze_frames', status='error').inc()
 
-            # 2. Calcular ângulos biomecânicos
-            angles = biomechanics_engine.calculate_angles(
-                pose_result['landmarks_3d'],
-                exercise_type
-            )
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc() if config.DEBUG else None
+        }), 500
 
-            # 3. Detectar fase do movimento
-            phase = biomechanics_engine.detect_phase(
-                angles,
-                exercise_type,
-                frame_number=idx + 1,
-                total_frames=len(frames_input)
-            )
 
-            # 4. Calcular confidence score
-            confidence = calculate_confidence_score(pose_result['landmarks_3d'])
-            total_confidence += confidence
-
-            processed_frame = {
-                'frame_number': idx + 1,
-                'timestamp_ms': timestamp_ms,
-                'phase': phase,
-                'confidence': round(confidence, 3),
-                'landmarks_3d': pose_result['landmarks_3d'],
-                'landmarks_normalized': pose_result['landmarks_normalized'].tolist() if hasattr(pose_result['landmarks_normalized'], 'tolist') else pose_result['landmarks_normalized'],
-                'angles': angles,
-                'world_landmarks': pose_result.get('world_landmarks', None)
-            }
+def _valid_frames(
+    frames_input: List[Dict[str, Any]],
+    uploaded: bool = False
+) -> List[Tuple[int, float, ImageSource]]:
+    """
+    Filtra os frames de entrada, descartando dados inválidos e arquivos
+    inexistentes.
 
-            processed_frames.append(processed_frame)
+    Args:
+        frames_input: Frames da requisição ou do job
+        uploaded: Frames montados por _frames_from_uploads (imagem em
+            memória); em JSON só caminhos validados são aceitos
 
-            if config.ENABLE_METRICS:
-                FRAMES_PROCESSED.inc()
+    Returns:
+        Lista de (índice, timestamp_ms, imagem) dos frames válidos
+    """
+    valid_frames = []
+    for idx, frame_data in enumerate(frames_input):
+        # Frame enviado em memória (multipart)
+        if uploaded:
+            valid_frames.append((idx, frame_data['timestamp_ms'], frame_data['image']))
+            continue
+
+        # Validar frame data
+        if not validate_frame_data(frame_data):
+            logger.warning(f"Invalid frame data at index {idx}")
+            continue
+
+        frame_path = frame_data['path']
+
+        # Verificar se arquivo existe
+        if not os.path.exists(frame_path):
+            logger.warning(f"Frame file not found: {frame_path}")
+            continue
+
+        valid_frames.append((idx, frame_data['timestamp_ms'], frame_path))
+
+    return valid_frames
 
-        if len(processed_frames) == 0:
+
+@app.route('/analyze-video', methods=['POST'])
+def analyze_video():
+    """
+    Analisa um vídeo decodificando os frames em memória (sem JPEGs intermediários).
+
+    Input JSON:
+    {
+        "video_path": "/tmp/video.mp4",
+        "exercise_type": "squat",
+        "fps": 5,                          // opcional (padrão: VIDEO_SAMPLE_FPS)
+        "timestamps_ms": [0, 500, 1000],   // opcional, tem precedência sobre fps
+        "mode": "sequence",                // opcional
+        "stream": false,                   // opcional
+        "fields": ["phase", "angles"]      // opcional
+    }
+
+    Input multipart/form-data: arquivo no campo "video" e os mesmos campos
+    acima como campos de formulário (timestamps_ms como lista JSON ou
+    separados por vírgula).
+
+    Output JSON: mesmo formato de /analyze-frames
+    """
+    start_time = time.time()
+    upload_path = None
+
+    try:
+        upload = request.files.get('video')
+        if upload is not None:
+            data = request.form
+        else:
+            data = request.get_json(silent=True) or {}
+
+        if upload is None and 'video_path' not in data:
             if config.ENABLE_METRICS:
-                REQUEST_COUNT.labels(endpoint='analyze_frames', status='error').inc()
+                REQUEST_COUNT.labels(endpoint='analyze_video', status='error').inc()
             return jsonify({
                 'success': False,
-                'error': 'No frames could be processed'
+                'error': 'Missing video_path or video upload'
             }), 400
 
-        # Calcular duração total
-        duration_ms = frames_input[-1]['timestamp_ms'] - frames_input[0]['timestamp_ms']
+        mode = data.get('mode', 'independent')
 
-        # Estatísticas
-        avg_confidence = total_confidence / len(processed_frames)
-        processing_time = int((time.time() - start_time) * 1000)
+        if mode not in ANALYSIS_MODES:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid mode: {mode}. Allowed: {", ".join(ANALYSIS_MODES)}'
+            }), 400
 
-        result = {
-            'success': True,
-            'frames': processed_frames,
-            'duration_ms': duration_ms,
-            'processing_time_ms': processing_time,
-            'statistics': {
-                'frames_processed': len(processed_frames),
-                'frames_total': len(frames_input),
-                'success_rate': round(len(processed_frames) / len(frames_input), 3),
-                'average_confidence': round(avg_confidence, 3)
-            }
-        }
+        try:
+            exercise_type = _parse_exercise_type(data)
+            response_format, precision = _parse_response_format(data)
+            fields = _parse_fields(
+                data.get('fields'),
+                BINARY_FRAME_FIELDS if response_format == 'binary' else FRAME_FIELDS
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
 
-        logger.info(f"Processing completed: {len(processed_frames)}/{len(frames_input)} frames in {processing_time}ms")
+        try:
+            fps = float(data.get('fps', config.VIDEO_SAMPLE_FPS))
+            timestamps_ms = _parse_timestamps(data.get('timestamps_ms'))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid fps or timestamps_ms'
+            }), 400
 
-        if config.ENABLE_METRICS:
-            REQUEST_COUNT.labels(endpoint='analyze_frames', status='success').inc()
-            REQUEST_DURATION.observe(time.time() - start_time)
+        if upload is not None:
+            # Upload: gravar o vídeo uma única vez (o OpenCV decodifica de arquivo)
+            os.makedirs(config.TEMP_DIR, exist_ok=True)
+            suffix = os.path.splitext(upload.filename or '')[1] or '.mp4'
+            with tempfile.NamedTemporaryFile(dir=config.TEMP_DIR, suffix=suffix, delete=False) as tmp:
+                upload_path = tmp.name
+                upload.save(tmp)
+            video_path = upload_path
+        else:
+            video_path = data['video_path']
+            if not os.path.exists(video_path):
+                return jsonify({
+                    'success': False,
+                    'error': f'Video file not found: {video_path}'
+                }), 404
+
+        try:
+            samples = sample_video_frames(
+                video_path,
+                fps=fps,
+                timestamps_ms=timestamps_ms,
+                max_frames=config.MAX_FRAMES_PER_REQUEST
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
 
-        return jsonify(result), 200
+        if len(samples) == 0:
+            return jsonify({
+                'success': False,
+                'error': 'No frames could be decoded from video'
+            }), 400
+
+        if len(samples) > config.MAX_FRAMES_PER_REQUEST:
+            return jsonify({
+                'success': False,
+                'error': f'Too many frames. Maximum {config.MAX_FRAMES_PER_REQUEST} allowed; lower fps or send timestamps_ms.'
+            }), 400
+
+        logger.info(f"Processing {len(samples)} video frames for exercise: {exercise_type} (mode={mode})")
+
+        frames = [(idx, timestamp_ms, frame) for idx, (timestamp_ms, frame) in enumerate(samples)]
+
+        return _analyze_frame_sources(
+            frames,
+            frames_total=len(samples),
+            duration_ms=samples[-1][0] - samples[0][0],
+            exercise_type=exercise_type,
+            mode=mode,
+            start_time=start_time,
+            endpoint='analyze_video',
+            response_format=response_format,
+            fields=fields,
+            precision=precision,
+            timings=_parse_flag(data.get('timings'))
+        )
+
+    except RequestEntityTooLarge:
+        raise
 
     except Exception as e:
-        logger.error(f"Error processing frames: {str(e)}")
+        logger.error(f"Error processing video: {str(e)}")
         logger.error(traceback.format_exc())
 
         if config.ENABLE_METRICS:
-            REQUEST_COUNT.labels(endpoint='analyze_frames', status='error').inc()
+            REQUEST_COUNT.labels(endpoint='analyze_video', status='error').inc()
 
         return jsonify({
             'success': False,
@@ -243,35 +1333,161 @@ def analyze_frames():
             'traceback': traceback.format_exc() if config.DEBUG else None
         }), 500
 
+    finally:
+        if upload_path and os.path.exists(upload_path):
+            os.unlink(upload_path)
+
+
+def _parse_timestamps(value: Any) -> Optional[List[float]]:
+    """
+    Converte timestamps_ms recebidos em JSON ou em campo de formulário.
+
+    Aceita lista, string JSON ("[0, 500]") ou string separada por vírgula ("0,500").
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            value = json.loads(value)
+        else:
+            value = value.split(',')
+    return [float(t) for t in value]
+
+
+def _read_upload(upload) -> memoryview:
+    """
+    Retorna o conteúdo de um upload como memoryview, sem copiar o buffer.
+
+    Raises:
+        ValueError: Se o arquivo estiver vazio ou exceder MAX_IMAGE_SIZE_MB
+    """
+    stream = upload.stream
+    if isinstance(stream, BytesIO):
+        buffer = stream.getbuffer()
+    else:
+        buffer = memoryview(upload.read())
+
+    if len(buffer) == 0:
+        raise ValueError(f'Empty upload: {upload.filename}')
+    if len(buffer) > config.MAX_IMAGE_SIZE_MB * 1024 * 1024:
+        raise ValueError(f'Image too large: {upload.filename}. Maximum {config.MAX_IMAGE_SIZE_MB}MB allowed.')
+
+    return buffer
+
+
+def _frames_from_uploads(uploads: List[Any], timestamps_value: Any) -> List[Dict[str, Any]]:
+    """
+    Monta os frames de /analyze-frames a partir de arquivos enviados em multipart.
+
+    Args:
+        uploads: Arquivos do campo "frames", em ordem
+        timestamps_value: Campo timestamps_ms do formulário
+
+    Returns:
+        Lista de dicts com timestamp_ms e image (bytes da imagem codificada)
+
+    Raises:
+        ValueError: Se timestamps_ms faltar, não corresponder aos arquivos ou
+            algum arquivo for inválido
+    """
+    timestamps_ms = _parse_timestamps(timestamps_value)
+    if timestamps_ms is None or len(timestamps_ms) != len(uploads):
+        raise ValueError('timestamps_ms must have one entry per uploaded frame')
+
+    frames = []
+    for upload, timestamp_ms in zip(uploads, timestamps_ms):
+        # bytes: o buffer precisa ser serializado para o pool de processos
+        frames.append({
+            'timestamp_ms': timestamp_ms,
+            'image': bytes(_read_upload(upload))
+        })
+    return frames
+
 
 @app.route('/analyze-single-frame', methods=['POST'])
 def analyze_single_frame():
     """
     Analisa um único frame (útil para debug/teste).
+
+    Aceita:
+    - JSON: {"frame_path": "/tmp/frame.jpg", "exercise_type": "squat"}
+    - multipart/form-data: arquivo no campo "frame" + exercise_type
+    - corpo binário (image/* ou application/octet-stream) com
+      exercise_type na query string
     """
     start_time = time.time()
 
     try:
-        data = request.get_json()
-
-        if not data or 'frame_path' not in data:
+        upload = request.files.get('frame')
+
+        if upload is not None:
+            data = request.form
+            try:
+                image = _read_upload(upload)
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+        elif request.mimetype.startswith('image/') or request.mimetype == 'application/octet-stream':
+            data = request.args
+            # Tamanho conferido pelo Content-Length, antes de ler o corpo
+            if (request.content_length or 0) > config.MAX_IMAGE_SIZE_MB * 1024 * 1024:
+                return jsonify({
+                    'success': False,
+                    'error': f'Image too large. Maximum {config.MAX_IMAGE_SIZE_MB}MB allowed.'
+                }), 413
+            image = request.get_data(cache=False)
+            if not image:
+                return jsonify({
+                    'success': False,
+                    'error': 'Empty image body'
+                }), 400
+        else:
+            data = request.get_json(silent=True)
+
+            if not data or 'frame_path' not in data:
+                return jsonify({
+                    'success': False,
+                    'error': 'Missing frame_path'
+                }), 400
+
+            image = data['frame_path']
+
+            # Verificar arquivo
+            if not os.path.exists(image):
+                return jsonify({
+                    'success': False,
+                    'error': f'Frame file not found: {image}'
+                }), 404
+
+        try:
+            exercise_type = _parse_exercise_type(data)
+        except ValueError as e:
             return jsonify({
                 'success': False,
-                'error': 'Missing frame_path'
+                'error': str(e)
             }), 400
 
-        frame_path = data['frame_path']
-        exercise_type = data.get('exercise_type', 'squat')
-
-        # Verificar arquivo
-        if not os.path.exists(frame_path):
-            return jsonify({
-                'success': False,
-                'error': f'Frame file not found: {frame_path}'
-            }), 404
+        if not _acquire_frames(1):
+            return _busy_response('analyze_single_frame')
 
         # Processar
-        pose_result = pose_detector.process_image(frame_path)
+        admitted_at = time.time()
+        complexity = _choose_complexity(1)
+        try:
+            with detector_pools[complexity].checkout() as detector:
+                pose_result = detector.process_image(image)
+        finally:
+            _release_frames(1, time.time() - admitted_at)
+
+        if config.ENABLE_METRICS and pose_result.get('escalated'):
+            FRAMES_ESCALATED.labels(exercise_type=_exercise_label(exercise_type)).inc()
+
+        pose_timings = pose_result.get('timings', {})
+        if pose_timings:
+            complexity_policy.observe(complexity, 1, sum(pose_timings.values()))
 
         if not pose_result['success']:
             return jsonify({
@@ -279,22 +1495,33 @@ def analyze_single_frame():
                 'error': pose_result.get('error', 'Failed to detect pose')
             }), 400
 
+        for stage, seconds in pose_timings.items():
+            _observe_stage(stage, seconds, exercise_type, complexity)
+
+        stage_start = time.perf_counter()
+        landmarks = pose_result['landmarks']
         angles = biomechanics_engine.calculate_angles(
-            pose_result['landmarks_3d'],
+            landmarks,
             exercise_type
         )
+        _observe_stage('angles', time.perf_counter() - stage_start, exercise_type, complexity)
 
-        confidence = calculate_confidence_score(pose_result['landmarks_3d'])
+        confidence = calculate_confidence_score(landmarks)
         processing_time = int((time.time() - start_time) * 1000)
 
         return jsonify({
             'success': True,
-            'landmarks': pose_result['landmarks_3d'],
+            'landmarks': landmarks.landmarks_3d(),
             'angles': angles,
             'confidence': round(confidence, 3),
-            'processing_time_ms': processing_time
+            'processing_time_ms': processing_time,
+            'model_complexity': complexity,
+            'escalated': pose_result.get('escalated', False)
         }), 200
 
+    except RequestEntityTooLarge:
+        raise
+
     except Exception as e:
         logger.error(f"Error processing single frame: {str(e)}")
         return jsonify({
@@ -304,14 +1531,296 @@ def analyze_single_frame():
         }), 500
 
 
+def _run_job(job_id: str, job: Dict[str, Any], report: Callable) -> Dict[str, Any]:
+    """
+    Processa um job de análise em lotes de JOB_BATCH_SIZE frames.
+
+    Vídeos são decodificados sob demanda, então só um lote de frames fica
+    em memória por vez. Cada lote espera vaga no orçamento de frames do
+    worker (conta na admissão das requisições síncronas), e o modelo é
+    escolhido pela carga no primeiro lote e mantido no job inteiro.
+
+    No modo sequence cada lote é uma sequência própria (map_sequence): o
+    tracking e a ROI recomeçam a cada JOB_BATCH_SIZE frames, como em
+    requisições síncronas consecutivas; só a fase continua entre lotes.
+
+    Args:
+        job_id: Id do job
+        job: Spec gravada por submit_job
+        report: Callback (frames do lote, frames_done) do JobWorker
+
+    Returns:
+        Resumo da análise (duração, tempo de processamento e estatísticas)
+    """
+    start_time = time.time()
+    stats = _new_stats(job['exercise_type'])
+    fields = tuple(job['fields'])
+    frames_total = job['frames_total']
+
+    if job.get('video_path'):
+        samples = islice(
+            iter_video_frames(job['video_path'], fps=job['fps'], timestamps_ms=job['timestamps_ms']),
+            config.MAX_FRAMES_PER_JOB
+        )
+        frames = ((idx, timestamp_ms, frame) for idx, (timestamp_ms, frame) in enumerate(samples))
+    else:
+        frames = iter(_valid_frames(job['frames']))
+
+    frames_done = 0
+    first_ms = last_ms = None
+    # Um detector de fase para o job inteiro: a fase continua entre lotes
+    phase_tracker = biomechanics_engine.phase_tracker(job['exercise_type'])
+
+    for batch in _batched(frames, config.JOB_BATCH_SIZE):
+        _wait_for_frames(len(batch))
+        admitted_at = time.time()
+        try:
+            if frames_done == 0:
+                stats['model_complexity'] = _choose_complexity(len(batch))
+            analyzed = _iter_analyzed_frames(
+                batch,
+                job['exercise_type'],
+                job['mode'],
+                stats,
+                fields,
+                phase_tracker=phase_tracker
+            )
+            report([_jsonable_frame(frame) for frame in analyzed], frames_done + len(batch))
+        finally:
+            _release_frames(len(batch), time.time() - admitted_at)
+
+        frames_done += len(batch)
+        if first_ms is None:
+            first_ms = batch[0][1]
+        last_ms = batch[-1][1]
+
+    _learn_inference_cost(stats)
+    logger.info(f"Job {job_id}: {stats['frames_processed']}/{frames_done} frames processed")
+
+    if job.get('video_path'):
+        # Estimativa substituída pelo total real de frames decodificados
+        frames_total = frames_done
+
+    duration_ms = last_ms - first_ms if first_ms is not None else 0
+    return _build_summary(stats, frames_total, duration_ms, start_time, job.get('timings', False))
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Agrupa um iterável em listas de até size itens."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, max(1, size)))
+        if not batch:
+            return
+        yield batch
+
+
+job_worker = JobWorker(
+    job_store,
+    _run_job,
+    threads=config.JOB_WORKER_THREADS,
+    lease_seconds=config.JOB_LEASE_SECONDS
+)
+
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Submete uma análise assíncrona (até MAX_FRAMES_PER_JOB frames).
+
+    Input JSON: mesmos campos de /analyze-frames ("frames") ou de
+    /analyze-video ("video_path", "fps", "timestamps_ms"), com caminhos
+    acessíveis ao serviço.
+
+    Output (202):
+    {
+        "success": true,
+        "job_id": "…",
+        "status": "queued",
+        "status_url": "/jobs/<job_id>",
+        "result_url": "/jobs/<job_id>/result"
+    }
+    """
+    if not jobs_enabled:
+        return jsonify({
+            'success': False,
+            'error': 'Async jobs require JOB_BACKEND=redis with more than one gunicorn worker'
+        }), 503
+
+    data = request.get_json(silent=True)
+
+    if not data or ('frames' not in data and 'video_path' not in data):
+        return jsonify({
+            'success': False,
+            'error': 'Missing frames or video_path'
+        }), 400
+
+    mode = data.get('mode', 'independent')
+    if mode not in ANALYSIS_MODES:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid mode: {mode}. Allowed: {", ".join(ANALYSIS_MODES)}'
+        }), 400
+
+    try:
+        exercise_type = _parse_exercise_type(data)
+        fields = _parse_fields(data.get('fields'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+    job = {
+        'status': JOB_QUEUED,
+        'exercise_type': exercise_type,
+        'mode': mode,
+        'fields': list(fields),
+        'timings': _parse_flag(data.get('timings')),
+        'frames_done': 0,
+        'created_at': time.time()
+    }
+
+    if 'frames' in data:
+        frames_input = data['frames']
+        if not frames_input:
+            return jsonify({
+                'success': False,
+                'error': 'Missing frames data'
+            }), 400
+        # Progresso contado sobre os frames válidos (os demais são descartados)
+        frames_total = len(_valid_frames(frames_input))
+        if not frames_total:
+            return jsonify({
+                'success': False,
+                'error': 'No valid frames'
+            }), 400
+        job['frames'] = frames_input
+        job['frames_total'] = frames_total
+    else:
+        video_path = data['video_path']
+        if not os.path.exists(video_path):
+            return jsonify({
+                'success': False,
+                'error': f'Video file not found: {video_path}'
+            }), 404
+
+        try:
+            job['fps'] = float(data.get('fps', config.VIDEO_SAMPLE_FPS))
+            job['timestamps_ms'] = _parse_timestamps(data.get('timestamps_ms'))
+            job['frames_total'] = estimate_sample_count(video_path, job['fps'], job['timestamps_ms'])
+        except (TypeError, ValueError) as e:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid video job: {str(e)}'
+            }), 400
+        job['video_path'] = video_path
+
+    if job['frames_total'] > config.MAX_FRAMES_PER_JOB:
+        return jsonify({
+            'success': False,
+            'error': f'Too many frames. Maximum {config.MAX_FRAMES_PER_JOB} allowed per job.'
+        }), 400
+
+    job_id = new_job_id()
+    job_store.create(job_id, job)
+    job_store.enqueue(job_id)
+    job_worker.ensure_started()
+
+    logger.info(f"Job {job_id} queued: {job['frames_total']} frames for exercise: {job['exercise_type']}")
+
+    response = jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': JOB_QUEUED,
+        'status_url': f'/jobs/{job_id}',
+        'result_url': f'/jobs/{job_id}/result'
+    })
+    response.headers['Location'] = f'/jobs/{job_id}'
+    return response, 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id: str):
+    """
+    Status e progresso de um job.
+
+    Output:
+    {
+        "success": true,
+        "job_id": "…",
+        "status": "running",   // queued, running, completed, failed
+        "progress": {"frames_done": 48, "frames_total": 300}
+    }
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Job not found: {job_id}'
+        }), 404
+
+    status = {
+        'success': True,
+        'job_id': job_id,
+        'status': job['status'],
+        'progress': {
+            'frames_done': job.get('frames_done', 0),
+            'frames_total': job['frames_total']
+        }
+    }
+    if job['status'] == JOB_FAILED:
+        status['error'] = job.get('error')
+
+    return jsonify(status), 200
+
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id: str):
+    """
+    Resultado de um job concluído, no mesmo formato JSON de /analyze-frames.
+
+    Retorna 409 enquanto o job não estiver concluído (ou se ele falhou).
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Job not found: {job_id}'
+        }), 404
+
+    if job['status'] != JOB_COMPLETED:
+        return jsonify({
+            'success': False,
+            'job_id': job_id,
+            'status': job['status'],
+            'error': job.get('error') or 'Job not completed yet'
+        }), 409
+
+    summary = job['summary']
+    result = {
+        'success': summary['statistics']['frames_processed'] > 0,
+        'job_id': job_id,
+        'frames': job_store.get_frames(job_id),
+        **summary
+    }
+    if not result['success']:
+        result['error'] = 'No frames could be processed'
+
+    return jsonify(result), 200
+
+
 @app.route('/config', methods=['GET'])
 def get_current_config():
     """Retorna configuração atual (sem dados sensíveis)"""
     return jsonify({
         'model_complexity': config.MODEL_COMPLEXITY,
+        'model_complexities': model_complexities,
+        'latency_slo_ms': config.LATENCY_SLO_MS,
         'min_detection_confidence': config.MIN_DETECTION_CONFIDENCE,
         'min_tracking_confidence': config.MIN_TRACKING_CONFIDENCE,
         'max_frames_per_request': config.MAX_FRAMES_PER_REQUEST,
+        'exercises': biomechanics_engine.registry.names,
         'environment': env
     }), 200
 
@@ -321,6 +1830,15 @@ def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
 
 
+@app.errorhandler(413)
+def request_too_large(error):
+    # LimitedBuffer informa o limite por imagem; o do Werkzeug, o do corpo
+    message = error.description
+    if message == RequestEntityTooLarge.description:
+        message = f'Request too large. Maximum {config.MAX_REQUEST_SIZE_MB}MB allowed.'
+    return jsonify({'success': False, 'error': message}), 413
+
+
 @app.errorhandler(500)
 def internal_error(error):
     logger.error(f"Internal server error: {str(error)}")
@@ -330,6 +1848,7 @@ def internal_error(error):
 if __name__ == '__main__':
     logger.info(f"Starting MediaPipe service on {config.HOST}:{config.PORT}")
     logger.info(f"Configuration: {config.to_dict()}")
+    init_worker()
 
     app.run(
         host=config.HOST,
@@ -0,0 +1,146 @@
+"""
+Detecção de fase do movimento em fluxo contínuo.
+
+Em vez da posição do frame no vídeo (frame_number / total_frames), a fase
+vem do sinal do exercício (média dos ângulos declarados em "phase.signal")
+e da sua velocidade (°/s), os dois estimados por um filtro alfa-beta
+criticamente amortecido (constante de tempo smoothing_ms):
+
+- sinal caindo acima de velocity_enter: fase "falling" do exercício
+  (eccentric no squat, concentric na remada); subindo: a oposta
+- ao parar (velocidade abaixo de velocity_exit, ou abaixo de
+  velocity_enter já além do limiar para onde ia): acima de top é 'top',
+  abaixo de bottom é 'bottom'; entre os dois, parar depois de cair é
+  'bottom' (ponto de virada) e depois de subir é 'top'
+- inversão direta entre dois frames (fps baixo) marca o frame como a virada
+- no primeiro frame ainda não há velocidade: a fase é top/bottom se o
+  sinal já está além do limiar, senão 'unknown' até o movimento começar
+
+Os dois limiares de velocidade dão a histerese: ruído perto de zero não
+alterna a fase. Cada frame custa O(1) e não depende do total de frames,
+então a fase sai junto com o frame, em streams sem fim ou em sequências
+completas.
+"""
+
+import math
+from typing import Dict, Optional
+
+from exercise_registry import Exercise
+
+# Intervalo assumido entre frames sem timestamp (ou com timestamp repetido)
+DEFAULT_FRAME_INTERVAL_MS = 1000 / 30
+
+
+class PhaseTracker:
+    """Máquina de estados de fase de uma série (não thread-safe: uma por análise)."""
+
+    def __init__(self, exercise: Exercise):
+        """
+        Args:
+            exercise: Exercício compilado (sinal, limiares e parâmetros de fase)
+        """
+        self.exercise = exercise
+        self._rising_phase = 'concentric' if exercise.phase_falling == 'eccentric' else 'eccentric'
+        self.reset()
+
+    def reset(self) -> None:
+        """Volta ao estado inicial (nova série)."""
+        self.phase = 'unknown'
+        self.signal: Optional[float] = None  # Sinal suavizado (graus)
+        self.velocity = 0.0  # Velocidade suavizada (°/s)
+        self._direction = 0  # -1 caindo, 1 subindo, 0 parado
+        self._last_ms: Optional[float] = None
+
+    def update(self, angles: Dict[str, float], timestamp_ms: Optional[float] = None) -> str:
+        """
+        Fase do próximo frame.
+
+        Args:
+            angles: Ângulos do frame (calculate_angles)
+            timestamp_ms: Instante do frame; sem ele, frames a 30 fps
+
+        Returns:
+            'top', 'eccentric', 'bottom', 'concentric' ou 'unknown' (exercício
+            sem sinal de fase, ou parado entre os limiares antes do primeiro
+            movimento)
+        """
+        values = [angles.get(column, 0.0) for column in self.exercise.phase_signal]
+        # Ângulo 0.0 = articulação não detectada: mantém a fase anterior
+        if not values or not all(values):
+            return self.phase
+        return self.update_signal(sum(values) / len(values), timestamp_ms)
+
+    def update_signal(self, signal: float, timestamp_ms: Optional[float] = None) -> str:
+        """Como update, recebendo o sinal de fase já calculado."""
+        exercise = self.exercise
+
+        if self._last_ms is None:
+            self.signal = signal
+            self._last_ms = 0.0 if timestamp_ms is None else timestamp_ms
+            self.phase = self._resting_phase(signal, default='unknown')
+            return self.phase
+
+        if timestamp_ms is None:
+            timestamp_ms = self._last_ms + DEFAULT_FRAME_INTERVAL_MS
+        dt = (timestamp_ms - self._last_ms) / 1000
+        if dt <= 0:
+            dt = DEFAULT_FRAME_INTERVAL_MS / 1000
+        self._last_ms = timestamp_ms
+
+        # Peso da amostra pela constante de tempo: o mesmo comportamento a
+        # 5 ou 30 fps
+        smoothing = exercise.phase_smoothing_ms / 1000
+        discount = math.exp(-dt / smoothing) if smoothing > 0 else 0.0
+
+        # Filtro alfa-beta criticamente amortecido (fading memory): a previsão
+        # pela velocidade atual evita o atraso de uma média móvel em rampas
+        predicted = self.signal + self.velocity * dt
+        residual = signal - predicted
+        self.signal = predicted + (1 - discount ** 2) * residual
+        self.velocity += (1 - discount) ** 2 * residual / dt
+
+        if self.velocity <= -exercise.phase_velocity_enter:
+            direction = -1
+        elif self.velocity >= exercise.phase_velocity_enter:
+            direction = 1
+        elif abs(self.velocity) < exercise.phase_velocity_exit or self._arrived(self.signal, self._direction):
+            # Parado, ou desacelerando já além do limiar para onde ia
+            direction = 0
+        else:
+            direction = self._direction  # Entre os limiares: mantém (histerese)
+
+        if direction != 0 and self._direction == 0 and self._arrived(self.signal, direction):
+            # Parado além do limiar: ruído na mesma direção não reinicia o movimento
+            direction = 0
+
+        if direction != 0 and direction == -self._direction:
+            # Inverteu entre dois frames (fps baixo): o frame marca a virada
+            self.phase = 'bottom' if self._direction < 0 else 'top'
+        elif direction < 0:
+            self.phase = exercise.phase_falling
+        elif direction > 0:
+            self.phase = self._rising_phase
+        elif self._direction != 0:
+            # Acabou de parar: virada embaixo após cair, em cima após subir
+            self.phase = self._resting_phase(self.signal, default='bottom' if self._direction < 0 else 'top')
+        else:
+            self.phase = self._resting_phase(self.signal, default=self.phase)
+
+        self._direction = direction
+        return self.phase
+
+    def _arrived(self, signal: float, direction: int) -> bool:
+        """Se o sinal já passou do limiar na direção do movimento."""
+        if direction < 0:
+            return self.exercise.phase_bottom is not None and signal < self.exercise.phase_bottom
+        if direction > 0:
+            return self.exercise.phase_top is not None and signal > self.exercise.phase_top
+        return False
+
+    def _resting_phase(self, signal: float, default: str) -> str:
+        """Fase parada pelos limiares top/bottom; entre eles, default."""
+        if self.exercise.phase_top is not None and signal > self.exercise.phase_top:
+            return 'top'
+        if self.exercise.phase_bottom is not None and signal < self.exercise.phase_bottom:
+            return 'bottom'
+        return default
@@ -6,11 +6,120 @@ Encapsula a lógica de detecção de pose e extração de landmarks.
 import mediapipe as mp
 import cv2
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Optional, Tuple, Union
 import logging
+import os
+import time
+
+from pose_frame import LANDMARK_IDS, LANDMARK_NAMES, PoseFrame, Roi, landmarks_array
+from utils import CRITICAL_LANDMARK_IDS, calculate_confidence_score
 
 logger = logging.getLogger(__name__)
 
+# Origem de uma imagem: caminho no disco, frame BGR já decodificado ou
+# bytes do arquivo codificado (JPEG/PNG) recebidos na requisição
+ImageSource = Union[str, np.ndarray, bytes, memoryview]
+
+# Estruturas de landmarks opcionais da resposta. Os landmarks da imagem
+# (normalizados e em pixels) são sempre extraídos: ângulos e confiança
+# dependem deles; world_landmarks só quando pedido.
+OPTIONAL_LANDMARK_FIELDS = ('landmarks_normalized', 'world_landmarks')
+
+# Distância normalizada entre os quadris abaixo da qual a vista é lateral
+# (quadris sobrepostos; landmarks do lado oculto são pouco confiáveis)
+SIDE_VIEW_HIP_WIDTH = 0.12
+
+# Região de interesse (ROI) em process_sequence (ver pose_frame.Roi)
+# Margem acrescentada em cada lado da caixa dos landmarks (fração do tamanho)
+ROI_PADDING = 0.25
+# Lado maior do recorte depois do redimensionamento (pixels)
+ROI_MAX_SIDE = 512
+# Confiança abaixo da qual o frame seguinte volta para a imagem inteira
+ROI_MIN_CONFIDENCE = 0.5
+# ROI que cobre mais que esta fração da imagem não compensa o recorte
+ROI_MAX_AREA = 0.8
+
+# Fatores de decodificação reduzida de JPEG suportados pelo OpenCV
+JPEG_REDUCED_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+
+
+def preload_model_assets(model_complexity: int) -> List[str]:
+    """
+    Garante que os arquivos do modelo (grafo e pesos TFLite) estão no pacote.
+
+    Chamado no master do gunicorn (preload_app): os pesos lite/heavy, que
+    não vêm no pacote e o MediaPipe baixa no primeiro uso, são baixados uma
+    única vez, em vez de cada worker baixar o mesmo arquivo em paralelo.
+    Sem o download (API do mediapipe indisponível ou sem rede), cada worker
+    baixa o arquivo ao criar o primeiro detector, como sem preload.
+
+    Returns:
+        Caminhos dos arquivos presentes
+    """
+    landmark_model = {0: 'lite', 1: 'full', 2: 'heavy'}[model_complexity]
+    relative_paths = [
+        os.path.join('modules', 'pose_landmark', 'pose_landmark_cpu.binarypb'),
+        os.path.join('modules', 'pose_landmark', f'pose_landmark_{landmark_model}.tflite'),
+        os.path.join('modules', 'pose_detection', 'pose_detection.tflite'),
+    ]
+    root = os.path.dirname(mp.__file__)
+    paths = [os.path.join(root, path) for path in relative_paths]
+
+    if not os.path.exists(paths[1]):
+        _download_model_asset(f'mediapipe/modules/pose_landmark/pose_landmark_{landmark_model}.tflite')
+
+    return [path for path in paths if os.path.exists(path)]
+
+
+def _download_model_asset(model_path: str) -> None:
+    """Baixa um arquivo de modelo do MediaPipe (caminho relativo ao pacote)."""
+    try:
+        from mediapipe.python.solutions.download_utils import download_oss_model
+    except ImportError:
+        logger.warning(f"mediapipe download_utils unavailable, {model_path} will be downloaded by each worker")
+        return
+
+    try:
+        download_oss_model(model_path)
+    except OSError as e:
+        logger.warning(f"Could not preload {model_path}: {str(e)}")
+
+
+def jpeg_size(data: memoryview) -> Optional[Tuple[int, int]]:
+    """
+    Lê (largura, altura) do cabeçalho SOF de um JPEG sem decodificá-lo.
+
+    Returns:
+        Dimensões gravadas no arquivo (antes da orientação EXIF) ou None se
+        não for JPEG
+    """
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Bytes de preenchimento entre segmentos
+            i += 1
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = int.from_bytes(data[i + 5:i + 7], 'big')
+            width = int.from_bytes(data[i + 7:i + 9], 'big')
+            return width, height
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Marcadores sem segmento
+            i += 2
+            continue
+        i += 2 + int.from_bytes(data[i + 2:i + 4], 'big')
+    return None
+
 
 class PoseDetector:
     """
@@ -18,31 +127,18 @@ class PoseDetector:
     """
 
     # Mapeamento de landmarks do MediaPipe
-    LANDMARK_NAMES = {
-        0: 'nose',
-        11: 'left_shoulder',
-        12: 'right_shoulder',
-        13: 'left_elbow',
-        14: 'right_elbow',
-        15: 'left_wrist',
-        16: 'right_wrist',
-        23: 'left_hip',
-        24: 'right_hip',
-        25: 'left_knee',
-        26: 'right_knee',
-        27: 'left_ankle',
-        28: 'right_ankle',
-        29: 'left_heel',
-        30: 'right_heel',
-        31: 'left_foot_index',
-        32: 'right_foot_index',
-    }
+    LANDMARK_NAMES = LANDMARK_NAMES
 
     def __init__(
         self,
         model_complexity: int = 1,
         min_detection_confidence: float = 0.7,
-        min_tracking_confidence: float = 0.7
+        min_tracking_confidence: float = 0.7,
+        static_image_mode: bool = True,
+        cascade_complexity: Optional[int] = None,
+        cascade_threshold: float = 0.7,
+        roi_crop: bool = False,
+        max_input_side: int = 0
     ):
         """
         Inicializa MediaPipe Pose.
@@ -51,180 +147,410 @@ class PoseDetector:
             model_complexity: 0 (lite), 1 (full), 2 (heavy)
             min_detection_confidence: Confiança mínima para detecção (0.0-1.0)
             min_tracking_confidence: Confiança mínima para tracking (0.0-1.0)
+            static_image_mode: True processa cada imagem independentemente;
+                False usa tracking entre frames consecutivos (o detector de
+                pessoa só roda quando o tracking é perdido)
+            cascade_complexity: Modelo mais pesado para a cascata: frames
+                com confiança ou visibilidade de landmarks críticos abaixo de
+                cascade_threshold, ou em vista lateral, são reprocessados
+                nele (None ou não mais pesado que model_complexity desativa)
+            cascade_threshold: Limiar de confiança/visibilidade da cascata
+            roi_crop: Em process_sequence, recorta cada frame na região da
+                pose do frame anterior (com margem) antes da inferência
+            max_input_side: Lado maior da imagem inferida (pixels): JPEGs
+                são decodificados em escala reduzida e os demais formatos
+                redimensionados antes da conversão de cor; os landmarks
+                voltam na escala original (0 desativa)
         """
         self.model_complexity = model_complexity
         self.min_detection_confidence = min_detection_confidence
         self.min_tracking_confidence = min_tracking_confidence
+        self.static_image_mode = static_image_mode
 
-        # Inicializar MediaPipe Pose
+        # O grafo do MediaPipe (threads e buffers nativos) só é criado no
+        # primeiro uso, no processo que vai usá-lo: com preload_app o
+        # detector é construído no master do gunicorn e cada worker monta o
+        # seu grafo depois do fork.
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=True,  # Processar cada imagem independentemente
-            model_complexity=model_complexity,
-            enable_segmentation=False,  # Não precisamos de segmentação
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence
-        )
+        self._pose = None
+
+        if cascade_complexity is not None and cascade_complexity <= model_complexity:
+            cascade_complexity = None
+        self.cascade_complexity = cascade_complexity
+        self.cascade_threshold = cascade_threshold
+        self._cascade_pose = None
+        self.roi_crop = roi_crop
+        self.max_input_side = max_input_side
+
+    @property
+    def pose(self):
+        """Grafo MediaPipe Pose, criado sob demanda."""
+        if self._pose is None:
+            self._pose = self.mp_pose.Pose(
+                static_image_mode=self.static_image_mode,
+                model_complexity=self.model_complexity,
+                enable_segmentation=False,  # Não precisamos de segmentação
+                min_detection_confidence=self.min_detection_confidence,
+                min_tracking_confidence=self.min_tracking_confidence
+            )
+            logger.info(
+                f"PoseDetector initialized with model_complexity={self.model_complexity}, "
+                f"static_image_mode={self.static_image_mode}"
+            )
+        return self._pose
+
+    @property
+    def cascade_pose(self):
+        """Grafo do modelo da cascata (sempre estático: reprocessa frames isolados)."""
+        if self._cascade_pose is None:
+            self._cascade_pose = self.mp_pose.Pose(
+                static_image_mode=True,
+                model_complexity=self.cascade_complexity,
+                enable_segmentation=False,
+                min_detection_confidence=self.min_detection_confidence,
+                min_tracking_confidence=self.min_tracking_confidence
+            )
+            logger.info(f"PoseDetector cascade initialized with model_complexity={self.cascade_complexity}")
+        return self._cascade_pose
+
+    def warm_up(self, image: np.ndarray, cascade: bool = True) -> None:
+        """
+        Primeira inferência nos grafos do detector.
+
+        Args:
+            image: Imagem do warm-up
+            cascade: Criar e aquecer também o grafo da cascata (senão ele é
+                criado no primeiro frame que escalar)
+        """
+        self.process_sequence([image])
+        if cascade and self.cascade_complexity is not None:
+            self.cascade_pose.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+    def _needs_escalation(self, landmarks: PoseFrame) -> bool:
+        """Frame difícil para o modelo leve (ver cascade_complexity)."""
+        if calculate_confidence_score(landmarks) < self.cascade_threshold:
+            return True
 
-        logger.info(f"PoseDetector initialized with model_complexity={model_complexity}")
+        if (landmarks.visibility[CRITICAL_LANDMARK_IDS] < self.cascade_threshold).any():
+            return True
 
-    def process_image(self, image_path: str) -> Dict[str, Any]:
+        hip_width = np.linalg.norm(landmarks.normalized[23, :2] - landmarks.normalized[24, :2])
+        return hip_width < SIDE_VIEW_HIP_WIDTH
+
+    @staticmethod
+    def _crop_to_roi(image: np.ndarray, roi: Optional[Roi]) -> Tuple[np.ndarray, Optional[Roi]]:
+        """
+        Recorta a imagem na ROI e reduz o recorte para ROI_MAX_SIDE.
+
+        Returns:
+            (imagem a inferir, ROI efetiva em pixels inteiros, normalizada);
+            sem ROI, ou com uma ROI vazia após limitar à imagem, a imagem
+            inteira e None
+        """
+        if roi is None:
+            return image, None
+
+        height, width = image.shape[:2]
+        left, top, roi_width, roi_height = roi
+        x0 = min(width, max(0, round(left * width)))
+        y0 = min(height, max(0, round(top * height)))
+        x1 = min(width, max(0, round((left + roi_width) * width)))
+        y1 = min(height, max(0, round((top + roi_height) * height)))
+        crop = image[y0:y1, x0:x1]
+        if crop.size == 0:
+            # ROI fora da imagem (ou menor que um pixel): usa a imagem inteira
+            return image, None
+
+        scale = ROI_MAX_SIDE / max(crop.shape[:2])
+        if scale < 1:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+
+        return crop, (x0 / width, y0 / height, (x1 - x0) / width, (y1 - y0) / height)
+
+    @staticmethod
+    def _next_roi(result: Dict[str, Any], roi: Optional[Roi]) -> Optional[Roi]:
+        """
+        ROI do próximo frame a partir da pose deste.
+
+        Mantém a ROI atual enquanto a pose fica longe das bordas (o tracking
+        do MediaPipe depende de o enquadramento não mudar) e volta para a
+        imagem inteira quando a pose some ou a confiança cai.
+        """
+        if not result.get('success') or calculate_confidence_score(result['landmarks']) < ROI_MIN_CONFIDENCE:
+            return None
+
+        landmarks = result['landmarks']
+        visible = landmarks.normalized[landmarks.visibility >= ROI_MIN_CONFIDENCE, :2]
+        if not len(visible):
+            return None
+        (box_left, box_top), (box_right, box_bottom) = visible.min(axis=0).tolist(), visible.max(axis=0).tolist()
+        if box_right <= box_left or box_bottom <= box_top:
+            return None
+        pad_x = (box_right - box_left) * ROI_PADDING
+        pad_y = (box_bottom - box_top) * ROI_PADDING
+
+        if roi is not None:
+            left, top, width, height = roi
+            # Pose ainda a meia margem das bordas (ou da imagem): mantém o enquadramento
+            if (max(0.0, box_left - pad_x / 2) >= left and min(1.0, box_right + pad_x / 2) <= left + width and
+                    max(0.0, box_top - pad_y / 2) >= top and min(1.0, box_bottom + pad_y / 2) <= top + height):
+                return roi
+
+        left, top = max(0.0, box_left - pad_x), max(0.0, box_top - pad_y)
+        right, bottom = min(1.0, box_right + pad_x), min(1.0, box_bottom + pad_y)
+        # Pose fora da imagem (caixa vazia após limitar) ou grande demais
+        if right <= left or bottom <= top or (right - left) * (bottom - top) > ROI_MAX_AREA:
+            return None
+        return (left, top, right - left, bottom - top)
+
+    def process_image(
+        self,
+        image_path: ImageSource,
+        include: Optional[Iterable[str]] = None,
+        roi: Optional[Roi] = None
+    ) -> Dict[str, Any]:
         """
         Processa uma imagem e extrai landmarks de pose.
 
         Args:
-            image_path: Caminho para a imagem
+            image_path: Caminho para a imagem, frame BGR já decodificado ou
+                bytes da imagem codificada
+            include: Estruturas opcionais a extrair (OPTIONAL_LANDMARK_FIELDS);
+                None extrai todas. Sem world_landmarks, PoseFrame.world é None.
+            roi: Região (left, top, width, height normalizados) onde inferir;
+                os landmarks voltam em coordenadas da imagem inteira
 
         Returns:
             Dict contendo:
                 - success: bool
-                - landmarks_3d: List de landmarks com coordenadas 3D
-                - landmarks_normalized: Array numpy normalizado
-                - world_landmarks: Landmarks em coordenadas do mundo real
+                - landmarks: PoseFrame com os arrays de landmarks (world
+                  só se pedido em include)
+                - image_shape: Dimensões da imagem original
+                - timings: Segundos gastos em decode, inference e extraction
+                - escalated: Se o frame foi reprocessado no modelo da cascata
                 - error: Mensagem de erro (se falhar)
         """
+        include = OPTIONAL_LANDMARK_FIELDS if include is None else include
+
         try:
             # Carregar imagem
-            image = cv2.imread(image_path)
+            started = time.perf_counter()
+            image, (width, height) = self._load_image_capped(image_path)
             if image is None:
                 return {
                     'success': False,
-                    'error': f'Failed to load image: {image_path}'
+                    'error': f'Failed to load image: {self._describe_source(image_path)}'
                 }
 
-            # Converter BGR (OpenCV) para RGB (MediaPipe)
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            # Recortar na ROI e converter BGR (OpenCV) para RGB (MediaPipe)
+            crop, roi = self._crop_to_roi(image, roi)
+            image_rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+            decoded = time.perf_counter()
 
             # Processar com MediaPipe
             results = self.pose.process(image_rgb)
+            landmarks = None
+            if results.pose_landmarks:
+                landmarks = PoseFrame.from_mediapipe(results.pose_landmarks, width, height, roi)
+
+            # Cascata: frames difíceis são reprocessados no modelo mais pesado
+            escalated = False
+            if self.cascade_complexity is not None and (
+                landmarks is None or self._needs_escalation(landmarks)
+            ):
+                escalated = True
+                heavy_results = self.cascade_pose.process(image_rgb)
+                if heavy_results.pose_landmarks:
+                    results = heavy_results
+                    landmarks = PoseFrame.from_mediapipe(results.pose_landmarks, width, height, roi)
+            inferred = time.perf_counter()
 
             if not results.pose_landmarks:
                 return {
                     'success': False,
-                    'error': 'No pose detected in image'
+                    'error': 'No pose detected in image',
+                    'escalated': escalated,
+                    'timings': {
+                        'decode': decoded - started,
+                        'inference': inferred - decoded
+                    }
                 }
 
-            # Extrair landmarks normalizados (0-1)
-            landmarks_normalized = self._extract_landmarks_normalized(results.pose_landmarks)
-
-            # Extrair landmarks 3D (com coordenadas de imagem + profundidade)
-            landmarks_3d = self._extract_landmarks_3d(
-                results.pose_landmarks,
-                image.shape[1],  # width
-                image.shape[0]   # height
-            )
-
             # Extrair world landmarks (coordenadas do mundo real em metros)
-            world_landmarks = None
-            if results.pose_world_landmarks:
-                world_landmarks = self._extract_world_landmarks(results.pose_world_landmarks)
+            if 'world_landmarks' in include and results.pose_world_landmarks:
+                landmarks.world = landmarks_array(results.pose_world_landmarks)
 
             return {
                 'success': True,
-                'landmarks_3d': landmarks_3d,
-                'landmarks_normalized': landmarks_normalized,
-                'world_landmarks': world_landmarks,
+                'landmarks': landmarks,
                 'image_shape': {
-                    'width': image.shape[1],
-                    'height': image.shape[0]
+                    'width': width,
+                    'height': height
+                },
+                'escalated': escalated,
+                'timings': {
+                    'decode': decoded - started,
+                    'inference': inferred - decoded,
+                    'extraction': time.perf_counter() - inferred
                 }
             }
 
         except Exception as e:
-            logger.error(f"Error processing image {image_path}: {str(e)}")
+            logger.error(f"Error processing image {self._describe_source(image_path)}: {str(e)}")
             return {
                 'success': False,
                 'error': str(e)
             }
 
-    def _extract_landmarks_normalized(self, pose_landmarks) -> np.ndarray:
+    @staticmethod
+    def _load_image(source: ImageSource) -> Optional[np.ndarray]:
         """
-        Extrai landmarks normalizados (0-1) como array numpy.
+        Carrega a imagem BGR a partir do caminho, dos bytes codificados ou
+        usa o frame já decodificado.
 
         Args:
-            pose_landmarks: MediaPipe pose landmarks
+            source: Caminho, array BGR (H, W, 3) ou bytes da imagem codificada
 
         Returns:
-            Array numpy de shape (33, 4) com [x, y, z, visibility]
-        """
-        landmarks = []
-        for landmark in pose_landmarks.landmark:
-            landmarks.append([
-                landmark.x,
-                landmark.y,
-                landmark.z,
-                landmark.visibility
-            ])
-        return np.array(landmarks, dtype=np.float32)
-
-    def _extract_landmarks_3d(
-        self,
-        pose_landmarks,
-        image_width: int,
-        image_height: int
-    ) -> List[Dict[str, Any]]:
+            Array BGR ou None se não for possível carregar
+        """
+        if isinstance(source, np.ndarray):
+            return source
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            # Decodificar direto do buffer, sem cópia e sem arquivo temporário
+            buffer = np.frombuffer(memoryview(source), dtype=np.uint8)
+            if buffer.size == 0:
+                return None
+            return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+        return cv2.imread(source)
+
+    def _load_image_capped(self, source: ImageSource) -> Tuple[Optional[np.ndarray], Tuple[int, int]]:
         """
-        Extrai landmarks 3D com coordenadas em pixels + profundidade relativa.
+        Carrega a imagem com o lado maior limitado a max_input_side.
 
-        Args:
-            pose_landmarks: MediaPipe pose landmarks
-            image_width: Largura da imagem
-            image_height: Altura da imagem
+        JPEGs são decodificados direto em 1/2, 1/4 ou 1/8 da resolução
+        (menos tempo e memória que decodificar inteiro e reduzir); o que
+        passar do limite depois disso é redimensionado uma vez.
 
         Returns:
-            Lista de dicts com landmarks
-        """
-        landmarks = []
-        for idx, landmark in enumerate(pose_landmarks.landmark):
-            landmark_dict = {
-                'id': idx,
-                'name': self.LANDMARK_NAMES.get(idx, f'landmark_{idx}'),
-                'x': landmark.x * image_width,  # Converter para pixels
-                'y': landmark.y * image_height,
-                'z': landmark.z,  # Profundidade relativa ao centro do quadril
-                'visibility': landmark.visibility,
-                # Coordenadas normalizadas (útil para comparação)
-                'x_norm': landmark.x,
-                'y_norm': landmark.y,
-                'z_norm': landmark.z
-            }
-            landmarks.append(landmark_dict)
-        return landmarks
-
-    def _extract_world_landmarks(self, world_landmarks) -> List[Dict[str, Any]]:
+            (imagem BGR ou None, (largura, altura) da imagem original)
         """
-        Extrai world landmarks (coordenadas do mundo real em metros).
+        max_side = self.max_input_side
+        image = None
+        original_size = None
+
+        if max_side and not isinstance(source, np.ndarray):
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                data = memoryview(source)
+            else:
+                try:
+                    data = memoryview(np.fromfile(source, dtype=np.uint8))
+                except OSError:
+                    return None, (0, 0)
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            if buffer.size == 0:
+                return None, (0, 0)
+
+            header = jpeg_size(data)
+            factor = 1
+            if header is not None:
+                factor = next((f for f in JPEG_REDUCED_FLAGS if max(header) // f >= max_side), 1)
+            image = cv2.imdecode(buffer, JPEG_REDUCED_FLAGS[factor] if factor > 1 else cv2.IMREAD_COLOR)
+            if image is not None and factor > 1:
+                # O cabeçalho não considera a orientação EXIF aplicada no decode
+                width, height = header
+                if image.shape[1] != -(-width // factor):
+                    width, height = height, width
+                original_size = (width, height)
+        else:
+            image = self._load_image(source)
+
+        if image is None:
+            return None, (0, 0)
+        if original_size is None:
+            original_size = (image.shape[1], image.shape[0])
+
+        scale = max_side / max(image.shape[:2]) if max_side else 1
+        if scale < 1:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return image, original_size
+
+    @staticmethod
+    def _describe_source(source: ImageSource) -> str:
+        """Descrição curta da origem da imagem para logs e erros."""
+        if isinstance(source, np.ndarray):
+            return f'<frame {source.shape[1]}x{source.shape[0]}>'
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return f'<upload {len(source)} bytes>'
+        return str(source)
+
+    def process_sequence(
+        self,
+        images: List[ImageSource],
+        include: Optional[Iterable[str]] = None,
+        deadline: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Processa frames consecutivos de um mesmo vídeo, em ordem.
+
+        Em modo tracking (static_image_mode=False) o estado é reiniciado no
+        início da sequência, para não herdar a pose de outra requisição.
+
+        Com roi_crop, cada frame é inferido só na região da pose do frame
+        anterior (ver _next_roi): decode, conversão de cor e inferência
+        trabalham com uma imagem menor. Ao mudar a região o tracking é
+        reiniciado, pois as coordenadas do frame anterior deixam de valer.
 
         Args:
-            world_landmarks: MediaPipe world landmarks
+            images: Caminhos das imagens ou frames BGR, em ordem temporal
+            include: Estruturas opcionais a extrair (ver process_image)
+            deadline: Instante (time.time()) após o qual nenhum frame novo
+                é processado
 
         Returns:
-            Lista de dicts com world landmarks
-        """
-        landmarks = []
-        for idx, landmark in enumerate(world_landmarks.landmark):
-            landmark_dict = {
-                'id': idx,
-                'name': self.LANDMARK_NAMES.get(idx, f'landmark_{idx}'),
-                'x': landmark.x,  # Metros
-                'y': landmark.y,
-                'z': landmark.z,
-                'visibility': landmark.visibility
-            }
-            landmarks.append(landmark_dict)
-        return landmarks
+            Lista de resultados de process_image, na mesma ordem; menor que
+            images se o deadline foi atingido
+        """
+        self.reset()
+        results = []
+        roi = None
+        for image in images:
+            if deadline is not None and time.time() >= deadline:
+                logger.warning(f"Deadline reached after {len(results)}/{len(images)} frames")
+                break
+            result = self.process_image(image, include, roi)
+            results.append(result)
+
+            if self.roi_crop:
+                next_roi = self._next_roi(result, roi)
+                if next_roi != roi:
+                    self.reset()
+                roi = next_roi
+        return results
+
+    def reset(self) -> None:
+        """Reinicia o estado de tracking do MediaPipe."""
+        if not self.static_image_mode:
+            self.pose.reset()
 
     def get_landmark_by_name(self, landmarks: List[Dict], name: str) -> Optional[Dict]:
         """
-        Busca landmark por nome.
+        Busca landmark por nome (O(1) pelo id do MediaPipe).
 
         Args:
-            landmarks: Lista de landmarks
+            landmarks: PoseFrame ou lista de landmarks
             name: Nome do landmark (ex: 'left_knee')
 
         Returns:
             Dict do landmark ou None se não encontrado
         """
+        idx = LANDMARK_IDS.get(name)
+        if isinstance(landmarks, PoseFrame):
+            return landmarks.landmark(idx) if idx is not None else None
+
+        # Listas completas vêm ordenadas por id; as parciais caem na busca linear
+        if idx is not None and idx < len(landmarks) and landmarks[idx].get('id') == idx:
+            return landmarks[idx]
         for landmark in landmarks:
             if landmark.get('name') == name:
                 return landmark
@@ -232,6 +558,8 @@ class PoseDetector:
 
     def __del__(self):
         """Cleanup MediaPipe resources"""
-        if hasattr(self, 'pose'):
-            self.pose.close()
+        if getattr(self, '_cascade_pose', None) is not None:
+            self._cascade_pose.close()
+        if getattr(self, '_pose', None) is not None:
+            self._pose.close()
             logger.debug("PoseDetector resources released")
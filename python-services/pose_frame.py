@@ -0,0 +1,172 @@
+"""
+Landmarks de um frame em arrays numpy.
+
+Cada frame inferido guarda seus 33 landmarks em arrays (33, 4) float32
+(x, y, z, visibility), em vez de 33 dicts com chaves string por estrutura.
+Ângulos e confiança leem os arrays direto; as listas de dicts da resposta
+JSON (landmarks_3d, world_landmarks) só são montadas quando pedidas.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Nomes dos landmarks do MediaPipe usados na análise (os demais saem como
+# landmark_<id>)
+LANDMARK_NAMES = {
+    0: 'nose',
+    11: 'left_shoulder',
+    12: 'right_shoulder',
+    13: 'left_elbow',
+    14: 'right_elbow',
+    15: 'left_wrist',
+    16: 'right_wrist',
+    23: 'left_hip',
+    24: 'right_hip',
+    25: 'left_knee',
+    26: 'right_knee',
+    27: 'left_ankle',
+    28: 'right_ankle',
+    29: 'left_heel',
+    30: 'right_heel',
+    31: 'left_foot_index',
+    32: 'right_foot_index',
+}
+
+LANDMARK_IDS = {name: idx for idx, name in LANDMARK_NAMES.items()}
+
+NUM_LANDMARKS = 33
+
+# Região (left, top, width, height) normalizada na imagem inteira
+Roi = Tuple[float, float, float, float]
+
+
+def landmarks_array(landmarks) -> np.ndarray:
+    """Landmarks do MediaPipe (protobuf) como array (33, 4) float32."""
+    return np.array(
+        [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks.landmark],
+        dtype=np.float32
+    )
+
+
+class PoseFrame:
+    """
+    Landmarks de um frame: normalizados (0-1), em pixels e do mundo (metros).
+
+    Também funciona como sequência de landmarks (len, índice, iteração),
+    com cada item materializado como o dict de landmarks_3d.
+    """
+
+    __slots__ = ('normalized', 'image', 'world', 'width', 'height')
+
+    def __init__(
+        self,
+        normalized: np.ndarray,
+        width: int,
+        height: int,
+        world: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            normalized: Array (33, 4) com x, y, z, visibility normalizados na
+                imagem inteira
+            width: Largura da imagem original (pixels)
+            height: Altura da imagem original (pixels)
+            world: Array (33, 4) com x, y, z (metros) e visibility, ou None
+        """
+        self.normalized = normalized
+        self.image = normalized * np.array([width, height, 1, 1], dtype=np.float32)
+        self.world = world
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_mediapipe(
+        cls,
+        pose_landmarks,
+        width: int,
+        height: int,
+        roi: Optional[Roi] = None
+    ) -> 'PoseFrame':
+        """
+        Cria o frame a partir do resultado do MediaPipe.
+
+        Args:
+            pose_landmarks: results.pose_landmarks
+            width: Largura da imagem original
+            height: Altura da imagem original
+            roi: Recorte inferido; as coordenadas (relativas ao recorte) são
+                convertidas para a imagem inteira
+        """
+        normalized = landmarks_array(pose_landmarks)
+        if roi is not None:
+            left, top, roi_width, roi_height = roi
+            normalized[:, 0] = left + normalized[:, 0] * roi_width
+            normalized[:, 1] = top + normalized[:, 1] * roi_height
+            normalized[:, 2] *= roi_width  # z tem a escala de x
+        return cls(normalized, width, height)
+
+    @classmethod
+    def from_landmarks_3d(cls, landmarks: List[Dict[str, Any]], width: int = 1, height: int = 1) -> 'PoseFrame':
+        """
+        Cria o frame a partir de uma lista de dicts no formato landmarks_3d
+        (coordenadas em pixels; landmarks ausentes ficam com visibility 0).
+        """
+        normalized = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        for landmark in landmarks:
+            normalized[landmark['id']] = (
+                landmark['x'] / width,
+                landmark['y'] / height,
+                landmark.get('z', 0.0),
+                landmark.get('visibility', 0.0)
+            )
+        return cls(normalized, width, height)
+
+    @property
+    def visibility(self) -> np.ndarray:
+        return self.normalized[:, 3]
+
+    def landmark(self, idx: int) -> Dict[str, Any]:
+        """Dict de um landmark no formato de landmarks_3d."""
+        x, y, z, visibility = self.image[idx].tolist()
+        x_norm, y_norm, z_norm, _ = self.normalized[idx].tolist()
+        return {
+            'id': idx,
+            'name': LANDMARK_NAMES.get(idx, f'landmark_{idx}'),
+            'x': x,  # Pixels
+            'y': y,
+            'z': z,  # Profundidade relativa ao centro do quadril
+            'visibility': visibility,
+            # Coordenadas normalizadas (útil para comparação)
+            'x_norm': x_norm,
+            'y_norm': y_norm,
+            'z_norm': z_norm
+        }
+
+    def landmarks_3d(self) -> List[Dict[str, Any]]:
+        """Lista de dicts com coordenadas em pixels + normalizadas (JSON)."""
+        return [self.landmark(idx) for idx in range(len(self.normalized))]
+
+    def world_landmarks(self) -> Optional[List[Dict[str, Any]]]:
+        """Lista de dicts com coordenadas do mundo em metros (JSON)."""
+        if self.world is None:
+            return None
+        return [
+            {
+                'id': idx,
+                'name': LANDMARK_NAMES.get(idx, f'landmark_{idx}'),
+                'x': x,  # Metros
+                'y': y,
+                'z': z,
+                'visibility': visibility
+            }
+            for idx, (x, y, z, visibility) in enumerate(self.world.tolist())
+        ]
+
+    def __len__(self) -> int:
+        return len(self.normalized)
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        if not -len(self) <= idx < len(self):
+            raise IndexError(idx)
+        return self.landmark(idx % len(self))
@@ -0,0 +1,251 @@
+"""
+Cache de resultados de inferência do MediaPipe.
+
+A chave é o hash do conteúdo da imagem mais as configurações do modelo,
+então reenvios, reanálises com outro exercise_type e uploads duplicados
+não rodam o MediaPipe de novo. Guarda os landmarks brutos; ângulos e fase
+continuam sendo calculados por exercício a partir deles.
+
+Camadas:
+    1. LRU em memória do processo (limitado por número de entradas)
+    2. Redis opcional (TTL; limite de memória via maxmemory do Redis)
+
+No Redis os resultados vão em JSON (arrays em base64 com dtype e shape),
+como os jobs em job_queue.py: ler do Redis nunca executa código, ao
+contrário de pickle.
+"""
+
+import base64
+import hashlib
+import json
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from pose_detector import ImageSource
+from pose_frame import PoseFrame
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Cache LRU thread-safe limitado por número de entradas."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# dtypes aceitos ao ler arrays do Redis
+ARRAY_DTYPES = ('float32', 'float64')
+
+
+def _encode_value(value: Any) -> Any:
+    """json.dumps default: PoseFrame e arrays numpy em dicts marcados."""
+    if isinstance(value, PoseFrame):
+        return {
+            '__pose_frame__': True,
+            'normalized': value.normalized,
+            'world': value.world,
+            'width': value.width,
+            'height': value.height
+        }
+    if isinstance(value, np.ndarray):
+        return {
+            '__ndarray__': base64.b64encode(np.ascontiguousarray(value).tobytes()).decode('ascii'),
+            'dtype': value.dtype.name,
+            'shape': list(value.shape)
+        }
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'Cannot cache value of type {type(value).__name__}')
+
+
+def _decode_value(obj: Dict[str, Any]) -> Any:
+    """json.loads object_hook: inverso de _encode_value."""
+    if '__ndarray__' in obj:
+        if obj['dtype'] not in ARRAY_DTYPES:
+            raise ValueError(f"Unsupported cached dtype: {obj['dtype']}")
+        data = base64.b64decode(obj['__ndarray__'])
+        return np.frombuffer(data, dtype=obj['dtype']).reshape(obj['shape']).copy()
+    if obj.get('__pose_frame__'):
+        return PoseFrame(obj['normalized'], obj['width'], obj['height'], obj['world'])
+    return obj
+
+
+def serialize_result(result: Dict[str, Any]) -> bytes:
+    """Resultado do PoseDetector em JSON (UTF-8)."""
+    return json.dumps(result, default=_encode_value, separators=(',', ':')).encode('utf-8')
+
+
+def deserialize_result(payload: bytes) -> Dict[str, Any]:
+    """
+    Lê um resultado gravado por serialize_result.
+
+    Raises:
+        ValueError: Se o payload não estiver no formato esperado
+    """
+    return json.loads(payload, object_hook=_decode_value)
+
+
+class PoseResultCache:
+    """
+    Cache de resultados do PoseDetector em duas camadas (LRU + Redis opcional).
+    """
+
+    def __init__(
+        self,
+        settings: Dict[str, Any],
+        max_entries: int = 1024,
+        ttl: int = 3600,
+        redis_client: Any = None,
+        key_prefix: str = 'mediapipe:pose:'
+    ):
+        """
+        Args:
+            settings: Configurações do detector que afetam o resultado
+                (model_complexity, min_detection_confidence, ...)
+            max_entries: Limite de entradas do LRU em memória
+            ttl: TTL das entradas no Redis (segundos)
+            redis_client: Cliente redis.Redis (None = só memória)
+            key_prefix: Prefixo das chaves no Redis
+        """
+        self.settings = dict(settings)
+        self.settings_key = repr(sorted(settings.items()))
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self._local = LRUCache(max_entries)
+        self._redis = redis_client
+
+    def make_key(self, image_bytes: bytes, **overrides) -> str:
+        """
+        Chave = hash do conteúdo da imagem + configurações do detector.
+
+        overrides substitui configurações desta consulta (ex.: o
+        model_complexity escolhido para a requisição).
+        """
+        settings_key = self.settings_key
+        if overrides:
+            settings_key = repr(sorted({**self.settings, **overrides}.items()))
+
+        digest = hashlib.blake2b(image_bytes, digest_size=20)
+        digest.update(settings_key.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Busca no LRU e, se não houver, no Redis (promovendo para o LRU)."""
+        result = self._local.get(key)
+        if result is not None or self._redis is None:
+            return result
+
+        try:
+            payload = self._redis.get(self.key_prefix + key)
+        except Exception as e:
+            logger.warning(f"Redis cache get failed: {str(e)}")
+            return None
+
+        if payload is None:
+            return None
+
+        try:
+            result = deserialize_result(payload)
+        except (ValueError, TypeError, KeyError) as e:
+            # Entrada em outro formato (ex.: versão anterior): tratada como ausente
+            logger.warning(f"Ignoring unreadable cache entry: {str(e)}")
+            return None
+
+        self._local.set(key, result)
+        return result
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        """Grava no LRU e no Redis."""
+        self._local.set(key, result)
+
+        if self._redis is None:
+            return
+
+        try:
+            self._redis.setex(
+                self.key_prefix + key,
+                self.ttl,
+                serialize_result(result)
+            )
+        except Exception as e:
+            logger.warning(f"Redis cache set failed: {str(e)}")
+
+
+def read_image_bytes(source: ImageSource) -> bytes:
+    """
+    Conteúdo da imagem usado no hash da chave.
+
+    Caminhos são lidos do disco; o chamador deve repassar os bytes ao
+    detector para não ler o arquivo duas vezes. Frames decodificados
+    incluem o shape, para imagens com os mesmos pixels e shapes diferentes
+    não colidirem.
+    """
+    if isinstance(source, np.ndarray):
+        return repr(source.shape).encode('utf-8') + np.ascontiguousarray(source).tobytes()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def create_result_cache(config, settings: Dict[str, Any]) -> Optional[PoseResultCache]:
+    """
+    Cria o cache a partir da configuração.
+
+    Returns:
+        PoseResultCache ou None se ENABLE_CACHE estiver desligado. Sem o
+        pacote redis ou sem conexão, usa só o LRU em memória.
+    """
+    if not config.ENABLE_CACHE:
+        return None
+
+    redis_client = None
+    try:
+        import redis
+
+        redis_client = redis.Redis(
+            host=config.REDIS_HOST,
+            port=config.REDIS_PORT,
+            db=config.REDIS_DB,
+            password=config.REDIS_PASSWORD or None,
+            socket_timeout=config.REDIS_SOCKET_TIMEOUT
+        )
+        redis_client.ping()
+        logger.info(f"Pose result cache using Redis at {config.REDIS_HOST}:{config.REDIS_PORT}")
+    except ImportError:
+        logger.warning("redis not installed, pose result cache is in-memory only")
+        redis_client = None
+    except Exception as e:
+        logger.warning(f"Redis unavailable ({str(e)}), pose result cache is in-memory only")
+        redis_client = None
+
+    return PoseResultCache(
+        settings=settings,
+        max_entries=config.CACHE_MAX_ENTRIES,
+        ttl=config.CACHE_TTL,
+        redis_client=redis_client
+    )
@@ -136,7 +136,7 @@ echo -e "  ${BLUE}python mediapipe_service.py${NC}"
 echo ""
 print_info "Para iniciar em modo produção (com Gunicorn):"
 echo -e "  ${BLUE}source venv/bin/activate${NC}"
-echo -e "  ${BLUE}gunicorn --bind 0.0.0.0:5000 --workers 4 mediapipe_service:app${NC}"
+echo -e "  ${BLUE}gunicorn --config gunicorn.conf.py mediapipe_service:app${NC}"
 echo ""
 print_info "Para rodar testes:"
 echo -e "  ${BLUE}pytest test_mediapipe_service.py -v${NC}"
@@ -48,23 +48,9 @@ echo Starting in PRODUCTION mode with Gunicorn...
 set FLASK_ENV=production
 set DEBUG=false
 
-if "%HOST%"=="" set HOST=0.0.0.0
-if "%PORT%"=="" set PORT=5000
-if "%MAX_WORKERS%"=="" set MAX_WORKERS=4
-if "%TIMEOUT_SECONDS%"=="" set TIMEOUT_SECONDS=120
-if "%LOG_LEVEL%"=="" set LOG_LEVEL=info
-
-gunicorn ^
-    --bind %HOST%:%PORT% ^
-    --workers %MAX_WORKERS% ^
-    --threads 2 ^
-    --worker-class sync ^
-    --timeout %TIMEOUT_SECONDS% ^
-    --keep-alive 5 ^
-    --log-level %LOG_LEVEL% ^
-    --access-logfile - ^
-    --error-logfile - ^
-    mediapipe_service:app
+REM Workers, threads e timeout: GUNICORN_WORKERS, GUNICORN_THREADS,
+REM GUNICORN_TIMEOUT (ver gunicorn.conf.py)
+gunicorn --config gunicorn.conf.py mediapipe_service:app
 
 goto end
 
@@ -35,17 +35,9 @@ if [ "$MODE" = "prod" ] || [ "$MODE" = "production" ]; then
     export FLASK_ENV=production
     export DEBUG=false
 
-    gunicorn \
-        --bind ${HOST:-0.0.0.0}:${PORT:-5000} \
-        --workers ${MAX_WORKERS:-4} \
-        --threads 2 \
-        --worker-class sync \
-        --timeout ${TIMEOUT_SECONDS:-120} \
-        --keep-alive 5 \
-        --log-level ${LOG_LEVEL:-info} \
-        --access-logfile - \
-        --error-logfile - \
-        mediapipe_service:app
+    # Workers, threads e timeout: GUNICORN_WORKERS, GUNICORN_THREADS,
+    # GUNICORN_TIMEOUT (ver gunicorn.conf.py)
+    gunicorn --config gunicorn.conf.py mediapipe_service:app
 
 elif [ "$MODE" = "dev" ] || [ "$MODE" = "development" ]; then
     echo -e "${GREEN}Starting in DEVELOPMENT mode with Flask dev server...${NC}"
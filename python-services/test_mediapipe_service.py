@@ -6,14 +6,30 @@ import pytest
 import json
 import os
 import tempfile
+import pickle
+import threading
+import time
+from io import BytesIO
+from types import SimpleNamespace
 import numpy as np
 from unittest.mock import Mock, patch, MagicMock
 import cv2
 
 # Import dos módulos
 from mediapipe_service import app
-from pose_detector import PoseDetector
+from pose_detector import PoseDetector, jpeg_size, preload_model_assets
+from pose_frame import PoseFrame
+from inference_pool import InferencePool
+from detector_pool import DetectorPool
+from video_decoder import sample_video_frames, iter_video_frames, estimate_sample_count
+from wire_format import encode_landmarks, decode_landmarks, HEADER
+from result_cache import PoseResultCache
+from job_queue import InMemoryJobStore, RedisJobStore, JobWorker
+from admission import FrameBudget
+from complexity_policy import ComplexityPolicy
+from warmup import Readiness, synthetic_pose_image, WARMUP_PENDING, WARMUP_READY, WARMUP_FAILED
 from biomechanics_engine import BiomechanicsEngine
+from exercise_registry import ExerciseRegistry
 from utils import (
     validate_frame_data,
     calculate_confidence_score,
@@ -48,6 +64,12 @@ def sample_landmarks():
     ]
 
 
+@pytest.fixture
+def sample_pose_frame(sample_landmarks):
+    """Sample landmarks como PoseFrame (resultado do detector)"""
+    return PoseFrame.from_landmarks_3d(sample_landmarks)
+
+
 @pytest.fixture
 def sample_frame_image():
     """Cria uma imagem de teste temporária"""
@@ -69,6 +91,36 @@ def sample_frame_image():
     os.unlink(tmp.name)
 
 
+@pytest.fixture
+def sample_video():
+    """Cria um vídeo de teste temporário (2s a 10 fps)"""
+    with tempfile.NamedTemporaryFile(suffix='.avi', delete=False) as tmp:
+        path = tmp.name
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (320, 240))
+    for i in range(20):
+        img = np.full((240, 320, 3), i * 10, dtype=np.uint8)
+        writer.write(img)
+    writer.release()
+
+    yield path
+
+    os.unlink(path)
+
+
+@pytest.fixture
+def mock_pose_results():
+    """Resultado do MediaPipe com 33 landmarks (imagem e mundo)"""
+    landmarks = [
+        SimpleNamespace(x=0.5, y=i / 33, z=0.0, visibility=0.9)
+        for i in range(33)
+    ]
+    return SimpleNamespace(
+        pose_landmarks=SimpleNamespace(landmark=landmarks),
+        pose_world_landmarks=SimpleNamespace(landmark=landmarks)
+    )
+
+
 # ========== Testes de Config ==========
 
 def test_get_config_development():
@@ -94,6 +146,37 @@ def test_get_config_testing():
     assert config.MAX_FRAMES_PER_REQUEST == 5
 
 
+def test_config_model_complexities(monkeypatch):
+    """Testa os modelos carregados e a validação das complexidades extras"""
+    config = get_config('testing')
+    assert config.model_complexities() == [0]
+
+    monkeypatch.setattr(config, 'MODEL_COMPLEXITIES', [2, 0])
+    assert config.model_complexities() == [0, 2]
+
+    monkeypatch.setattr(config, 'MODEL_COMPLEXITIES', [3])
+    with pytest.raises(ValueError):
+        config.validate()
+
+
+def test_config_inference_processes_per_container(monkeypatch):
+    """Testa a divisão de MAX_WORKERS entre os workers do gunicorn"""
+    config = get_config('testing')
+    monkeypatch.setattr(config, 'MAX_WORKERS', 4)
+
+    monkeypatch.setattr(config, 'GUNICORN_WORKERS', 1)
+    assert config.inference_processes() == 4
+
+    monkeypatch.setattr(config, 'GUNICORN_WORKERS', 2)
+    assert config.inference_processes() == 2
+
+    # Mais workers que processos: cada worker infere inline
+    monkeypatch.setattr(config, 'GUNICORN_WORKERS', 4)
+    assert config.inference_processes() == 1
+    monkeypatch.setattr(config, 'GUNICORN_WORKERS', 8)
+    assert config.inference_processes() == 1
+
+
 # ========== Testes de Utils ==========
 
 def test_validate_frame_data_valid():
@@ -232,6 +315,28 @@ def test_calculate_angles_squat(sample_landmarks):
         assert isinstance(angles[key], float)
 
 
+@pytest.mark.parametrize('exercise_type', ['squat', 'deadlift', 'bench-press', 'overhead-press'])
+def test_calculate_sequence_angles_matches_per_frame(exercise_type):
+    """Tabela vetorizada da sequência = calculate_angles frame a frame"""
+    engine = BiomechanicsEngine()
+    rng = np.random.default_rng(0)
+    frames = [PoseFrame(normalized, 640, 480) for normalized in rng.random((20, 33, 4)).astype(np.float32)]
+    points = np.stack([frame.image[:, :3] for frame in frames])
+    points[3, 25] = np.nan  # Joelho esquerdo ausente no frame 3
+
+    table, columns = engine.calculate_sequence_angles(points, exercise_type)
+
+    assert table.shape == (20, len(columns))
+    for idx, frame_points in enumerate(points):
+        angles = engine.calculate_angles(frame_points, exercise_type)
+        assert list(angles) == columns
+        assert table[idx] == pytest.approx([angles[column] for column in columns], abs=0.1)
+
+    # Sequência de PoseFrames e sequência vazia
+    assert engine.calculate_sequence_angles(frames[:2], exercise_type)[0].shape == (2, len(columns))
+    assert engine.calculate_sequence_angles([], exercise_type)[0].shape == (0, len(columns))
+
+
 def test_detect_phase_squat():
     """Testa detecção de fase do squat"""
     engine = BiomechanicsEngine()
@@ -247,6 +352,160 @@ def test_detect_phase_squat():
     assert phase == 'bottom'
 
 
+# ========== Testes de Exercícios ==========
+
+def test_exercise_registry_aliases():
+    """Testa busca por nome canônico e aliases (normalizados)"""
+    registry = ExerciseRegistry.load()
+
+    assert registry.get('squat').name == 'squat'
+    assert registry.get('Back Squat').name == 'squat'
+    assert registry.get('agachamento').name == 'squat'
+    assert registry.get('romanian_deadlift').name == 'deadlift'
+    assert 'military-press' in registry
+
+    with pytest.raises(ValueError, match='Unknown exercise_type'):
+        registry.get('cartwheel')
+
+
+def test_exercise_registry_invalid_definitions():
+    """Testa erros de declaração detectados na compilação"""
+    with pytest.raises(ValueError, match='invalid landmark'):
+        ExerciseRegistry({'row': {'angles': {'elbow': {'joint': ['left_shoulder', 'left_elbo', 'left_wrist']}}}})
+
+    with pytest.raises(ValueError, match='undeclared angles'):
+        ExerciseRegistry({'row': {
+            'angles': {'elbow': {'joint': ['left_shoulder', 'left_elbow', 'left_wrist']}},
+            'phase': {'signal': ['knee'], 'by_position': [['top', None]]}
+        }})
+
+    with pytest.raises(ValueError, match='declared twice'):
+        ExerciseRegistry({
+            'squat': {'angles': {'trunk': {'vertical': ['left_hip', 'left_shoulder']}}},
+            'lunge': {'aliases': ['squat'], 'angles': {'trunk': {'vertical': ['left_hip', 'left_shoulder']}}}
+        })
+
+
+def test_registered_exercise_computes_declared_angles(sample_landmarks, tmp_path):
+    """Testa exercício novo declarado em arquivo extra: só os ângulos declarados"""
+    extra = tmp_path / 'exercises.json'
+    extra.write_text(json.dumps({
+        'step-up': {
+            'aliases': ['subida no banco'],
+            'angles': {
+                'knee_left': {'joint': ['left_hip', 'left_knee', 'left_ankle']},
+                'trunk': {'vertical': [['left_hip', 'right_hip'], ['left_shoulder', 'right_shoulder']]}
+            },
+            'phase': {'signal': ['knee_left'], 'top': 150, 'bottom': 100,
+                      'by_position': [['eccentric', 0.5], ['concentric', None]]}
+        }
+    }))
+    engine = BiomechanicsEngine(ExerciseRegistry.load(str(extra)))
+
+    angles = engine.calculate_angles(sample_landmarks, 'subida no banco')
+
+    assert list(angles) == ['knee_left', 'trunk']
+    assert angles['knee_left'] == engine.calculate_knee_angle(sample_landmarks, 'left')
+    assert angles['trunk'] == engine.calculate_trunk_angle(sample_landmarks)
+    assert engine.detect_phase({'knee_left': 120}, 'step-up', frame_number=8, total_frames=10) == 'concentric'
+    # Exercícios de exercises.json continuam disponíveis
+    assert 'squat' in engine.registry
+
+
+def test_unknown_exercise_is_rejected(sample_landmarks):
+    """Testa que exercício desconhecido não cai silenciosamente no squat"""
+    engine = BiomechanicsEngine()
+
+    with pytest.raises(ValueError):
+        engine.calculate_angles(sample_landmarks, 'cartwheel')
+    with pytest.raises(ValueError):
+        engine.detect_phase({}, 'cartwheel', frame_number=1, total_frames=10)
+
+
+# ========== Testes de Fase ==========
+
+def _squat_knee_signal(fps, reps=2, noise=2.0):
+    """Ângulo de joelho sintético: pausa em cima, descida, pausa embaixo, subida"""
+    rng = np.random.default_rng(0)
+    pause, ramp = np.full(int(0.5 * fps), 170.0), (1 - np.cos(np.linspace(0, np.pi, fps))) / 2
+    rep = [pause, 170 - 90 * ramp, np.full(int(0.3 * fps), 80.0), 80 + 90 * ramp]
+    signal = np.concatenate(rep * reps + [pause])
+    return signal + rng.normal(0, noise, len(signal))
+
+
+def _collapse(phases):
+    return [phase for i, phase in enumerate(phases) if i == 0 or phase != phases[i - 1]]
+
+
+@pytest.mark.parametrize('fps', [5, 30])
+def test_phase_tracker_streaming_squat(fps):
+    """Testa fases frame a frame pela velocidade, sem total de frames e sem alternância por ruído"""
+    engine = BiomechanicsEngine()
+    tracker = engine.phase_tracker('squat')
+
+    phases = [
+        tracker.update({'knee_left': angle, 'knee_right': angle}, timestamp_ms=i * 1000 / fps)
+        for i, angle in enumerate(_squat_knee_signal(fps))
+    ]
+
+    assert _collapse(phases) == ['top', 'eccentric', 'bottom', 'concentric'] * 2 + ['top']
+
+
+def test_phase_tracker_holds_phase_without_signal():
+    """Testa que frames sem a articulação (ângulo 0.0) mantêm a fase"""
+    tracker = BiomechanicsEngine().phase_tracker('squat')
+
+    tracker.update({'knee_left': 170, 'knee_right': 170}, timestamp_ms=0)
+    for i in range(1, 10):
+        tracker.update({'knee_left': 170 - 10 * i, 'knee_right': 170 - 10 * i}, timestamp_ms=i * 100)
+    assert tracker.phase == 'eccentric'
+
+    assert tracker.update({'knee_left': 0.0, 'knee_right': 0.0}, timestamp_ms=1000) == 'eccentric'
+
+
+def test_phase_tracker_first_frame_mid_range_is_unknown():
+    """Testa que a fase fica 'unknown' até haver velocidade quando a série começa entre os limiares"""
+    tracker = BiomechanicsEngine().phase_tracker('squat')
+
+    assert tracker.update({'knee_left': 125, 'knee_right': 125}, timestamp_ms=0) == 'unknown'
+    assert tracker.update({'knee_left': 125, 'knee_right': 125}, timestamp_ms=100) == 'unknown'
+    phases = [
+        tracker.update({'knee_left': angle, 'knee_right': angle}, timestamp_ms=200 + i * 100)
+        for i, angle in enumerate(range(120, 80, -10))
+    ]
+    assert phases[-1] == 'eccentric'
+
+    tracker.reset()
+    assert tracker.update({'knee_left': 175, 'knee_right': 175}, timestamp_ms=0) == 'top'
+
+
+def test_phase_tracker_falling_direction():
+    """Testa exercício cujo sinal cai na concêntrica (remada: cotovelo fechando)"""
+    tracker = BiomechanicsEngine().phase_tracker('barbell-row')
+
+    phases = [
+        tracker.update({'elbow_left': angle, 'elbow_right': angle}, timestamp_ms=i * 100)
+        for i, angle in enumerate(np.concatenate([np.full(5, 170.0), np.linspace(170, 70, 10)]))
+    ]
+
+    assert phases[0] == 'top'
+    assert 'concentric' in phases and 'eccentric' not in phases
+
+
+def test_detect_sequence_phases_matches_streaming():
+    """Testa que a sequência inteira produz as mesmas fases do streaming"""
+    engine = BiomechanicsEngine()
+    signal = _squat_knee_signal(10)
+    table = np.zeros((len(signal), len(engine.registry.get('squat').columns)))
+    table[:, 0] = table[:, 1] = signal
+    timestamps_ms = np.arange(len(signal)) * 100
+
+    tracker = engine.phase_tracker('squat')
+    streamed = [tracker.update({'knee_left': angle, 'knee_right': angle}, t) for angle, t in zip(signal, timestamps_ms)]
+
+    assert engine.detect_sequence_phases(table, 'squat', timestamps_ms) == streamed
+
+
 # ========== Testes de PoseDetector ==========
 
 @patch('mediapipe.solutions.pose.Pose')
@@ -295,6 +554,907 @@ def test_pose_detector_process_image_no_pose(mock_pose, mock_imread):
     assert 'No pose detected' in result['error']
 
 
+@patch('mediapipe.solutions.pose.Pose')
+def test_pose_detector_tracking_mode(mock_pose):
+    """Testa modo tracking (static_image_mode=False) e reset por sequência"""
+    mock_pose_instance = MagicMock()
+    mock_pose_instance.process.return_value = MagicMock(pose_landmarks=None)
+    mock_pose.return_value = mock_pose_instance
+
+    detector = PoseDetector(static_image_mode=False)
+
+    with patch('cv2.imread', return_value=np.zeros((480, 640, 3), dtype=np.uint8)):
+        results = detector.process_sequence(['/fake/a.jpg', '/fake/b.jpg'])
+
+    assert mock_pose.call_args.kwargs['static_image_mode'] == False
+    assert len(results) == 2
+    mock_pose_instance.reset.assert_called_once()
+    assert mock_pose_instance.process.call_count == 2
+
+
+@patch('mediapipe.solutions.pose.Pose')
+def test_pose_detector_sequence_roi_crop(mock_pose):
+    """Testa recorte na pose do frame anterior e volta às coordenadas da imagem"""
+    landmarks = [
+        SimpleNamespace(x=0.4 + 0.2 * (i % 2), y=0.2 + 0.6 * i / 32, z=0.1, visibility=0.9)
+        for i in range(33)
+    ]
+    mock_pose_instance = mock_pose.return_value
+    mock_pose_instance.process.return_value = SimpleNamespace(
+        pose_landmarks=SimpleNamespace(landmark=landmarks),
+        pose_world_landmarks=None
+    )
+
+    detector = PoseDetector(static_image_mode=False, roi_crop=True)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    results = detector.process_sequence([frame, frame, frame])
+
+    shapes = [call.args[0].shape for call in mock_pose_instance.process.call_args_list]
+    # Caixa x 0.4-0.6 / y 0.2-0.8 com 25% de margem: x 0.35-0.65, y 0.05-0.95
+    assert shapes == [(480, 640, 3), (432, 192, 3), (432, 192, 3)]
+
+    first = results[1]['landmarks'][0]
+    assert first['x_norm'] == pytest.approx(0.35 + 0.4 * 0.3)
+    assert first['y'] == pytest.approx((0.05 + 0.2 * 0.9) * 480)
+    assert first['z'] == pytest.approx(0.1 * 0.3)
+
+    # Reset no início e ao passar da imagem inteira para o recorte (mantido no 3º frame)
+    assert mock_pose_instance.reset.call_count == 2
+
+    # Sem pose: o frame seguinte volta para a imagem inteira
+    assert PoseDetector._next_roi({'success': False}, (0.35, 0.05, 0.3, 0.9)) is None
+
+
+def test_pose_detector_roi_outside_image_uses_full_frame():
+    """Testa que uma ROI vazia (pose fora da imagem) cai na imagem inteira"""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    # Recorte vazio: fora da imagem ou menor que um pixel
+    for roi in [(1.1, 0.2, 0.3, 0.5), (-0.5, 0.2, 0.3, 0.5), (0.5, 0.5, 0.0001, 0.0001)]:
+        crop, effective = PoseDetector._crop_to_roi(frame, roi)
+        assert crop is frame
+        assert effective is None
+
+    # Landmarks todos à direita da imagem: sem ROI no próximo frame
+    normalized = np.zeros((33, 4), dtype=np.float32)
+    normalized[:, 0] = np.linspace(1.2, 1.4, 33)
+    normalized[:, 1] = np.linspace(0.2, 0.8, 33)
+    normalized[:, 3] = 0.9
+    outside = PoseFrame(normalized, width=640, height=480)
+    assert PoseDetector._next_roi({'success': True, 'landmarks': outside}, None) is None
+
+
+@patch('cv2.imread')
+@patch('mediapipe.solutions.pose.Pose')
+def test_pose_detector_process_image_include(mock_pose, mock_imread, mock_pose_results):
+    """Testa os arrays do PoseFrame e que world landmarks só vêm se pedidos"""
+    mock_imread.return_value = np.zeros((480, 640, 3), dtype=np.uint8)
+    mock_pose.return_value.process.return_value = mock_pose_results
+
+    detector = PoseDetector()
+
+    full = detector.process_image('/fake/path.jpg')
+    assert full['success'] == True
+    landmarks = full['landmarks']
+    assert landmarks.normalized.shape == (33, 4)
+    assert landmarks.normalized.dtype == np.float32
+    assert landmarks.image[0, 0] == 320.0
+    assert landmarks.world.shape == (33, 4)
+    assert set(full['timings']) == {'decode', 'inference', 'extraction'}
+
+    # Dicts só na serialização
+    landmarks_3d = landmarks.landmarks_3d()
+    assert len(landmarks_3d) == 33
+    assert landmarks_3d[25]['name'] == 'left_knee'
+    assert landmarks_3d[0]['x'] == 320.0
+    assert len(landmarks.world_landmarks()) == 33
+
+    lean = detector.process_image('/fake/path.jpg', include=[])
+    assert lean['landmarks'].normalized.shape == (33, 4)
+    assert lean['landmarks'].world is None
+    assert lean['landmarks'].world_landmarks() is None
+
+
+@patch('mediapipe.solutions.pose.Pose')
+def test_pose_detector_creates_graph_lazily(mock_pose):
+    """Testa que o grafo só é criado no primeiro uso (seguro antes do fork)"""
+    mock_pose.return_value.process.return_value = MagicMock(pose_landmarks=None)
+
+    detector = PoseDetector()
+    mock_pose.assert_not_called()
+
+    detector.process_image(np.zeros((48, 64, 3), dtype=np.uint8))
+    detector.process_image(np.zeros((48, 64, 3), dtype=np.uint8))
+    mock_pose.assert_called_once()
+
+
+@patch('cv2.imread')
+@patch('mediapipe.solutions.pose.Pose')
+def test_pose_detector_cascade(mock_pose, mock_imread, mock_pose_results):
+    """Testa que só frames difíceis para o modelo leve vão para o pesado"""
+    mock_imread.return_value = np.zeros((480, 640, 3), dtype=np.uint8)
+    lite, heavy = MagicMock(), MagicMock()
+    mock_pose.side_effect = lambda **kwargs: heavy if kwargs['model_complexity'] == 2 else lite
+    heavy.process.return_value = mock_pose_results
+
+    frontal = [SimpleNamespace(x=0.5, y=i / 33, z=0.0, visibility=0.9) for i in range(33)]
+    frontal[23] = SimpleNamespace(x=0.4, y=0.7, z=0.0, visibility=0.9)
+    frontal[24] = SimpleNamespace(x=0.6, y=0.7, z=0.0, visibility=0.9)
+    lite.process.return_value = SimpleNamespace(
+        pose_landmarks=SimpleNamespace(landmark=frontal),
+        pose_world_landmarks=None
+    )
+
+    detector = PoseDetector(model_complexity=0, cascade_complexity=2, cascade_threshold=0.7)
+    result = detector.process_image('/fake/path.jpg')
+    assert result['escalated'] == False
+    heavy.process.assert_not_called()
+
+    # Joelho esquerdo pouco visível: reprocessa no heavy
+    frontal[25] = SimpleNamespace(x=0.55, y=0.75, z=0.0, visibility=0.3)
+    result = detector.process_image('/fake/path.jpg')
+    assert result['escalated'] == True
+    assert result['landmarks'].visibility[25] == pytest.approx(0.9)
+    heavy.process.assert_called_once()
+
+    # Vista lateral (quadris sobrepostos) também escala
+    lite.process.return_value = mock_pose_results
+    assert detector.process_image('/fake/path.jpg')['escalated'] == True
+
+    # Cascata para um modelo não mais pesado fica desativada
+    assert PoseDetector(model_complexity=2, cascade_complexity=2).cascade_complexity is None
+
+
+def test_preload_model_assets():
+    """Testa leitura antecipada dos arquivos do modelo configurado"""
+    paths = preload_model_assets(1)
+
+    assert any(path.endswith('pose_landmark_full.tflite') for path in paths)
+    assert all(os.path.exists(path) for path in paths)
+
+
+def test_preload_model_assets_downloads_missing_weights(monkeypatch):
+    """Testa download dos pesos ausentes e fallback sem a API de download"""
+    import builtins
+    from mediapipe.python.solutions import download_utils
+
+    monkeypatch.setattr('pose_detector.os.path.exists', lambda path: not path.endswith('heavy.tflite'))
+    download = Mock()
+    monkeypatch.setattr(download_utils, 'download_oss_model', download)
+
+    paths = preload_model_assets(2)
+    download.assert_called_once_with('mediapipe/modules/pose_landmark/pose_landmark_heavy.tflite')
+    assert len(paths) == 2
+
+    real_import = builtins.__import__
+
+    def import_without_download_utils(name, *args, **kwargs):
+        if name.endswith('download_utils'):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, '__import__', import_without_download_utils)
+    assert len(preload_model_assets(2)) == 2
+    download.assert_called_once()
+
+
+def test_pose_detector_load_image_from_bytes():
+    """Testa decodificação de imagem direto do buffer (sem arquivo)"""
+    img = np.zeros((48, 64, 3), dtype=np.uint8)
+    ok, encoded = cv2.imencode('.png', img)
+    assert ok
+
+    image = PoseDetector._load_image(memoryview(encoded.tobytes()))
+    assert image.shape == (48, 64, 3)
+
+    assert PoseDetector._load_image(b'') is None
+
+
+def test_pose_detector_load_image_capped():
+    """Testa decodificação reduzida de JPEG e redução dos demais formatos"""
+    img = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    jpeg = cv2.imencode('.jpg', img)[1].tobytes()
+    png = cv2.imencode('.png', img)[1].tobytes()
+
+    assert jpeg_size(memoryview(jpeg)) == (1920, 1080)
+    assert jpeg_size(memoryview(png)) is None
+
+    detector = PoseDetector(max_input_side=480)
+    image, size = detector._load_image_capped(jpeg)
+    assert image.shape == (270, 480, 3)   # decodificado em 1/4
+    assert size == (1920, 1080)
+
+    image, size = detector._load_image_capped(png)
+    assert image.shape == (270, 480, 3)
+    assert size == (1920, 1080)
+
+    image, size = PoseDetector()._load_image_capped(jpeg)
+    assert image.shape == (1080, 1920, 3)
+
+
+@patch('mediapipe.solutions.pose.Pose')
+def test_pose_detector_capped_keeps_original_coordinates(mock_pose, mock_pose_results):
+    """Testa que os pixels dos landmarks ficam na resolução original"""
+    mock_pose.return_value.process.return_value = mock_pose_results
+    jpeg = cv2.imencode('.jpg', np.zeros((1080, 1920, 3), dtype=np.uint8))[1].tobytes()
+
+    result = PoseDetector(max_input_side=480).process_image(jpeg)
+
+    assert mock_pose.return_value.process.call_args.args[0].shape == (270, 480, 3)
+    assert result['image_shape'] == {'width': 1920, 'height': 1080}
+    assert result['landmarks'][0]['x'] == 960.0
+
+
+# ========== Testes de PoseFrame ==========
+
+def test_pose_frame_matches_landmark_dicts(sample_landmarks, sample_pose_frame):
+    """Testa que confiança e ângulos do PoseFrame batem com a lista de dicts"""
+    full_landmarks = sample_pose_frame.landmarks_3d()
+    engine = BiomechanicsEngine()
+
+    assert calculate_confidence_score(sample_pose_frame) == pytest.approx(calculate_confidence_score(full_landmarks))
+    assert engine.calculate_angles(sample_pose_frame, 'squat') == engine.calculate_angles(full_landmarks, 'squat')
+    assert sample_pose_frame[25]['x'] == 95.0
+    assert len(list(sample_pose_frame)) == 33
+
+
+def test_pose_frame_compact_and_picklable(sample_pose_frame):
+    """Testa __slots__ e o envio entre processos (pool e cache)"""
+    assert not hasattr(sample_pose_frame, '__dict__')
+
+    restored = pickle.loads(pickle.dumps(sample_pose_frame))
+    np.testing.assert_array_equal(restored.normalized, sample_pose_frame.normalized)
+    np.testing.assert_array_equal(restored.image, sample_pose_frame.image)
+    assert restored.world is None
+
+
+# ========== Testes de DetectorPool ==========
+
+def test_detector_pool_checkout_is_exclusive():
+    """Testa que threads concorrentes nunca usam o mesmo detector"""
+    import threading
+
+    in_use = set()
+    errors = []
+    lock = threading.Lock()
+
+    def process(detector):
+        with lock:
+            if id(detector) in in_use:
+                errors.append('shared detector')
+            in_use.add(id(detector))
+        time.sleep(0.01)
+        with lock:
+            in_use.discard(id(detector))
+
+    pool = DetectorPool(Mock, size=2)
+    waits = []
+    pool.on_wait = waits.append
+
+    def worker():
+        for _ in range(5):
+            with pool.checkout() as detector:
+                process(detector)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert pool._created == 2
+    assert pool.in_use == 0
+    assert len(waits) == 20
+
+
+def test_detector_pool_creates_on_demand():
+    """Testa que detectores só são criados quando os existentes estão em uso"""
+    factory = Mock(side_effect=lambda: Mock())
+    first = Mock()
+    pool = DetectorPool(factory, size=3, detectors=[first])
+
+    with pool.checkout() as detector:
+        assert detector is first
+    factory.assert_not_called()
+
+    with pool.checkout(), pool.checkout():
+        assert pool.in_use == 2
+    assert factory.call_count == 1
+
+
+def test_detector_pool_warm_up_count():
+    """Testa o warm-up parcial: os demais detectores ficam sob demanda"""
+    detector = Mock()
+    factory = Mock(return_value=detector)
+    pool = DetectorPool(factory, size=3)
+    image = synthetic_pose_image()
+
+    pool.warm_up(image, count=1)
+
+    assert factory.call_count == 1
+    detector.warm_up.assert_called_once_with(image, cascade=True)
+    assert pool.in_use == 0
+
+
+# ========== Testes de InferencePool ==========
+
+def test_inference_pool_inline_preserves_order():
+    """Testa processamento inline (size=1) mantendo a ordem dos frames"""
+    detector = Mock()
+    detector.process_image.side_effect = lambda path, include=None: {'success': True, 'path': path}
+
+    pool = InferencePool(size=1, detector_kwargs={}, inline_detectors={1: DetectorPool(Mock, 1, [detector])})
+    results = pool.map_images(['/tmp/a.jpg', '/tmp/b.jpg', '/tmp/c.jpg'])
+
+    assert [r['path'] for r in results] == ['/tmp/a.jpg', '/tmp/b.jpg', '/tmp/c.jpg']
+    assert pool.map_images([]) == []
+
+
+@patch('inference_pool.ProcessPoolExecutor')
+def test_inference_pool_uses_process_executor(mock_executor_class):
+    """Testa que o pool despacha frames para o executor de processos"""
+    mock_executor = MagicMock()
+    mock_executor.submit.side_effect = lambda fn, image, include, model_complexity: Mock(
+        result=Mock(return_value={'success': image == '/tmp/a.jpg'})
+    )
+    mock_executor_class.return_value = mock_executor
+
+    pool = InferencePool(size=4, detector_kwargs={'model_complexity': 0})
+    results = pool.map_images(['/tmp/a.jpg', '/tmp/b.jpg'])
+
+    assert len(results) == 2
+    assert results[0]['success'] == True
+    assert results[1]['success'] == False
+    assert mock_executor_class.call_args.kwargs['max_workers'] == 4
+    # Sem warm_up_all o processo aquece só o detector estático do modelo padrão
+    assert mock_executor_class.call_args.kwargs['initargs'] == ({'model_complexity': 0}, None, ())
+
+    # Executor é reaproveitado entre chamadas
+    pool.map_images(['/tmp/c.jpg'])
+    assert mock_executor_class.call_count == 1
+
+
+def test_inference_worker_init_warms_default_static_detector():
+    """Testa o warm-up no initializer de cada processo do pool"""
+    import inference_pool
+
+    image = synthetic_pose_image()
+    with patch('inference_pool.PoseDetector') as detector_class, \
+            patch.dict(inference_pool._worker_detectors, clear=True):
+        inference_pool._init_worker({'model_complexity': 1}, image)
+        assert detector_class.call_count == 1
+        detector_class.return_value.warm_up.assert_called_once_with(image, cascade=False)
+
+    with patch('inference_pool.PoseDetector') as detector_class, \
+            patch.dict(inference_pool._worker_detectors, clear=True):
+        inference_pool._init_worker({'model_complexity': 1}, image, (0, 1))
+        # Estático e tracking de cada modelo
+        assert len(inference_pool._worker_detectors) == 4
+
+
+@patch('inference_pool.ProcessPoolExecutor')
+def test_inference_pool_stops_at_deadline(mock_executor_class):
+    """Testa que o pool não despacha frames novos após o deadline"""
+    mock_executor = MagicMock()
+    mock_executor.submit.side_effect = lambda fn, image, include, model_complexity: Mock(
+        result=Mock(return_value={'success': True})
+    )
+    mock_executor_class.return_value = mock_executor
+
+    pool = InferencePool(size=2, detector_kwargs={})
+    images = [f'/tmp/{i}.jpg' for i in range(10)]
+
+    assert pool.map_images(images, deadline=time.time() - 1) == []
+    assert mock_executor.submit.call_count == 0
+
+    results = pool.imap_images(images, deadline=time.time() + 60)
+    next(results)
+    # Janela de 2 frames por processo
+    assert mock_executor.submit.call_count == 4
+    results.close()
+
+
+# ========== Testes de Vídeo ==========
+
+def test_sample_video_frames_by_fps(sample_video):
+    """Testa amostragem de vídeo por fps"""
+    samples = sample_video_frames(sample_video, fps=2)
+
+    timestamps = [ts for ts, _ in samples]
+    assert timestamps == [0, 500, 1000, 1500]
+    assert samples[0][1].shape == (240, 320, 3)
+
+
+def test_sample_video_frames_by_timestamps(sample_video):
+    """Testa amostragem de vídeo por lista de timestamps"""
+    samples = sample_video_frames(sample_video, timestamps_ms=[1200, 300])
+
+    assert [ts for ts, _ in samples] == [300, 1200]
+
+
+def test_sample_video_frames_max_frames(sample_video):
+    """Testa que a decodificação para ao exceder o limite de frames"""
+    samples = sample_video_frames(sample_video, fps=10, max_frames=3)
+    assert len(samples) == 4
+
+
+def test_iter_video_frames_lazy(sample_video):
+    """Testa decodificação sob demanda e estimativa do total de frames"""
+    frames = iter_video_frames(sample_video, fps=5)
+    assert next(frames)[0] == 0
+    assert len(list(frames)) == 9
+    assert estimate_sample_count(sample_video, fps=5) == 11
+    assert estimate_sample_count(sample_video, timestamps_ms=[0, 500]) == 2
+
+
+def test_sample_video_frames_invalid_file():
+    """Testa erro ao abrir vídeo inexistente"""
+    with pytest.raises(ValueError):
+        sample_video_frames('/fake/video.mp4', fps=5)
+
+
+# ========== Testes de Formato Binário ==========
+
+def test_wire_format_roundtrip_float32():
+    """Testa serialização binária float32 com array alinhado"""
+    landmarks = np.random.rand(3, 33, 4).astype(np.float32)
+    payload = encode_landmarks({'success': True, 'frames': [1, 2, 3]}, landmarks)
+
+    metadata_length = HEADER.unpack_from(payload)[-1]
+    assert (HEADER.size + metadata_length) % 4 == 0
+    assert len(payload) == HEADER.size + metadata_length + landmarks.nbytes
+
+    metadata, decoded = decode_landmarks(payload)
+    assert metadata == {'success': True, 'frames': [1, 2, 3]}
+    np.testing.assert_array_equal(decoded, landmarks)
+
+
+def test_wire_format_roundtrip_int16():
+    """Testa quantização int16 (metade do tamanho, erro < 1e-4)"""
+    landmarks = np.random.rand(2, 33, 4).astype(np.float32)
+    payload = encode_landmarks({}, landmarks, precision='int16')
+
+    metadata, decoded = decode_landmarks(payload)
+    assert decoded.shape == (2, 33, 4)
+    assert np.abs(decoded - landmarks).max() < 1e-4
+
+    with pytest.raises(ValueError):
+        encode_landmarks({}, landmarks, precision='float8')
+
+
+# ========== Testes de Cache ==========
+
+def test_result_cache_lru_eviction():
+    """Testa chave por conteúdo + configurações e eviction do LRU"""
+    cache = PoseResultCache({'model_complexity': 1}, max_entries=2)
+    other_settings = PoseResultCache({'model_complexity': 2}, max_entries=2)
+
+    key_a, key_b, key_c = (cache.make_key(content) for content in (b'a', b'b', b'c'))
+    assert key_a == cache.make_key(b'a')
+    assert key_a != other_settings.make_key(b'a')
+    assert cache.make_key(b'a', model_complexity=1) == key_a
+    assert cache.make_key(b'a', model_complexity=2) == other_settings.make_key(b'a')
+
+    cache.set(key_a, {'success': True})
+    cache.set(key_b, {'success': True})
+    cache.get(key_a)
+    cache.set(key_c, {'success': True})
+
+    assert cache.get(key_a) is not None
+    assert cache.get(key_b) is None
+    assert cache.get(key_c) is not None
+
+
+def test_result_cache_redis_tier():
+    """Testa leitura do Redis com promoção para o LRU"""
+    store = {}
+    redis_client = Mock()
+    redis_client.get.side_effect = store.get
+    redis_client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+
+    writer = PoseResultCache({'model_complexity': 1}, redis_client=redis_client)
+    key = writer.make_key(b'frame')
+    writer.set(key, {'success': True, 'landmarks_normalized': np.zeros((33, 4))})
+
+    reader = PoseResultCache({'model_complexity': 1}, redis_client=redis_client)
+    result = reader.get(key)
+    assert result['landmarks_normalized'].shape == (33, 4)
+
+    redis_client.get.side_effect = ConnectionError('down')
+    assert reader.get(key) is not None
+    assert reader.get(reader.make_key(b'other')) is None
+
+
+def test_result_cache_redis_uses_json(sample_pose_frame):
+    """Testa que o Redis guarda JSON (sem pickle) e ignora entradas ilegíveis"""
+    store = {}
+    redis_client = Mock()
+    redis_client.get.side_effect = store.get
+    redis_client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+
+    cache = PoseResultCache({'model_complexity': 1}, redis_client=redis_client)
+    key = cache.make_key(b'frame')
+    cache.set(key, {'success': True, 'landmarks': sample_pose_frame})
+
+    payload = store[cache.key_prefix + key]
+    assert json.loads(payload)['success'] == True
+
+    result = PoseResultCache({'model_complexity': 1}, redis_client=redis_client).get(key)
+    assert np.array_equal(result['landmarks'].normalized, sample_pose_frame.normalized)
+    assert result['landmarks'].width == sample_pose_frame.width
+
+    # Payload pickle (gravado por terceiros no Redis) nunca é desserializado
+    store[cache.key_prefix + key] = pickle.dumps({'success': True})
+    assert PoseResultCache({'model_complexity': 1}, redis_client=redis_client).get(key) is None
+
+
+# ========== Testes de Jobs ==========
+
+def test_job_worker_progress_and_failure():
+    """Testa processamento em lotes com progresso e falha do handler"""
+    store = InMemoryJobStore()
+
+    def handler(job_id, job, report):
+        if job.get('fail'):
+            raise RuntimeError('boom')
+        report([{'frame_number': 1}], 1)
+        report([{'frame_number': 2}], 2)
+        return {'statistics': {'frames_processed': 2}}
+
+    worker = JobWorker(store, handler, threads=0)
+    store.create('ok', {'status': 'queued'})
+    store.create('bad', {'status': 'queued', 'fail': True})
+    store.enqueue('ok')
+    store.enqueue('bad')
+
+    assert worker.run_once() is True
+    assert worker.run_once() is True
+    assert worker.run_once() is False
+
+    assert store.get('ok')['status'] == 'completed'
+    assert store.get('ok')['frames_done'] == 2
+    assert [f['frame_number'] for f in store.get_frames('ok')] == [1, 2]
+    assert store.get('bad')['status'] == 'failed'
+    assert store.get('bad')['error'] == 'boom'
+
+
+def test_in_memory_job_store_ttl():
+    """Testa expiração de jobs e resultados no store em memória"""
+    store = InMemoryJobStore(ttl=60)
+    store.create('old', {'status': 'completed'})
+    store.append_frames('old', [{'frame_number': 1}])
+
+    with patch('job_queue.time.time', return_value=time.time() + 61):
+        assert store.get('old') is None
+        store.create('new', {'status': 'queued'})
+        assert store.get('new') is not None
+
+    assert 'old' not in store._jobs
+    assert store.get_frames('old') == []
+
+
+def test_job_worker_reclaims_expired_lease():
+    """Testa retomada de job cujo worker morreu: volta à fila, depois falha"""
+    store = InMemoryJobStore()
+    calls = []
+
+    def handler(job_id, job, report):
+        calls.append(job_id)
+        report([{'frame_number': 1}], 1)
+        return {}
+
+    worker = JobWorker(store, handler, threads=0, lease_seconds=30, max_attempts=2)
+
+    # Worker morto no meio do job: status running, lease vencido
+    store.create('lost', {'status': 'running', 'attempts': 1, 'frames_done': 4})
+    store.append_frames('lost', [{'frame_number': 1}])
+    store.acquire_lease('lost', -1)
+
+    assert worker.run_once() is True
+    assert calls == ['lost']
+    job = store.get('lost')
+    assert job['status'] == 'completed'
+    assert job['attempts'] == 2
+    assert [f['frame_number'] for f in store.get_frames('lost')] == [1]
+    assert store.expired_leases() == []
+
+    # Segunda perda: o job fica failed em vez de voltar à fila
+    store.update('lost', status='running')
+    store.acquire_lease('lost', -1)
+    assert worker.reclaim_expired() == 1
+    assert store.get('lost')['status'] == 'failed'
+    assert store.get('lost')['error'] == 'Job worker lost'
+    assert worker.run_once() is False
+
+
+def test_job_worker_reclaims_job_dequeued_by_dead_worker():
+    """Testa job retirado da fila por um worker que morreu antes de iniciá-lo"""
+    store = InMemoryJobStore()
+    worker = JobWorker(store, lambda job_id, job, report: {}, threads=0)
+    store.create('job', {'status': 'queued'})
+    store.enqueue('job')
+
+    # Retirado com lease já vencido, sem chegar a running
+    assert store.dequeue(0, lease_seconds=-1) == 'job'
+    assert store.get('job')['status'] == 'queued'
+
+    assert worker.run_once() is True
+    assert store.get('job')['status'] == 'completed'
+    assert store.get('job')['attempts'] == 1
+
+
+def test_redis_job_store_dequeue_takes_lease_atomically():
+    """Testa que o Redis retira o job e registra o lease num único script"""
+    client = Mock()
+    script = client.register_script.return_value
+    script.side_effect = [None, b'job']
+    store = RedisJobStore(client, ttl=60)
+
+    with patch('job_queue.DEQUEUE_POLL_SECONDS', 0.001):
+        assert store.dequeue(timeout=1, lease_seconds=30) == 'job'
+
+    assert script.call_count == 2
+    assert script.call_args.kwargs['keys'] == ['mediapipe:job:queue', 'mediapipe:job:leases']
+    assert script.call_args.kwargs['args'][0] == pytest.approx(time.time() + 30, abs=1)
+    client.brpop.assert_not_called()
+    client.rpop.assert_not_called()
+
+    script.side_effect = None
+    script.return_value = None
+    assert store.dequeue(timeout=0, lease_seconds=30) is None
+
+
+def test_job_worker_abandons_job_after_lease_lost():
+    """Testa que o worker para de escrever quando outro retomou o job"""
+    store = InMemoryJobStore()
+
+    def handler(job_id, job, report):
+        report([{'frame_number': 1}], 1)
+        store.release_lease(job_id)  # Lease retomado por outro worker
+        report([{'frame_number': 2}], 2)
+        return {}
+
+    worker = JobWorker(store, handler, threads=0)
+    store.create('job', {'status': 'queued'})
+    store.enqueue('job')
+
+    assert worker.run_once() is True
+    assert store.get('job')['status'] == 'running'
+    assert store.get('job')['frames_done'] == 1
+    assert len(store.get_frames('job')) == 1
+
+
+# ========== Testes de Admissão ==========
+
+def test_frame_budget_admission():
+    """Testa reserva, recusa e estimativa de Retry-After"""
+    budget = FrameBudget(capacity=20, parallelism=2, initial_seconds_per_frame=1.0)
+
+    assert budget.try_acquire(15) is True
+    assert budget.try_acquire(10) is False
+    assert budget.try_acquire(5) is True
+    assert budget.retry_after() == 10
+
+    budget.release(20)
+    assert budget.in_flight == 0
+
+    # Requisição maior que o orçamento é aceita sozinha
+    assert budget.try_acquire(30) is True
+    budget.release(30, elapsed_seconds=3.0)
+    assert budget.seconds_per_frame == pytest.approx(0.84)
+
+
+def test_frame_budget_blocking_acquire():
+    """Testa espera por vaga no orçamento (lotes de jobs)"""
+    budget = FrameBudget(capacity=10)
+    budget.try_acquire(8)
+
+    assert budget.acquire(4, timeout=0.01) is False
+
+    releaser = threading.Timer(0.05, budget.release, args=(8,))
+    releaser.start()
+    assert budget.acquire(4, timeout=2) is True
+    releaser.join()
+    assert budget.in_flight == 4
+
+
+def test_complexity_policy_downgrades_under_load():
+    """Testa escolha do modelo mais pesado que cabe no SLO"""
+    policy = ComplexityPolicy(
+        tiers=[0, 1, 2],
+        slo_seconds=1.0,
+        parallelism=2,
+        initial_seconds_per_frame={0: 0.02, 1: 0.05, 2: 0.2}
+    )
+
+    assert policy.choose(frames=5, queued_frames=0) == 2      # 0.5s no heavy
+    assert policy.choose(frames=5, queued_frames=20) == 1     # 2.5s no heavy, 0.625s no full
+    assert policy.choose(frames=5, queued_frames=60) == 0     # 1.625s no full
+    assert policy.choose(frames=5, queued_frames=500) == 0    # nenhum cabe: o mais leve
+
+    # Heavy mais rápido que o estimado volta a ser escolhido com a mesma fila
+    for _ in range(20):
+        policy.observe(2, frames=10, busy_seconds=0.5)
+    assert policy.seconds_per_frame[2] == pytest.approx(0.05, rel=0.05)
+    assert policy.choose(frames=5, queued_frames=20) == 2
+
+
+def test_complexity_policy_single_tier():
+    """Testa que com um único modelo a escolha é sempre ele"""
+    policy = ComplexityPolicy(tiers=[1], slo_seconds=0.001)
+    assert not policy.adaptive
+    assert policy.choose(frames=100, queued_frames=100) == 1
+
+
+# ========== Testes de Warm-up ==========
+
+def test_readiness_transitions():
+    """Testa os estados do warm-up (pendente -> pronto)"""
+    readiness = Readiness()
+    assert readiness.state == WARMUP_PENDING
+    assert not readiness.ready
+
+    readiness.run(lambda: None)
+    assert readiness.state == WARMUP_READY
+    assert readiness.ready
+    assert 'warm_up_ms' in readiness.to_dict()
+
+
+def test_readiness_records_failure():
+    """Testa que falha no warm-up mantém o worker não pronto"""
+    readiness = Readiness()
+
+    def failing():
+        raise RuntimeError('model not found')
+
+    readiness.run(failing)
+    assert readiness.state == WARMUP_FAILED
+    assert not readiness.ready
+    assert readiness.to_dict()['error'] == 'model not found'
+
+
+def test_readiness_starts_once():
+    """Testa que start só dispara o warm-up uma vez"""
+    readiness = Readiness()
+    calls = []
+    assert readiness.start(lambda: calls.append(1))
+    assert not readiness.start(lambda: calls.append(2))
+
+    deadline = time.time() + 5
+    while not readiness.ready and time.time() < deadline:
+        time.sleep(0.01)
+    assert readiness.ready
+    assert calls == [1]
+
+
+def test_synthetic_pose_image():
+    """Testa a imagem sintética do warm-up"""
+    image = synthetic_pose_image()
+    assert image.shape == (480, 360, 3)
+    assert image.dtype == np.uint8
+
+
+def test_inference_pool_warm_up_inline():
+    """Testa que warm_up aquece só o detector estático do modelo padrão, ou todos com warm_up_all"""
+    image = synthetic_pose_image()
+
+    def make_pool(warm_up_all):
+        return InferencePool(
+            size=1,
+            detector_kwargs={'model_complexity': 1},
+            inline_detectors={0: DetectorPool(Mock, 1, [Mock()]), 1: DetectorPool(Mock, 1, [Mock()])},
+            warm_up_image=image,
+            warm_up_all=warm_up_all
+        )
+
+    with patch('inference_pool.PoseDetector') as tracking_class:
+        pool = make_pool(False)
+        pool.warm_up()
+
+    pool.inline_detectors[1].acquire().warm_up.assert_called_once_with(image, cascade=False)
+    pool.inline_detectors[0].acquire().warm_up.assert_not_called()
+    tracking_class.assert_not_called()
+
+    with patch('inference_pool.PoseDetector') as tracking_class:
+        pool = make_pool(True)
+        pool.warm_up()
+
+    for complexity in (0, 1):
+        pool.inline_detectors[complexity].acquire().warm_up.assert_called_once_with(image, cascade=True)
+    assert tracking_class.call_count == 2
+    assert tracking_class.call_args.kwargs['static_image_mode'] == False
+    tracking_class.return_value.warm_up.assert_called_with(image, cascade=True)
+
+
+def test_inference_pool_warm_up_waits_for_every_process():
+    """Testa que warm_up só termina quando todos os processos responderam"""
+    from concurrent.futures import Future
+
+    # 1ª rodada: só o processo 101 terminou o initializer
+    answers = iter([101, 101, 101, 101, 101, 102, 103, 104])
+    executor = Mock()
+
+    def submit(fn, *args):
+        future = Future()
+        future.set_result(next(answers))
+        return future
+
+    executor.submit.side_effect = submit
+    pool = InferencePool(size=4, detector_kwargs={})
+    pool._executor = executor
+
+    pool.warm_up()
+    assert executor.submit.call_count == 8
+
+    answers = iter([101] * 8)
+    with pytest.raises(TimeoutError):
+        pool.warm_up(timeout=0)
+
+    # Processo preso no initializer: o ping nunca responde
+    executor.submit.side_effect = lambda fn, *args: Future()
+    started = time.time()
+    with pytest.raises(TimeoutError):
+        pool.warm_up(timeout=0.05)
+    assert time.time() - started < 1
+
+
+# ========== Testes de Métricas ==========
+
+def test_gunicorn_conf_prepares_multiprocess_metrics(tmp_path, monkeypatch):
+    """Testa limpeza do diretório de métricas e remoção de workers mortos"""
+    import runpy
+
+    metrics_dir = tmp_path / 'prometheus'
+    metrics_dir.mkdir()
+    (metrics_dir / 'counter_123.db').write_bytes(b'stale')
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(metrics_dir))
+    monkeypatch.setenv('GUNICORN_WORKERS', '3')
+
+    conf = runpy.run_path(os.path.join(os.path.dirname(__file__), 'gunicorn.conf.py'))
+    assert conf['preload_app'] == True
+    assert conf['workers'] == 3
+    conf['on_starting'](None)
+    assert list(metrics_dir.iterdir()) == []
+
+    with patch('prometheus_client.multiprocess.mark_process_dead') as mark_dead:
+        conf['child_exit'](None, SimpleNamespace(pid=123))
+    mark_dead.assert_called_once_with(123)
+
+
+def test_inference_pool_routes_model_complexity():
+    """Testa que cada complexidade usa seus próprios detectores inline"""
+    lite, full = Mock(), Mock()
+    lite.process_image.return_value = {'success': True, 'model': 'lite'}
+    full.process_image.return_value = {'success': True, 'model': 'full'}
+    pool = InferencePool(
+        size=1,
+        detector_kwargs={'model_complexity': 1},
+        inline_detectors={0: DetectorPool(Mock, 1, [lite]), 1: DetectorPool(Mock, 1, [full])}
+    )
+
+    assert pool.model_complexities == (0, 1)
+    assert pool.map_images(['/tmp/a.jpg'])[0]['model'] == 'full'
+    assert pool.map_images(['/tmp/a.jpg'], model_complexity=0)[0]['model'] == 'lite'
+    with pytest.raises(ValueError):
+        pool.map_images(['/tmp/a.jpg'], model_complexity=2)
+
+
+def test_inference_pool_tracks_active_tasks():
+    """Testa a contagem de tarefas em execução usada na métrica de utilização"""
+    detector = Mock()
+    changes = []
+    pool = InferencePool(size=1, detector_kwargs={}, inline_detectors={1: DetectorPool(Mock, 1, [detector])})
+    pool.on_active_change = changes.append
+    detector.process_image.side_effect = lambda image, include: {'success': True, 'active': pool.active_tasks}
+
+    results = pool.map_images(['/tmp/a.jpg', '/tmp/b.jpg'])
+
+    assert [r['active'] for r in results] == [1, 1]
+    assert pool.active_tasks == 0
+    assert changes == [1, 0, 1, 0]
+
+
 # ========== Testes de API Flask ==========
 
 def test_health_endpoint(client):
@@ -308,6 +1468,29 @@ def test_health_endpoint(client):
     assert 'config' in data
 
 
+def test_ready_endpoint(client):
+    """Testa que /ready responde 503 até o warm-up terminar"""
+    import mediapipe_service
+
+    with patch.object(mediapipe_service, 'readiness', Readiness()) as readiness:
+        response = client.get('/ready')
+        assert response.status_code == 503
+        assert json.loads(response.data)['status'] == WARMUP_PENDING
+
+        with patch.object(mediapipe_service, 'detector_pools', {1: Mock()}) as detectors, \
+                patch.object(mediapipe_service, 'inference_pool') as pool:
+            pool.size = 4
+            readiness.run(mediapipe_service._warm_up)
+
+        # Com pool de processos só um detector local é aquecido
+        detectors[1].warm_up.assert_called_once_with(mediapipe_service.warm_up_image, 1, cascade=False)
+        pool.warm_up.assert_called_once()
+
+        response = client.get('/ready')
+        assert response.status_code == 200
+        assert json.loads(response.data)['status'] == WARMUP_READY
+
+
 def test_config_endpoint(client):
     """Testa endpoint /config"""
     response = client.get('/config')
@@ -316,6 +1499,7 @@ def test_config_endpoint(client):
     assert response.status_code == 200
     assert 'model_complexity' in data
     assert 'max_frames_per_request' in data
+    assert 'squat' in data['exercises']
 
 
 def test_analyze_frames_missing_data(client):
@@ -344,6 +1528,660 @@ def test_analyze_frames_too_many_frames(client):
     assert 'Too many frames' in data['error']
 
 
+def test_analyze_frames_invalid_mode(client):
+    """Testa endpoint /analyze-frames com modo inválido"""
+    response = client.post('/analyze-frames',
+                          data=json.dumps({
+                              'frames': [{'path': '/tmp/frame.jpg', 'timestamp_ms': 0}],
+                              'mode': 'turbo'
+                          }),
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 400
+    assert 'Invalid mode' in data['error']
+
+
+def test_analyze_frames_unknown_exercise(client):
+    """Testa endpoint /analyze-frames com exercício fora do registro"""
+    response = client.post('/analyze-frames',
+                          data=json.dumps({
+                              'frames': [{'path': '/tmp/frame.jpg', 'timestamp_ms': 0}],
+                              'exercise_type': 'cartwheel'
+                          }),
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 400
+    assert 'Unknown exercise_type' in data['error']
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_sequence_mode(mock_pool, client, sample_frame_image, sample_pose_frame):
+    """Testa que o modo sequence usa o detector com tracking"""
+    pose_result = {
+        'success': True,
+        'landmarks': sample_pose_frame
+    }
+    mock_pool.map_sequence.return_value = [pose_result, pose_result]
+
+    frames = [
+        {'path': sample_frame_image, 'timestamp_ms': 0},
+        {'path': sample_frame_image, 'timestamp_ms': 100}
+    ]
+    response = client.post('/analyze-frames',
+                          data=json.dumps({'frames': frames, 'mode': 'sequence'}),
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert len(data['frames']) == 2
+    assert mock_pool.map_sequence.call_args.args[0] == [sample_frame_image, sample_frame_image]
+    mock_pool.imap_images.assert_not_called()
+
+
+def test_analyze_video_missing_video(client):
+    """Testa endpoint /analyze-video sem vídeo"""
+    response = client.post('/analyze-video',
+                          data=json.dumps({}),
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 400
+    assert 'Missing video_path' in data['error']
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_video_decodes_in_memory(mock_pool, client, sample_video, sample_pose_frame):
+    """Testa que /analyze-video envia frames decodificados direto ao detector"""
+    pose_result = {
+        'success': True,
+        'landmarks': sample_pose_frame
+    }
+    mock_pool.imap_images.side_effect = lambda images, include=None, deadline=None, model_complexity=None: iter([pose_result] * len(images))
+
+    response = client.post('/analyze-video',
+                          data=json.dumps({'video_path': sample_video, 'fps': 2}),
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data['statistics']['frames_processed'] == 4
+    assert [f['timestamp_ms'] for f in data['frames']] == [0, 500, 1000, 1500]
+
+    images = mock_pool.imap_images.call_args.args[0]
+    assert all(isinstance(image, np.ndarray) for image in images)
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_multipart_upload(mock_pool, client, sample_pose_frame):
+    """Testa /analyze-frames com frames enviados em multipart (sem path)"""
+    pose_result = {
+        'success': True,
+        'landmarks': sample_pose_frame
+    }
+    mock_pool.imap_images.side_effect = lambda images, include=None, deadline=None, model_complexity=None: iter([pose_result] * len(images))
+
+    ok, encoded = cv2.imencode('.jpg', np.zeros((48, 64, 3), dtype=np.uint8))
+    frames = [
+        (BytesIO(encoded.tobytes()), 'frame_001.jpg'),
+        (BytesIO(encoded.tobytes()), 'frame_002.jpg')
+    ]
+    response = client.post('/analyze-frames',
+                          data={'frames': frames, 'timestamps_ms': '0,500', 'exercise_type': 'squat'},
+                          content_type='multipart/form-data')
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert [f['timestamp_ms'] for f in data['frames']] == [0, 500]
+
+    images = mock_pool.imap_images.call_args.args[0]
+    assert images == [encoded.tobytes(), encoded.tobytes()]
+
+
+def test_analyze_frames_multipart_missing_timestamps(client):
+    """Testa upload multipart sem timestamps_ms correspondentes"""
+    response = client.post('/analyze-frames',
+                          data={'frames': [(BytesIO(b'abc'), 'frame.jpg')]},
+                          content_type='multipart/form-data')
+    data = json.loads(response.data)
+
+    assert response.status_code == 400
+    assert 'timestamps_ms' in data['error']
+
+
+def test_analyze_frames_upload_size_limits(client, monkeypatch):
+    """Testa os limites de upload: por imagem (durante a leitura) e do corpo inteiro"""
+    import mediapipe_service
+
+    monkeypatch.setattr(mediapipe_service.config, 'MAX_IMAGE_SIZE_MB', 1)
+    image = (BytesIO(b'x' * (2 * 1024 * 1024)), 'frame.jpg', 'image/jpeg')
+    response = client.post('/analyze-frames',
+                          data={'frames': [image], 'timestamps_ms': '0'},
+                          content_type='multipart/form-data')
+    assert response.status_code == 413
+    assert 'Image too large' in json.loads(response.data)['error']
+
+    # Content-Length acima de MAX_CONTENT_LENGTH: recusado antes de ler o corpo
+    monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 1024)
+    video = (BytesIO(b'x' * 4096), 'clip.mp4', 'application/octet-stream')
+    response = client.post('/analyze-video', data={'video': video}, content_type='multipart/form-data')
+    assert response.status_code == 413
+    assert 'Request too large' in json.loads(response.data)['error']
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_json_ignores_image_key(mock_pool, client):
+    """Testa que imagens em memória só valem em multipart (JSON exige path válido)"""
+    response = client.post('/analyze-frames',
+                          json={'frames': [{'image': '/etc/passwd', 'timestamp_ms': 0}]})
+
+    assert response.status_code == 400
+    # Nenhuma imagem despachada para inferência
+    assert mock_pool.imap_images.call_args.args[0] == []
+
+
+def test_analyze_single_frame_binary_body(client, sample_pose_frame):
+    """Testa /analyze-single-frame com a imagem no corpo da requisição"""
+    import mediapipe_service
+
+    mock_detector_pool = MagicMock()
+    mock_detector = mock_detector_pool.checkout.return_value.__enter__.return_value
+    mock_detector.process_image.return_value = {
+        'success': True,
+        'landmarks': sample_pose_frame
+    }
+
+    with patch.dict(mediapipe_service.detector_pools, {1: mock_detector_pool}):
+        response = client.post('/analyze-single-frame?exercise_type=squat',
+                              data=b'fake-jpeg-bytes',
+                              content_type='image/jpeg')
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert 'knee_left' in data['angles']
+    assert data['model_complexity'] == 1
+    assert bytes(mock_detector.process_image.call_args.args[0]) == b'fake-jpeg-bytes'
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_streaming(mock_pool, client, sample_frame_image, sample_pose_frame):
+    """Testa resposta NDJSON: uma linha por frame e uma linha final de estatísticas"""
+    pose_ok = {
+        'success': True,
+        'landmarks': sample_pose_frame
+    }
+    pose_fail = {'success': False, 'error': 'No pose detected in image'}
+    mock_pool.imap_images.return_value = iter([pose_ok, pose_fail, pose_ok])
+
+    frames = [{'path': sample_frame_image, 'timestamp_ms': i * 100} for i in range(3)]
+    response = client.post('/analyze-frames',
+                          data=json.dumps({'frames': frames, 'stream': True}),
+                          content_type='application/json')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [line['type'] for line in lines] == ['frame', 'frame', 'summary']
+    assert [line['frame_number'] for line in lines[:2]] == [1, 3]
+    assert lines[-1]['success'] == True
+    assert lines[-1]['statistics']['frames_processed'] == 2
+    assert lines[-1]['statistics']['frames_total'] == 3
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_streaming_accept_header(mock_pool, client, sample_frame_image):
+    """Testa streaming via Accept header quando nenhum frame é processado"""
+    mock_pool.imap_images.return_value = iter([{'success': False, 'error': 'No pose'}])
+
+    response = client.post('/analyze-frames',
+                          data=json.dumps({'frames': [{'path': sample_frame_image, 'timestamp_ms': 0}]}),
+                          content_type='application/json',
+                          headers={'Accept': 'application/x-ndjson'})
+
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert len(lines) == 1
+    assert lines[0]['type'] == 'summary'
+    assert lines[0]['success'] == False
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_fields_projection(mock_pool, client, sample_frame_image, sample_pose_frame):
+    """Testa que só os campos pedidos são extraídos e serializados"""
+    mock_pool.imap_images.return_value = iter([{
+        'success': True,
+        'landmarks': sample_pose_frame
+    }])
+
+    response = client.post('/analyze-frames',
+                          data=json.dumps({
+                              'frames': [{'path': sample_frame_image, 'timestamp_ms': 0}],
+                              'fields': ['phase', 'angles']
+                          }),
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert set(data['frames'][0].keys()) == {'frame_number', 'timestamp_ms', 'phase', 'angles'}
+    assert mock_pool.imap_images.call_args.args[1] == []
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_result_cache(mock_pool, client, sample_frame_image, sample_pose_frame):
+    """Testa que frames repetidos reutilizam os landmarks do cache"""
+    mock_pool.imap_images.side_effect = lambda images, include=None, deadline=None, model_complexity=None: iter([{
+        'success': True,
+        'landmarks': sample_pose_frame
+    } for _ in images])
+
+    payload = {
+        'frames': [
+            {'path': sample_frame_image, 'timestamp_ms': 0},
+            {'path': sample_frame_image, 'timestamp_ms': 100}
+        ],
+        'exercise_type': 'squat'
+    }
+
+    with patch('mediapipe_service.result_cache', PoseResultCache({'model_complexity': 1})):
+        first = client.post('/analyze-frames', data=json.dumps(payload), content_type='application/json')
+        payload['exercise_type'] = 'deadlift'
+        second = client.post('/analyze-frames', data=json.dumps(payload), content_type='application/json')
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert len(json.loads(second.data)['frames']) == 2
+
+    # 1ª requisição: dois misses (mesmo conteúdo, ainda não gravado); 2ª: só hits
+    assert mock_pool.imap_images.call_count == 2
+    first_misses, second_misses = (c.args[0] for c in mock_pool.imap_images.call_args_list)
+    assert len(first_misses) == 2
+    assert isinstance(first_misses[0], bytes)
+    assert second_misses == []
+
+
+@patch('mediapipe_service.inference_pool')
+def test_cache_hits_do_not_lower_learned_cost(mock_pool, client, sample_frame_image, sample_pose_frame):
+    """Testa que hits do cache (sem tempos medidos) não entram no custo por frame"""
+    mock_pool.imap_images.side_effect = lambda images, include=None, deadline=None, model_complexity=None: iter([{
+        'success': True,
+        'landmarks': sample_pose_frame,
+        'timings': {'decode': 0.0, 'inference': 0.2, 'extraction': 0.0}
+    } for _ in images])
+    policy = ComplexityPolicy(tiers=[1], slo_seconds=1.0, initial_seconds_per_frame={1: 0.1})
+    payload = {'frames': [{'path': sample_frame_image, 'timestamp_ms': i * 100} for i in range(2)]}
+
+    with patch('mediapipe_service.result_cache', PoseResultCache({'model_complexity': 1})), \
+            patch('mediapipe_service.complexity_policy', policy):
+        client.post('/analyze-frames', data=json.dumps(payload), content_type='application/json')
+        learned = policy.seconds_per_frame[1]
+        assert learned == pytest.approx(0.12)
+
+        # Só hits: nada a aprender
+        client.post('/analyze-frames', data=json.dumps(payload), content_type='application/json')
+        assert policy.seconds_per_frame[1] == learned
+
+        # Mistura: um frame novo e dois hits; o custo segue o frame medido
+        payload['frames'].append({'path': __file__, 'timestamp_ms': 200})
+        client.post('/analyze-frames', data=json.dumps(payload), content_type='application/json')
+        assert policy.seconds_per_frame[1] == pytest.approx(learned + 0.2 * (0.2 - learned))
+
+
+@patch('mediapipe_service.job_worker')
+@patch('mediapipe_service.inference_pool')
+def test_jobs_submit_poll_result(mock_pool, mock_worker, client, sample_frame_image, sample_pose_frame):
+    """Testa o ciclo submit/poll/result de um job acima do limite síncrono"""
+    import mediapipe_service
+
+    mock_pool.imap_images.side_effect = lambda images, include=None, deadline=None, model_complexity=None: iter([{
+        'success': True,
+        'landmarks': sample_pose_frame
+    } for _ in images])
+
+    frames = [{'path': sample_frame_image, 'timestamp_ms': i * 100} for i in range(30)]
+    response = client.post('/jobs',
+                          data=json.dumps({'frames': frames, 'exercise_type': 'squat', 'fields': ['phase']}),
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 202
+    assert response.headers['Location'] == data['status_url']
+    mock_worker.ensure_started.assert_called_once()
+
+    job_id = data['job_id']
+    assert client.get(f'/jobs/{job_id}/result').status_code == 409
+
+    in_flight = mediapipe_service.frame_budget.in_flight
+    worker = JobWorker(mediapipe_service.job_store, mediapipe_service._run_job, threads=0)
+    with patch.object(mediapipe_service.config, 'JOB_BATCH_SIZE', 8):
+        assert worker.run_once() is True
+
+    status = json.loads(client.get(f'/jobs/{job_id}').data)
+    assert status['status'] == 'completed'
+    assert status['progress'] == {'frames_done': 30, 'frames_total': 30}
+    assert mock_pool.imap_images.call_count == 4
+
+    result = json.loads(client.get(f'/jobs/{job_id}/result').data)
+    assert result['success'] is True
+    assert len(result['frames']) == 30
+    assert result['frames'][-1]['frame_number'] == 30
+    assert result['duration_ms'] == 2900
+    assert result['statistics']['frames_processed'] == 30
+    assert result['model_complexity'] == mediapipe_service.config.MODEL_COMPLEXITY
+    assert mediapipe_service.frame_budget.in_flight == in_flight
+
+
+@patch('mediapipe_service.job_worker')
+@patch('mediapipe_service.inference_pool')
+def test_jobs_sequence_mode_restarts_tracking_per_batch(mock_pool, mock_worker, client, sample_frame_image,
+                                                        sample_pose_frame):
+    """Testa jobs em sequence: uma sequência por lote e progresso sobre os frames válidos"""
+    import mediapipe_service
+
+    mock_pool.map_sequence.side_effect = lambda images, include=None, deadline=None, model_complexity=None: [{
+        'success': True,
+        'landmarks': sample_pose_frame
+    } for _ in images]
+
+    frames = [{'path': sample_frame_image, 'timestamp_ms': i * 100} for i in range(20)]
+    frames.insert(5, {'path': '/nonexistent/frame.jpg', 'timestamp_ms': 450})
+    response = client.post('/jobs',
+                          data=json.dumps({'frames': frames, 'mode': 'sequence'}),
+                          content_type='application/json')
+    job_id = json.loads(response.data)['job_id']
+    assert response.status_code == 202
+
+    worker = JobWorker(mediapipe_service.job_store, mediapipe_service._run_job, threads=0)
+    with patch.object(mediapipe_service.config, 'JOB_BATCH_SIZE', 8):
+        assert worker.run_once() is True
+
+    # Cada lote é uma sequência nova (tracking reiniciado)
+    assert [len(c.args[0]) for c in mock_pool.map_sequence.call_args_list] == [8, 8, 4]
+
+    status = json.loads(client.get(f'/jobs/{job_id}').data)
+    assert status['status'] == 'completed'
+    assert status['progress'] == {'frames_done': 20, 'frames_total': 20}
+
+    response = client.post('/jobs',
+                          data=json.dumps({'frames': [{'path': '/nonexistent/frame.jpg', 'timestamp_ms': 0}]}),
+                          content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_jobs_disabled_with_memory_store_and_several_workers(client):
+    """Testa 503 em /jobs com store em memória e vários workers do gunicorn"""
+    with patch('mediapipe_service.jobs_enabled', False):
+        response = client.post('/jobs',
+                              data=json.dumps({'frames': [{'path': '/tmp/a.jpg'}]}),
+                              content_type='application/json')
+
+    assert response.status_code == 503
+    assert 'JOB_BACKEND=redis' in json.loads(response.data)['error']
+
+
+def test_jobs_not_found(client):
+    """Testa status de job inexistente"""
+    response = client.get('/jobs/unknown')
+    assert response.status_code == 404
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_rejected_when_busy(mock_pool, client, sample_frame_image):
+    """Testa 429 com Retry-After quando o orçamento de frames está esgotado"""
+    budget = FrameBudget(capacity=10)
+    budget.try_acquire(8)
+
+    with patch('mediapipe_service.frame_budget', budget):
+        response = client.post('/analyze-frames',
+                              data=json.dumps({
+                                  'frames': [{'path': sample_frame_image, 'timestamp_ms': i} for i in range(3)]
+                              }),
+                              content_type='application/json')
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert json.loads(response.data)['success'] is False
+    mock_pool.imap_images.assert_not_called()
+    assert budget.in_flight == 8
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_adaptive_complexity(mock_pool, client, sample_frame_image, sample_pose_frame):
+    """Testa que a complexidade escolhida pela carga vai para o pool e a resposta"""
+    mock_pool.imap_images.side_effect = lambda images, include=None, deadline=None, model_complexity=None: iter([{
+        'success': True,
+        'landmarks': sample_pose_frame
+    }] * len(images))
+    policy = ComplexityPolicy(tiers=[0, 1, 2], slo_seconds=1.0, initial_seconds_per_frame={0: 0.01, 1: 0.05, 2: 0.2})
+    budget = FrameBudget(capacity=0)
+
+    def post():
+        return client.post('/analyze-frames',
+                           data=json.dumps({
+                               'frames': [{'path': sample_frame_image, 'timestamp_ms': i} for i in range(3)]
+                           }),
+                           content_type='application/json')
+
+    with patch('mediapipe_service.complexity_policy', policy), \
+            patch('mediapipe_service.frame_budget', budget):
+        idle = json.loads(post().data)
+        assert mock_pool.imap_images.call_args.args[3] == 2
+
+        budget.try_acquire(30)   # fila: heavy e full passam do SLO
+        busy = json.loads(post().data)
+        assert mock_pool.imap_images.call_args.args[3] == 0
+
+    assert idle['model_complexity'] == 2
+    assert busy['model_complexity'] == 0
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_reports_escalated_frames(mock_pool, client, sample_frame_image, sample_pose_frame):
+    """Testa a contagem de frames reprocessados pela cascata"""
+    mock_pool.imap_images.side_effect = lambda images, include=None, deadline=None, model_complexity=None: iter([
+        {'success': True, 'landmarks': sample_pose_frame, 'escalated': escalated}
+        for escalated in (True, False, True)
+    ])
+
+    response = client.post('/analyze-frames',
+                           data=json.dumps({
+                               'frames': [{'path': sample_frame_image, 'timestamp_ms': i} for i in range(3)]
+                           }),
+                           content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data['statistics']['frames_escalated'] == 2
+
+
+def test_exercise_metric_label_is_normalized():
+    """Testa o label exercise_type das métricas (nome canônico ou 'other')"""
+    import mediapipe_service
+
+    assert mediapipe_service._exercise_label('agachamento') == 'squat'
+    assert mediapipe_service._exercise_label('squat') == 'squat'
+    assert mediapipe_service._exercise_label('x' * 200) == 'other'
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_streaming_releases_budget(mock_pool, client, sample_frame_image, sample_pose_frame):
+    """Testa que o streaming mantém os frames reservados até o fim da resposta"""
+    mock_pool.imap_images.return_value = iter([{
+        'success': True,
+        'landmarks': sample_pose_frame
+    }])
+    budget = FrameBudget(capacity=10)
+
+    with patch('mediapipe_service.frame_budget', budget):
+        response = client.post('/analyze-frames',
+                              data=json.dumps({
+                                  'frames': [{'path': sample_frame_image, 'timestamp_ms': 0}],
+                                  'stream': True
+                              }),
+                              content_type='application/json',
+                              buffered=False)
+        assert budget.in_flight == 1
+        response.get_data()
+        response.close()
+
+    assert budget.in_flight == 0
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_deadline_truncates(mock_pool, client, sample_frame_image, sample_pose_frame):
+    """Testa resposta parcial quando o deadline da requisição é atingido"""
+    mock_pool.imap_images.side_effect = lambda images, include=None, deadline=None, model_complexity=None: iter([{
+        'success': True,
+        'landmarks': sample_pose_frame
+    }] * 2)
+
+    response = client.post('/analyze-frames',
+                          data=json.dumps({
+                              'frames': [{'path': sample_frame_image, 'timestamp_ms': i * 100} for i in range(5)]
+                          }),
+                          content_type='application/json',
+                          headers={'X-Request-Timeout-Ms': '1500'})
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert len(data['frames']) == 2
+    assert data['statistics']['truncated'] is True
+    assert data['statistics']['frames_total'] == 5
+
+    # Header limita o deadline (TIMEOUT_SECONDS continua sendo o teto)
+    deadline = mock_pool.imap_images.call_args.args[2]
+    assert 0 < deadline - time.time() <= 1.5
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_deadline_no_frames(mock_pool, client, sample_frame_image):
+    """Testa 504 quando o deadline chega antes do primeiro frame"""
+    mock_pool.imap_images.return_value = iter([])
+
+    response = client.post('/analyze-frames',
+                          data=json.dumps({
+                              'frames': [{'path': sample_frame_image, 'timestamp_ms': 0}]
+                          }),
+                          content_type='application/json')
+
+    assert response.status_code == 504
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_timings(mock_pool, client, sample_frame_image, sample_pose_frame):
+    """Testa o bloco timings opcional com o tempo de cada etapa"""
+    mock_pool.imap_images.side_effect = lambda images, include=None, deadline=None, model_complexity=None: iter([{
+        'success': True,
+        'landmarks': sample_pose_frame,
+        'timings': {'decode': 0.004, 'inference': 0.05, 'extraction': 0.001}
+    } for _ in images])
+
+    frames = [{'path': sample_frame_image, 'timestamp_ms': i * 100} for i in range(2)]
+
+    response = client.post('/analyze-frames',
+                          data=json.dumps({'frames': frames, 'timings': True}),
+                          content_type='application/json')
+    timings = json.loads(response.data)['timings']
+
+    assert set(timings) == {
+        'decode_ms', 'inference_ms', 'extraction_ms', 'angles_ms', 'phase_ms', 'serialization_ms'
+    }
+    assert timings['inference_ms'] == 100.0
+    assert timings['decode_ms'] == 8.0
+
+    response = client.post('/analyze-frames',
+                          data=json.dumps({'frames': frames}),
+                          content_type='application/json')
+    assert 'timings' not in json.loads(response.data)
+
+
+def test_analyze_frames_invalid_fields(client):
+    """Testa endpoint /analyze-frames com campo desconhecido"""
+    response = client.post('/analyze-frames',
+                          data=json.dumps({
+                              'frames': [{'path': '/tmp/frame.jpg', 'timestamp_ms': 0}],
+                              'fields': ['angles', 'pixels']
+                          }),
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 400
+    assert 'Invalid fields: pixels' in data['error']
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_binary_format(mock_pool, client, sample_frame_image):
+    """Testa resposta binária negociada via Accept header"""
+    normalized = np.full((33, 4), 0.5, dtype=np.float32)
+    mock_pool.imap_images.return_value = iter([{
+        'success': True,
+        'landmarks': PoseFrame(normalized, 1, 1)
+    }] * 2)
+
+    frames = [{'path': sample_frame_image, 'timestamp_ms': i * 100} for i in range(2)]
+    response = client.post('/analyze-frames',
+                          data=json.dumps({'frames': frames, 'fields': ['angles']}),
+                          content_type='application/json',
+                          headers={'Accept': 'application/octet-stream'})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/octet-stream'
+
+    metadata, landmarks = decode_landmarks(response.data)
+    assert landmarks.shape == (2, 33, 4)
+    assert metadata['statistics']['frames_processed'] == 2
+    assert 'landmarks_normalized' not in metadata['frames'][0]
+    assert 'knee_left' in metadata['frames'][0]['angles']
+
+    # landmarks_normalized é extraído mesmo sem estar em fields
+    assert 'landmarks_normalized' in mock_pool.imap_images.call_args.args[1]
+
+
+@patch('mediapipe_service.inference_pool')
+def test_analyze_frames_binary_smaller_than_json(mock_pool, client, sample_frame_image):
+    """Testa que o binário padrão omite landmarks verbosos e é bem menor que o JSON"""
+    rng = np.random.default_rng(0)
+    pose_frames = [
+        PoseFrame(rng.random((33, 4), dtype=np.float32), 640, 480, rng.random((33, 4), dtype=np.float32))
+        for _ in range(5)
+    ]
+    mock_pool.imap_images.side_effect = lambda images, include=None, deadline=None, model_complexity=None: iter(
+        {'success': True, 'landmarks': frame} for frame in pose_frames
+    )
+    frames = [{'path': sample_frame_image, 'timestamp_ms': i * 100} for i in range(5)]
+
+    json_response = client.post('/analyze-frames', json={'frames': frames})
+    binary_response = client.post('/analyze-frames', json={'frames': frames, 'format': 'binary'})
+
+    assert json_response.status_code == 200
+    assert binary_response.status_code == 200
+    assert len(binary_response.data) * 5 < len(json_response.data)
+
+    metadata, landmarks = decode_landmarks(binary_response.data)
+    assert landmarks.shape == (5, 33, 4)
+    assert set(metadata['frames'][0]) == {'frame_number', 'timestamp_ms', 'phase', 'confidence', 'angles'}
+
+    # Pedidos explicitamente, os landmarks verbosos voltam ao bloco JSON
+    response = client.post('/analyze-frames',
+                          json={'frames': frames, 'format': 'binary', 'fields': ['angles', 'world_landmarks']})
+    metadata, _ = decode_landmarks(response.data)
+    assert len(metadata['frames'][0]['world_landmarks']) == 33
+    assert 'landmarks_3d' not in metadata['frames'][0]
+
+
+def test_analyze_frames_invalid_format(client):
+    """Testa combinação inválida de stream e formato binário"""
+    response = client.post('/analyze-frames',
+                          data=json.dumps({
+                              'frames': [{'path': '/tmp/frame.jpg', 'timestamp_ms': 0}],
+                              'stream': True,
+                              'format': 'binary'
+                          }),
+                          content_type='application/json')
+
+    assert response.status_code == 400
+
+
 def test_analyze_single_frame_missing_path(client):
     """Testa endpoint /analyze-single-frame sem path"""
     response = client.post('/analyze-single-frame',
@@ -381,13 +2219,12 @@ def test_404_handler(client):
 
 @pytest.mark.integration
 @patch('pose_detector.PoseDetector.process_image')
-def test_analyze_frames_integration(mock_process_image, client, sample_landmarks):
+def test_analyze_frames_integration(mock_process_image, client, sample_pose_frame):
     """Teste de integração completo do pipeline"""
     # Mock do resultado do PoseDetector
     mock_process_image.return_value = {
         'success': True,
-        'landmarks_3d': sample_landmarks,
-        'landmarks_normalized': np.array([[0.5, 0.5, 0, 0.9]] * 33)
+        'landmarks': sample_pose_frame
     }
 
     # Request
@@ -442,5 +2279,30 @@ def test_angle_calculation_performance(sample_landmarks):
     assert avg_time < 0.001  # Menos de 1ms por frame
 
 
+@pytest.mark.performance
+def test_angle_calculation_indexed_landmarks(sample_pose_frame):
+    """Frame completo (33 landmarks): PoseFrame e dicts dão os mesmos ângulos, em O(1) por articulação"""
+    import time
+
+    engine = BiomechanicsEngine()
+    landmarks = sample_pose_frame.landmarks_3d()
+
+    from_dicts = engine.calculate_angles(landmarks, 'squat')
+    from_frame = engine.calculate_angles(sample_pose_frame, 'squat')
+    assert from_dicts.keys() == from_frame.keys()
+    for key in from_dicts:
+        assert from_frame[key] == pytest.approx(from_dicts[key], abs=1e-3)
+
+    detector = PoseDetector.__new__(PoseDetector)
+    assert detector.get_landmark_by_name(landmarks, 'left_knee')['id'] == 25
+    assert detector.get_landmark_by_name(sample_pose_frame, 'left_knee')['id'] == 25
+
+    start = time.time()
+    for _ in range(1000):
+        engine.calculate_angles(sample_pose_frame, 'squat')
+    avg_time = (time.time() - start) / 1000
+    assert avg_time < 0.001  # Menos de 1ms por frame
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '--cov=.', '--cov-report=term-missing'])
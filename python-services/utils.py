@@ -3,11 +3,20 @@ Funções auxiliares para o serviço MediaPipe.
 """
 
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 import logging
 
+from pose_frame import NUM_LANDMARKS, PoseFrame
+
 logger = logging.getLogger(__name__)
 
+# Landmarks críticos para análise biomecânica (peso 1.5 na confiança)
+CRITICAL_LANDMARK_IDS = [11, 12, 23, 24, 25, 26, 27, 28]
+
+# Peso de cada landmark de um PoseFrame em calculate_confidence_score
+CONFIDENCE_WEIGHTS = np.ones(NUM_LANDMARKS, dtype=np.float32)
+CONFIDENCE_WEIGHTS[CRITICAL_LANDMARK_IDS] = 1.5
+
 
 def validate_frame_data(frame_data: Dict[str, Any]) -> bool:
     """
@@ -41,16 +50,21 @@ def validate_frame_data(frame_data: Dict[str, Any]) -> bool:
     return True
 
 
-def calculate_confidence_score(landmarks: List[Dict[str, Any]]) -> float:
+def calculate_confidence_score(landmarks: Union[PoseFrame, List[Dict[str, Any]]]) -> float:
     """
     Calcula score de confiança baseado na visibilidade dos landmarks.
 
     Args:
-        landmarks: Lista de landmarks 3D
+        landmarks: PoseFrame ou lista de landmarks 3D
 
     Returns:
         Score de confiança (0.0-1.0)
     """
+    if isinstance(landmarks, PoseFrame):
+        # Média ponderada direto sobre o array de visibilidade
+        confidence = float(np.dot(landmarks.visibility, CONFIDENCE_WEIGHTS) / CONFIDENCE_WEIGHTS.sum())
+        return min(1.0, max(0.0, confidence))
+
     if not landmarks:
         return 0.0
 
@@ -0,0 +1,164 @@
+"""
+Decodificação de vídeo em memória com OpenCV.
+Amostra frames por fps ou por lista de timestamps, sem gravar JPEGs em disco.
+"""
+
+import cv2
+import numpy as np
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# FPS assumido quando o container não informa a taxa de quadros
+DEFAULT_SOURCE_FPS = 30.0
+
+
+def sample_video_frames(
+    video_path: str,
+    fps: Optional[float] = None,
+    timestamps_ms: Optional[List[float]] = None,
+    max_frames: Optional[int] = None
+) -> List[Tuple[int, np.ndarray]]:
+    """
+    Decodifica o vídeo e retorna os frames amostrados.
+
+    Args:
+        video_path: Caminho do vídeo
+        fps: Taxa de amostragem em frames por segundo
+        timestamps_ms: Timestamps desejados (ms); tem precedência sobre fps
+        max_frames: Para de decodificar após max_frames + 1 frames amostrados,
+            permitindo ao chamador detectar que o limite foi excedido
+
+    Returns:
+        Lista de (timestamp_ms, frame BGR), em ordem temporal
+
+    Raises:
+        ValueError: Se o vídeo não puder ser aberto ou os parâmetros forem inválidos
+    """
+    limit = max_frames + 1 if max_frames is not None else None
+    sampled = list(islice(iter_video_frames(video_path, fps, timestamps_ms), limit))
+    logger.info(f"Sampled {len(sampled)} frames from {video_path}")
+    return sampled
+
+
+def estimate_sample_count(
+    video_path: str,
+    fps: Optional[float] = None,
+    timestamps_ms: Optional[List[float]] = None
+) -> int:
+    """
+    Estima quantos frames serão amostrados, pelos metadados do container
+    (sem decodificar). Pode divergir do total real em alguns frames.
+
+    Raises:
+        ValueError: Se o vídeo não puder ser aberto
+    """
+    if timestamps_ms is not None:
+        return len(timestamps_ms)
+
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError(f'Failed to open video: {video_path}')
+
+    try:
+        source_fps = capture.get(cv2.CAP_PROP_FPS) or DEFAULT_SOURCE_FPS
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        capture.release()
+
+    if frame_count <= 0:
+        return 0
+
+    duration_s = frame_count / source_fps
+    return min(frame_count, int(duration_s * fps) + 1)
+
+
+def iter_video_frames(
+    video_path: str,
+    fps: Optional[float] = None,
+    timestamps_ms: Optional[List[float]] = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Decodifica o vídeo sob demanda, produzindo os frames amostrados.
+
+    Os frames são lidos em ordem com grab(); só os frames amostrados são
+    convertidos para BGR com retrieve(). Como só o frame atual fica em
+    memória, vídeos longos podem ser processados em lotes.
+
+    Args:
+        video_path: Caminho do vídeo
+        fps: Taxa de amostragem em frames por segundo
+        timestamps_ms: Timestamps desejados (ms); tem precedência sobre fps
+
+    Yields:
+        (timestamp_ms, frame BGR), em ordem temporal
+
+    Raises:
+        ValueError: Se o vídeo não puder ser aberto ou os parâmetros forem
+            inválidos (na chamada, antes do primeiro frame)
+    """
+    if timestamps_ms is None and (fps is None or fps <= 0):
+        raise ValueError('fps must be a positive number')
+
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError(f'Failed to open video: {video_path}')
+
+    return _iter_capture(capture, fps, timestamps_ms)
+
+
+def _iter_capture(
+    capture: cv2.VideoCapture,
+    fps: Optional[float],
+    timestamps_ms: Optional[List[float]]
+) -> Iterator[Tuple[int, np.ndarray]]:
+    try:
+        source_fps = capture.get(cv2.CAP_PROP_FPS) or DEFAULT_SOURCE_FPS
+        frame_interval_ms = 1000.0 / source_fps
+
+        if timestamps_ms is not None:
+            targets = sorted(float(t) for t in timestamps_ms)
+        else:
+            targets = None
+            step_ms = 1000.0 / fps
+
+        next_target = targets[0] if targets else 0.0
+        target_idx = 0
+        frame_idx = 0
+
+        while True:
+            if targets is not None and target_idx >= len(targets):
+                break
+
+            if not capture.grab():
+                break
+
+            frame_ts = frame_idx * frame_interval_ms
+            frame_idx += 1
+
+            # Frame mais próximo ainda não alcançou o próximo timestamp
+            if frame_ts + frame_interval_ms / 2 < next_target:
+                continue
+
+            ok, frame = capture.retrieve()
+            if not ok:
+                logger.warning(f"Failed to decode frame at {frame_ts:.0f}ms")
+                continue
+
+            yield int(round(frame_ts)), frame
+
+            if targets is not None:
+                # Pular timestamps já cobertos por este frame
+                while target_idx < len(targets) and targets[target_idx] <= frame_ts + frame_interval_ms / 2:
+                    target_idx += 1
+                if target_idx < len(targets):
+                    next_target = targets[target_idx]
+            else:
+                next_target += step_ms
+                while next_target <= frame_ts + frame_interval_ms / 2:
+                    next_target += step_ms
+
+    finally:
+        capture.release()
@@ -0,0 +1,113 @@
+"""
+Aquecimento do modelo e estado de prontidão (/ready).
+
+A primeira inferência de um PoseDetector paga a inicialização do grafo
+TFLite e alocações preguiçosas (~5x o tempo de um frame). O warm-up roda
+essa primeira inferência em uma imagem sintética ao subir cada worker, e
+/ready só responde 200 depois disso, para o load balancer não mandar
+tráfego a um worker frio.
+"""
+
+import threading
+import time
+import logging
+from typing import Callable, Dict, Any, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Estados do warm-up
+WARMUP_PENDING = 'pending'
+WARMUP_RUNNING = 'warming_up'
+WARMUP_READY = 'ready'
+WARMUP_FAILED = 'failed'
+
+
+def synthetic_pose_image() -> np.ndarray:
+    """
+    Figura humana desenhada (480x360 BGR), detectada pelo MediaPipe.
+
+    Precisa ter uma pessoa detectável: sem ela só o detector roda e o
+    modelo de landmarks continua frio.
+    """
+    image = np.full((480, 360, 3), 200, dtype=np.uint8)
+    skin = (140, 170, 210)
+    shirt = (60, 60, 160)
+    pants = (90, 60, 40)
+
+    # Cabeça, pescoço e tronco
+    cv2.ellipse(image, (180, 70), (28, 36), 0, 0, 360, skin, -1)
+    cv2.circle(image, (170, 65), 4, (40, 40, 40), -1)
+    cv2.circle(image, (190, 65), 4, (40, 40, 40), -1)
+    cv2.rectangle(image, (170, 100), (190, 115), skin, -1)
+    cv2.ellipse(image, (180, 180), (50, 75), 0, 0, 360, shirt, -1)
+
+    # Braços e pernas (lado esquerdo e direito)
+    for side in (-1, 1):
+        cv2.line(image, (180 + side * 45, 125), (180 + side * 75, 200), shirt, 22)
+        cv2.line(image, (180 + side * 75, 200), (180 + side * 85, 270), skin, 18)
+        cv2.circle(image, (180 + side * 85, 280), 12, skin, -1)
+        cv2.line(image, (180 + side * 25, 245), (180 + side * 35, 350), pants, 30)
+        cv2.line(image, (180 + side * 35, 350), (180 + side * 38, 440), pants, 26)
+        cv2.ellipse(image, (180 + side * 45, 450), (22, 10), 0, 0, 360, (30, 30, 30), -1)
+
+    return image
+
+
+class Readiness:
+    """Estado do warm-up de um worker (thread-safe)."""
+
+    def __init__(self):
+        self.state = WARMUP_PENDING
+        self.error: Optional[str] = None
+        self.duration_ms: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == WARMUP_READY
+
+    def start(self, warm_up: Callable[[], None]) -> bool:
+        """
+        Roda warm_up em uma thread de background (uma única vez).
+
+        Returns:
+            True se o warm-up foi iniciado por esta chamada
+        """
+        with self._lock:
+            if self.state != WARMUP_PENDING:
+                return False
+            self.state = WARMUP_RUNNING
+
+        threading.Thread(target=self._run, args=(warm_up,), name='warm-up', daemon=True).start()
+        return True
+
+    def run(self, warm_up: Callable[[], None]) -> None:
+        """Roda warm_up na thread atual."""
+        with self._lock:
+            self.state = WARMUP_RUNNING
+        self._run(warm_up)
+
+    def _run(self, warm_up: Callable[[], None]) -> None:
+        started = time.time()
+        try:
+            warm_up()
+        except Exception as e:
+            logger.error(f"Warm-up failed: {str(e)}")
+            self.error = str(e)
+            self.state = WARMUP_FAILED
+            return
+
+        self.duration_ms = int((time.time() - started) * 1000)
+        self.state = WARMUP_READY
+        logger.info(f"Warm-up completed in {self.duration_ms}ms")
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = {'status': self.state}
+        if self.duration_ms is not None:
+            status['warm_up_ms'] = self.duration_ms
+        if self.error is not None:
+            status['error'] = self.error
+        return status
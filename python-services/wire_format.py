@@ -0,0 +1,139 @@
+"""
+Formato binário compacto para respostas com landmarks.
+
+Os landmarks normalizados de todos os frames vão em um único array
+(n_frames x 33 x 4: x, y, z, visibility), que o cliente lê direto com
+Float32Array/Int16Array, sem parsing de números em JSON. O restante da
+resposta (frames sem landmarks, estatísticas) vai em um bloco JSON.
+
+Layout (little-endian):
+    offset  tipo      campo
+    0       4s        magic b'NFCP'
+    4       uint16    versão do formato
+    6       uint8     dtype (0 = float32, 1 = int16 quantizado)
+    7       uint8     reservado
+    8       uint32    n_frames
+    12      uint16    n_landmarks (33)
+    14      uint16    n_channels (4)
+    16      float32   scale (int16: valor = int16 / scale; float32: 1.0)
+    20      uint32    metadata_length (JSON UTF-8 + padding de espaços,
+                      múltiplo de 4 para alinhar o array)
+    24      ...       metadata JSON
+    24+len  ...       landmarks (n_frames * n_landmarks * n_channels)
+
+Leitura em TypeScript:
+    const view = new DataView(buf);
+    const metaLen = view.getUint32(20, true);
+    const meta = JSON.parse(new TextDecoder().decode(new Uint8Array(buf, 24, metaLen)));
+    const landmarks = new Float32Array(buf, 24 + metaLen, nFrames * 33 * 4);
+"""
+
+import json
+import struct
+import numpy as np
+from typing import Dict, Any, Tuple
+
+MAGIC = b'NFCP'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHBBIHHfI')
+
+DTYPE_FLOAT32 = 0
+DTYPE_INT16 = 1
+
+PRECISIONS = {
+    'float32': DTYPE_FLOAT32,
+    'int16': DTYPE_INT16,
+}
+
+# int16 / INT16_SCALE: resolução de 1e-4 e faixa de ±3.27, suficiente para
+# coordenadas normalizadas (0-1, com pequenas extrapolações) e visibilidade
+INT16_SCALE = 10000.0
+
+
+def encode_landmarks(
+    metadata: Dict[str, Any],
+    landmarks: np.ndarray,
+    precision: str = 'float32'
+) -> bytes:
+    """
+    Serializa metadata e landmarks no formato binário.
+
+    Args:
+        metadata: Dict serializável em JSON
+        landmarks: Array (n_frames, n_landmarks, n_channels)
+        precision: 'float32' ou 'int16' (quantizado)
+
+    Returns:
+        Payload binário
+
+    Raises:
+        ValueError: Se precision ou o shape do array forem inválidos
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f'Invalid precision: {precision}. Allowed: {", ".join(PRECISIONS)}')
+
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    if landmarks.ndim != 3:
+        raise ValueError(f'landmarks must have shape (frames, landmarks, channels), got {landmarks.shape}')
+
+    n_frames, n_landmarks, n_channels = landmarks.shape
+
+    if precision == 'int16':
+        body = np.clip(np.round(landmarks * INT16_SCALE), -32768, 32767).astype('<i2')
+        scale = INT16_SCALE
+    else:
+        body = landmarks.astype('<f4')
+        scale = 1.0
+
+    meta_bytes = json.dumps(metadata, separators=(',', ':')).encode('utf-8')
+    meta_bytes += b' ' * (-len(meta_bytes) % 4)
+
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        PRECISIONS[precision],
+        0,
+        n_frames,
+        n_landmarks,
+        n_channels,
+        scale,
+        len(meta_bytes)
+    )
+
+    return header + meta_bytes + body.tobytes()
+
+
+def decode_landmarks(payload: bytes) -> Tuple[Dict[str, Any], np.ndarray]:
+    """
+    Lê um payload do formato binário (clientes Python e testes).
+
+    Args:
+        payload: Bytes gerados por encode_landmarks
+
+    Returns:
+        Tupla (metadata, landmarks float32 com shape (n_frames, n_landmarks, n_channels))
+
+    Raises:
+        ValueError: Se o payload não estiver no formato esperado
+    """
+    if len(payload) < HEADER.size:
+        raise ValueError('Payload too short')
+
+    magic, version, dtype, _, n_frames, n_landmarks, n_channels, scale, meta_length = \
+        HEADER.unpack_from(payload)
+
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Unsupported payload format')
+
+    offset = HEADER.size
+    metadata = json.loads(payload[offset:offset + meta_length].decode('utf-8'))
+    offset += meta_length
+
+    count = n_frames * n_landmarks * n_channels
+    if dtype == DTYPE_INT16:
+        values = np.frombuffer(payload, dtype='<i2', count=count, offset=offset).astype(np.float32) / scale
+    else:
+        values = np.frombuffer(payload, dtype='<f4', count=count, offset=offset).astype(np.float32)
+
+    return metadata, values.reshape(n_frames, n_landmarks, n_channels)